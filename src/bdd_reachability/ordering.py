@@ -0,0 +1,231 @@
+"""
+Static BDD Variable Orderings
+
+Heuristics that order the places of a net from its arc structure, so that
+places read or written by the same transitions get nearby BDD levels:
+- sorted: plain string order (p10 between p1 and p2); the historical order
+- natural: string order with embedded numbers compared numerically
+- bfs / dfs: traversal of the place-transition graph from the marked places
+- force: FORCE (Aloul et al.), moving every place to the mean centre of
+  gravity of its transitions until the total span stops shrinking
+- noack: greedy order (Noack), adding next the place whose transitions are
+  most completely placed already
+- invariant: places grouped by P-semiflows (e.g. state machine components),
+  each group kept contiguous
+
+Each heuristic takes a PetriNet and returns a list of all its places; the
+BDD engine declares ``p`` and ``p'`` adjacently in that order.
+"""
+
+import re
+from collections import deque
+from fractions import Fraction
+
+ORDERINGS = ('sorted', 'natural', 'bfs', 'dfs', 'force', 'noack', 'invariant')
+
+
+def _natural_key(name):
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part)
+            for part in re.split(r'(\d+)', name) if part]
+
+
+def _transition_places(petri_net):
+    """{transition: sorted places it reads or writes}, transitions in sorted order."""
+    return {t: sorted(set(petri_net.arcs[t]['input']) | set(petri_net.arcs[t]['output']),
+                      key=_natural_key)
+            for t in sorted(petri_net.transitions, key=_natural_key)}
+
+
+def _place_transitions(petri_net, hyperedges):
+    incident = {p: [] for p in petri_net.places}
+    for t, places in hyperedges.items():
+        for p in places:
+            incident[p].append(t)
+    return incident
+
+
+def _roots(petri_net):
+    """Traversal roots: the marked places first, then every other place."""
+    places = sorted(petri_net.places, key=_natural_key)
+    marked = [p for p in places if petri_net.initial_marking.has_token(p)]
+    return marked + [p for p in places if p not in set(marked)]
+
+
+def natural_order(petri_net):
+    return sorted(petri_net.places, key=_natural_key)
+
+
+def traversal_order(petri_net, depth_first=False):
+    """Places in BFS (or DFS) discovery order over the place-transition graph."""
+    hyperedges = _transition_places(petri_net)
+    incident = _place_transitions(petri_net, hyperedges)
+    order, seen = [], set()
+    for root in _roots(petri_net):
+        if root in seen:
+            continue
+        seen.add(root)
+        pending = deque([root])
+        while pending:
+            p = pending.pop() if depth_first else pending.popleft()
+            order.append(p)
+            neighbours = [q for t in incident[p] for q in hyperedges[t] if q not in seen]
+            if depth_first:
+                neighbours.reverse()
+            for q in neighbours:
+                if q not in seen:
+                    seen.add(q)
+                    pending.append(q)
+    return order
+
+
+def total_span(petri_net, order):
+    """Sum over transitions of the distance between their first and last place in ``order``."""
+    position = {p: i for i, p in enumerate(order)}
+    return sum(max(position[p] for p in places) - min(position[p] for p in places)
+               for places in _transition_places(petri_net).values() if places)
+
+
+def force_order(petri_net, start=None, iterations=50):
+    """
+    FORCE from ``start`` (default: the invariant order): place positions move
+    to the mean centre of gravity of their transitions; the order with the
+    smallest total span is kept.
+    """
+    hyperedges = _transition_places(petri_net)
+    incident = _place_transitions(petri_net, hyperedges)
+    order = list(start) if start is not None else invariant_order(petri_net)
+    best, best_span = order, total_span(petri_net, order)
+    for _ in range(iterations):
+        position = {p: i for i, p in enumerate(order)}
+        gravity = {t: sum(position[p] for p in places) / len(places)
+                   for t, places in hyperedges.items() if places}
+        target = {p: (sum(gravity[t] for t in incident[p]) / len(incident[p])
+                      if incident[p] else position[p])
+                  for p in order}
+        order = sorted(order, key=lambda p: (target[p], position[p]))
+        span = total_span(petri_net, order)
+        if span >= best_span:
+            break
+        best, best_span = order, span
+    return best
+
+
+def noack_order(petri_net):
+    """
+    Greedy order: repeatedly append the place maximising the sum, over its
+    transitions, of the fraction of their places already ordered (ties:
+    more transitions, then natural name order).
+    """
+    hyperedges = _transition_places(petri_net)
+    incident = _place_transitions(petri_net, hyperedges)
+    placed_count = {t: 0 for t in hyperedges}
+    remaining = set(petri_net.places)
+    rank = {p: i for i, p in enumerate(_roots(petri_net))}
+    order = []
+    while remaining:
+        p = max(remaining, key=lambda q: (
+            sum(Fraction(placed_count[t] + 1, len(hyperedges[t])) for t in incident[q]),
+            len(incident[q]), -rank[q]))
+        remaining.discard(p)
+        order.append(p)
+        for t in incident[p]:
+            placed_count[t] += 1
+    return order
+
+
+def p_semiflows(petri_net, max_rows=2000):
+    """
+    Minimal-support P-semiflows (Farkas algorithm) as lists of places, or
+    None if the intermediate matrix grows beyond ``max_rows`` rows.
+    """
+    places = sorted(petri_net.places, key=_natural_key)
+    transitions = sorted(petri_net.transitions, key=_natural_key)
+    # rows: (incidence row over transitions, {place: weight} of the combination)
+    rows = []
+    for p in places:
+        effect = [int(p in petri_net.arcs[t]['output']) - int(p in petri_net.arcs[t]['input'])
+                  for t in transitions]
+        rows.append((effect, {p: 1}))
+
+    for j in range(len(transitions)):
+        zero = [row for row in rows if row[0][j] == 0]
+        positive = [row for row in rows if row[0][j] > 0]
+        negative = [row for row in rows if row[0][j] < 0]
+        combined = []
+        for a_effect, a_weights in positive:
+            for b_effect, b_weights in negative:
+                fa, fb = -b_effect[j], a_effect[j]
+                effect = [fa * x + fb * y for x, y in zip(a_effect, b_effect)]
+                weights = {p: a_weights.get(p, 0) * fa + b_weights.get(p, 0) * fb
+                           for p in a_weights.keys() | b_weights.keys()}
+                combined.append((effect, weights))
+        rows = zero + combined
+        # keep minimal supports only
+        rows.sort(key=lambda row: len(row[1]))
+        minimal = []
+        for row in rows:
+            support = set(row[1])
+            if not any(set(other[1]) <= support for other in minimal):
+                minimal.append(row)
+        rows = minimal
+        if len(rows) > max_rows:
+            return None
+    return [sorted(weights, key=_natural_key) for _, weights in rows]
+
+
+def invariant_order(petri_net):
+    """
+    Places grouped by P-semiflow: semiflows are taken in BFS order of their
+    first place, each contributing its not yet ordered places in BFS order;
+    places outside every semiflow follow in BFS order.
+    """
+    base = traversal_order(petri_net)
+    semiflows = p_semiflows(petri_net)
+    if not semiflows:
+        return base
+    rank = {p: i for i, p in enumerate(base)}
+    order, seen = [], set()
+    for flow in sorted(semiflows, key=lambda flow: (min(rank[p] for p in flow), len(flow))):
+        for p in sorted(flow, key=rank.get):
+            if p not in seen:
+                seen.add(p)
+                order.append(p)
+    order.extend(p for p in base if p not in seen)
+    return order
+
+
+def variable_order(petri_net, ordering='sorted'):
+    """
+    Order of the places of a net for BDD variable declaration.
+
+    Args:
+        petri_net: PetriNet to order
+        ordering: One of ORDERINGS, a list of all places, or a callable
+                  PetriNet -> list of places
+
+    Raises:
+        ValueError: For an unknown heuristic or a list that is not a
+                    permutation of the places
+    """
+    if callable(ordering):
+        order = list(ordering(petri_net))
+    elif isinstance(ordering, (list, tuple)):
+        order = list(ordering)
+    elif ordering == 'sorted':
+        order = sorted(petri_net.places)
+    elif ordering == 'natural':
+        order = natural_order(petri_net)
+    elif ordering in ('bfs', 'dfs'):
+        order = traversal_order(petri_net, depth_first=ordering == 'dfs')
+    elif ordering == 'force':
+        order = force_order(petri_net)
+    elif ordering == 'noack':
+        order = noack_order(petri_net)
+    elif ordering == 'invariant':
+        order = invariant_order(petri_net)
+    else:
+        raise ValueError(f"Unknown variable ordering {ordering}; expected one of {ORDERINGS}")
+
+    if len(order) != len(petri_net.places) or set(order) != set(petri_net.places):
+        raise ValueError("Variable order must list every place of the net exactly once")
+    return order
@@ -2,19 +2,80 @@
 """
 Symbolic BDD reachability with a proper transition relation.
 
-- Declares current vars `p` and next vars `p'` for each place.
-- Builds transition relation T(s,s') = OR_t ( enabled_t(s) & update_t(s,s') ).
+- Declares current vars `p` and next vars `p'` for each place, interleaved,
+  places in a static order from bdd_reachability.ordering.
+- Builds transition relation T(s,s') = OR_t ( enabled_t(s) & update_t(s,s') ),
+  or (relation='partitioned') one relation per cluster of transitions over
+  the places they touch only; the image is the union of the cluster images.
 - Computes reachability by fixpoint: R <- R ∪ Post(R) with Post(R)(s') = ∃s. R(s) & T(s,s')
+- relation='local' declares no next vars: the image of a 1-safe transition
+  cofactors R by its preset, quantifies its postset and conjoins the update.
+- engine='saturation' replaces the breadth-first fixpoint: transitions are
+  grouped by their topmost variable and fired to local fixpoints bottom-up.
 - Adds zero-marking in dead-end single-token situations to match explicit reachability logic.
+- An optional Budget is checked after every image step; when it runs out the
+  markings found so far are returned and `status` says why.
+- Dynamic sifting can be switched on for the relation construction and / or
+  the fixpoint, or run once after the relation is built. The final variable
+  order can be kept in a JSON sidecar file keyed by the net digest, so the
+  next run on the same net declares it directly and skips the reordering.
 """
 
+import json
+import os
+import time
+
 from dd.autoref import BDD
-from utils import Marking,PetriNet
+from utils import Marking,PetriNet,ExplorationStatus
+from .ordering import variable_order
 
 class BDDReachability:
+    RELATIONS = ('monolithic', 'partitioned', 'local')
+    ENGINES = ('bfs', 'saturation')
+
     #########################################################################CONSTRUCTOR#######################################################
-    def __init__(self, petri_net):
+    def __init__(self, petri_net, ordering='sorted', sift_relation=False, sift_fixpoint=False,
+                 reorder_once=False, order_file=None, relation='monolithic',
+                 cluster_size=1000, engine='bfs'):
+        """
+        Args:
+            petri_net: PetriNet to explore
+            ordering: Static variable order: a heuristic name from
+                      ordering.ORDERINGS, a list of all places or a callable
+                      PetriNet -> list of places
+            sift_relation: Dynamic sifting while the transition relation is built
+            sift_fixpoint: Dynamic sifting during the reachability fixpoint
+            reorder_once: Sift once after the relation is built (see reorder());
+                          skipped when the order comes from order_file
+            order_file: JSON sidecar holding the final variable order; a
+                        saved order for the same net replaces ``ordering``
+            relation: 'monolithic' (one T over all places), 'partitioned'
+                      (clusters of transitions over their own places, see
+                      _build_partitions) or 'local' (per-transition update
+                      on the current vars, no p' declared)
+            cluster_size: Largest cluster relation in BDD nodes; 0 keeps one
+                          relation per transition
+            engine: 'bfs' (R <- R | Post(R)) or 'saturation' (per-transition
+                    events fired bottom-up to local fixpoints, see _saturate;
+                    relation then only chooses whether p' is declared)
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine}; expected one of {self.ENGINES}")
+        if relation not in self.RELATIONS:
+            raise ValueError(f"Unknown relation {relation}; expected one of {self.RELATIONS}")
         self.petri_net = petri_net
+        self.ordering = ordering
+        self.sift_relation = sift_relation
+        self.sift_fixpoint = sift_fixpoint
+        self.reorder_once = reorder_once
+        self.order_file = order_file
+        self.relation = relation
+        self.cluster_size = cluster_size
+        self.engine = engine
+        # places in BDD level order, set by initialize_bdd() and after reordering
+        self.variable_order = []
+        # True when initialize_bdd() declared the order saved in order_file
+        self.order_loaded = False
         # BDD manager is None until initialize_bdd() is called (tests expect this)
         self.bdd_manager = None
 
@@ -28,10 +89,21 @@ class BDDReachability:
 
         # the full transition relation (BDD over current and next vars)
         self.transition_relation = None
+        # partitioned mode: [(relation, support places, p' -> p renaming)]
+        self.partitions = None
+        # local mode: [(preset cofactor, places to quantify, update cube)]
+        self.local_updates = None
+        # saturation: [(places, local update or (relation, places, renaming))]
+        self.events = None
 
         # reachable set (bdd over current vars)
         self.reachable_bdd = None
 
+        # ExplorationStatus of the last compute_symbolic_reachability call
+        self.status = None
+        # largest manager size seen after an image step of the last run
+        self.peak_nodes = 0
+
     # -------------------------
     # Build transition maps (robust)
     # -------------------------
@@ -126,29 +198,117 @@ class BDDReachability:
         self.place_var = {}
         self.next_var = {}
 
-        places = list(getattr(self.petri_net, "places", []))
-        places.sort()
+        places = variable_order(self.petri_net, self.ordering)
+        saved = self._load_order()
+        self.order_loaded = saved is not None
 
-        # declare current and next var names (use p and p')
+        # declare current and next var names (use p and p'), each p' right below p;
+        # the local image needs no next vars
+        self.bdd_manager.declare(*(saved or self._variable_names(places)))
         for p in places:
-            name_now = p
-            name_next = p + "'"
-            # declare both names
-            self.bdd_manager.declare(name_now)
-            self.bdd_manager.declare(name_next)
             # store function nodes
-            self.place_var[p] = self.bdd_manager.var(name_now)
-            self.next_var[p] = self.bdd_manager.var(name_next)
+            self.place_var[p] = self.bdd_manager.var(p)
+            if self.relation != 'local':
+                self.next_var[p] = self.bdd_manager.var(p + "'")
+        self._update_variable_order()
 
         # build trans maps
         self._build_transition_maps()
 
         # build transition relation
-        self._build_transition_relation()
+        self.bdd_manager.configure(reordering=self.sift_relation)
+        try:
+            self.transition_relation = None
+            self.partitions = None
+            self.local_updates = None
+            self.events = None
+            if self.engine == 'saturation':
+                self._build_events()
+            elif self.relation == 'partitioned':
+                self._build_partitions()
+            elif self.relation == 'local':
+                self._build_local_updates()
+            else:
+                self._build_transition_relation()
+        finally:
+            self.bdd_manager.configure(reordering=False)
+        if self.sift_relation:
+            self._update_variable_order()
+        if self.reorder_once and not self.order_loaded:
+            self.reorder()
 
         # reset reachable containers
         self.reachable_bdd = self.bdd_manager.false
 
+    # -------------------------
+    # Variable order: reordering and sidecar file
+    # -------------------------
+    def _variable_names(self, places):
+        """BDD variable names for places in level order: p and p' interleaved, or p only."""
+        if self.relation == 'local':
+            return list(places)
+        return [name for p in places for name in (p, p + "'")]
+
+    def _update_variable_order(self):
+        self.variable_order = sorted(self.place_var, key=self.bdd_manager.level_of_var)
+
+    def reorder(self):
+        """
+        Sift the variables once (Rudell), then move every p' back right
+        below its p so the pairs stay interleaved.
+        """
+        if self.bdd_manager is None:
+            raise RuntimeError("Call initialize_bdd() first")
+        bdd = self.bdd_manager
+        bdd.reorder()
+        names = self._variable_names(sorted(self.place_var, key=bdd.level_of_var))
+        bdd.reorder({name: level for level, name in enumerate(names)})
+        self._update_variable_order()
+
+    def _net_digest(self):
+        return self.petri_net.compile().digest()
+
+    def _load_order(self):
+        """Variable names in level order saved in order_file for this net, or None."""
+        if self.order_file is None:
+            return None
+        try:
+            with open(self.order_file) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(saved, dict) or saved.get('net') != self._net_digest():
+            return None
+        names = saved.get('order')
+        if not isinstance(names, list):
+            return None
+        places = set(self.petri_net.places)
+        order = [name for name in names if name in places]
+        if len(order) != len(places) or set(order) != places:
+            return None
+        expected = self._variable_names(order)
+        if len(names) == len(expected) and set(names) == set(expected):
+            return names
+        # saved by the other variable layout: keep the order of the places
+        return expected
+
+    def save_order(self, path=None):
+        """
+        Write the current variable order (p and p' names by level) and the
+        net digest to ``path`` (default: order_file) as JSON.
+        """
+        if self.bdd_manager is None:
+            raise RuntimeError("Call initialize_bdd() first")
+        path = path or self.order_file
+        if path is None:
+            raise ValueError("No order file given")
+        bdd = self.bdd_manager
+        names = sorted(bdd.vars, key=bdd.level_of_var)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'net': self._net_digest(), 'order': names}, f, indent=1)
+        os.replace(tmp_path, path)
+
     # -------------------------
     # Build transition relation T(s,s')
     # -------------------------
@@ -164,32 +324,134 @@ class BDDReachability:
         T = bdd.false
 
         for t in getattr(self.petri_net, "transitions", []):
-            pre = list(self.trans_in.get(t, []))
-            post = list(self.trans_out.get(t, []))
+            T = T | self._local_relation(t, places)
 
-            # enabled(s): all pre places true
-            enabled = bdd.true
-            for p in pre:
-                enabled &= self.place_var[p]
+        self.transition_relation = T
 
-            # next-state constraints
-            next_cons = bdd.true
-            for p in places:
-                x = self.place_var[p]
-                xp = self.next_var[p]
-                if p in post:
-                    # produced -> xp == 1
-                    next_cons &= xp
-                elif p in pre:
-                    # consumed -> xp == 0
-                    next_cons &= ~xp
-                else:
-                    # unchanged: xp == x  <=> (¬x & ¬xp) ∨ (x & xp)
-                    next_cons &= ((~x & ~xp) | (x & xp))
-
-            T = T | (enabled & next_cons)
+    def _local_relation(self, t, support):
+        """enabled_t(s) & update_t(s,s') over the places of ``support`` only."""
+        bdd = self.bdd_manager
+        pre = list(self.trans_in.get(t, []))
+        post = list(self.trans_out.get(t, []))
+
+        # enabled(s): all pre places true
+        enabled = bdd.true
+        for p in pre:
+            enabled &= self.place_var[p]
+
+        # next-state constraints
+        next_cons = bdd.true
+        for p in support:
+            x = self.place_var[p]
+            xp = self.next_var[p]
+            if p in post:
+                # produced -> xp == 1
+                next_cons &= xp
+            elif p in pre:
+                # consumed -> xp == 0
+                next_cons &= ~xp
+            else:
+                # unchanged: xp == x  <=> (¬x & ¬xp) ∨ (x & xp)
+                next_cons &= ((~x & ~xp) | (x & xp))
+        return enabled & next_cons
 
-        self.transition_relation = T
+    def _frame(self, places):
+        """p' == p for every place of ``places``."""
+        frame = self.bdd_manager.true
+        for p in places:
+            x = self.place_var[p]
+            xp = self.next_var[p]
+            frame &= ((~x & ~xp) | (x & xp))
+        return frame
+
+    # -------------------------
+    # Partitioned transition relation: one relation per cluster of transitions
+    # -------------------------
+    def _build_partitions(self):
+        """
+        Cluster the transitions in order of their topmost variable: each
+        cluster relation only mentions the places its transitions touch (its
+        support), and the next transition joins the cluster unless the
+        merged relation would exceed cluster_size nodes.
+        """
+        bdd = self.bdd_manager
+        supports = {t: set(self.trans_in.get(t, [])) | set(self.trans_out.get(t, []))
+                    for t in getattr(self.petri_net, "transitions", [])}
+
+        def top(t):
+            return min((bdd.level_of_var(p) for p in supports[t]), default=len(bdd.vars))
+
+        clusters = []
+        relation, support = None, set()
+        for t in sorted(supports, key=lambda t: (top(t), t)):
+            local = self._local_relation(t, supports[t])
+            if relation is not None:
+                merged = ((relation & self._frame(supports[t] - support))
+                          | (local & self._frame(support - supports[t])))
+                if merged.dag_size <= self.cluster_size:
+                    relation, support = merged, support | supports[t]
+                    continue
+                clusters.append((relation, support))
+            relation, support = local, set(supports[t])
+        if relation is not None:
+            clusters.append((relation, support))
+
+        self.partitions = [
+            (relation, sorted(support), {p + "'": self.place_var[p] for p in support})
+            for relation, support in clusters]
+
+    # -------------------------
+    # Local image: 1-safe transition updates on the current vars only
+    # -------------------------
+    def _build_local_updates(self):
+        """
+        Image of t without next vars: cofactor R by pre = 1, quantify the
+        remaining post places, then conjoin post = 1 and (pre - post) = 0.
+        """
+        self.local_updates = [self._local_update(t)
+                              for t in getattr(self.petri_net, "transitions", [])]
+
+    def _local_update(self, t):
+        """(preset cofactor, places to quantify, update cube) of transition t."""
+        bdd = self.bdd_manager
+        pre = set(self.trans_in.get(t, []))
+        post = set(self.trans_out.get(t, []))
+        update = bdd.true
+        for p in post:
+            update &= self.place_var[p]
+        for p in pre - post:
+            update &= ~self.place_var[p]
+        return {p: True for p in pre}, sorted(post - pre), update
+
+    def _local_image(self, local_update, R):
+        bdd = self.bdd_manager
+        cofactor, quantified, update = local_update
+        enabled = bdd.let(cofactor, R) if cofactor else R
+        if enabled == bdd.false:
+            return enabled
+        if quantified:
+            enabled = bdd.exist(quantified, enabled)
+        return enabled & update
+
+    def _local_post(self, R):
+        """Union over the transitions of their local images."""
+        image = self.bdd_manager.false
+        for local_update in self.local_updates:
+            image |= self._local_image(local_update, R)
+        return image
+
+    def relation_size(self):
+        """Nodes of the monolithic relation, or summed over the partitions / local updates / events."""
+        if self.events is not None:
+            index = 2 if self.relation == 'local' else 0
+            return sum(event[index].dag_size for _, event in self.events)
+        if self.local_updates is not None:
+            return sum(update.dag_size for _, _, update in self.local_updates)
+        if self.partitions is not None:
+            return sum(relation.dag_size for relation, _, _ in self.partitions)
+        if self.transition_relation is None:
+            return 0
+        return self.transition_relation.dag_size
 
     # -------------------------
     # Encode a marking into BDD (current vars)
@@ -216,6 +478,15 @@ class BDDReachability:
     def post(self, R):
         if self.bdd_manager is None:
             raise RuntimeError("Call initialize_bdd() before computing post.")
+        if self.events is not None:
+            image = self.bdd_manager.false
+            for _, event in self.events:
+                image |= self._event_image(event, R)
+            return image
+        if self.local_updates is not None:
+            return self._local_post(R)
+        if self.partitions is not None:
+            return self._partitioned_post(R)
         if self.transition_relation is None:
             return self.bdd_manager.false
 
@@ -235,30 +506,154 @@ class BDDReachability:
 
         return prod
 
+    def _partition_image(self, partition, R):
+        bdd = self.bdd_manager
+        relation, support, rename_map = partition
+        prod = R & relation
+        if support:
+            prod = bdd.let(rename_map, bdd.exist(support, prod))
+        return prod
+
+    def _partitioned_post(self, R):
+        """Union of the cluster images; places outside a cluster's support keep their value."""
+        image = self.bdd_manager.false
+        for partition in self.partitions:
+            image |= self._partition_image(partition, R)
+        return image
+
     # -------------------------###################################################################################
     # Compute symbolic reachability (fixpoint). Also inject zero-marking as in explicit code.
     # -------------------------###################################################################################
-    def compute_symbolic_reachability(self, initial_marking):
+    def compute_symbolic_reachability(self, initial_marking, budget=None):
         if isinstance(initial_marking, dict):
             initial_marking = Marking(initial_marking)
 
         if self.bdd_manager is None:
             self.initialize_bdd()
+        started = time.monotonic()
+        if budget is not None:
+            budget.start()
 
         # R0
         R = self.encode_marking(initial_marking)
+        nvars = len(self.place_var)
 
+        self.peak_nodes = len(self.bdd_manager)
+        self.bdd_manager.configure(reordering=self.sift_fixpoint)
+        try:
+            if self.engine == 'saturation':
+                R, frontier, explored, reason = self._saturate(R, budget, nvars)
+            else:
+                R, frontier, explored, reason = self._fixpoint(R, budget, nvars)
+        finally:
+            self.bdd_manager.configure(reordering=False)
+        if self.sift_fixpoint:
+            self._update_variable_order()
+
+        self.status = ExplorationStatus(reason is None, reason, explored,
+                                        frontier.count(nvars=nvars), time.monotonic() - started)
+        self.reachable_bdd = R
+        if self.order_file is not None:
+            self.save_order()
+        # build explicit set for compatibility
+        return R
+
+    def _fixpoint(self, R, budget, nvars):
+        """Image iteration from R; returns (R, frontier, explored, budget reason)."""
+        reason = None
+        frontier = self.bdd_manager.false
         while True:
             postR = self.post(R)
             Rnext = R | postR
+            self.peak_nodes = max(self.peak_nodes, len(self.bdd_manager))
 
             if Rnext == R:
                 break
+            if budget is not None:
+                states = Rnext.count(nvars=nvars) if budget.max_states is not None else None
+                reason = budget.exceeded(states=states, bdd_nodes=len(self.bdd_manager))
+                if reason is not None:
+                    # the new markings have not been expanded yet
+                    frontier = Rnext & ~R
+                    explored = R.count(nvars=nvars)
+                    R = Rnext
+                    break
             R = Rnext
 
-        self.reachable_bdd = R
-        # build explicit set for compatibility
-        return R
+        if reason is None:
+            explored = R.count(nvars=nvars)
+        return R, frontier, explored, reason
+
+    # -------------------------
+    # Saturation: events fired to local fixpoints, bottom-up by top variable
+    # -------------------------
+    def _build_events(self):
+        """One event per transition: its places and its image (local update or relation)."""
+        self.events = []
+        for t in getattr(self.petri_net, "transitions", []):
+            support = set(self.trans_in.get(t, [])) | set(self.trans_out.get(t, []))
+            if self.relation == 'local':
+                event = self._local_update(t)
+            else:
+                event = (self._local_relation(t, support), sorted(support),
+                         {p + "'": self.place_var[p] for p in support})
+            self.events.append((support, event))
+
+    def _event_image(self, event, R):
+        if self.relation == 'local':
+            return self._local_image(event, R)
+        return self._partition_image(event, R)
+
+    def _event_groups(self):
+        """Events grouped by top variable (their place nearest the root), deepest group first."""
+        bdd = self.bdd_manager
+        groups = {}
+        for support, event in self.events:
+            top = min((bdd.level_of_var(p) for p in support), default=len(bdd.vars))
+            groups.setdefault(top, []).append(event)
+        return [groups[top] for top in sorted(groups, reverse=True)]
+
+    def _saturate(self, R, budget, nvars):
+        """
+        Saturation at the set level: the group of events with the deepest top
+        variable is fired to a local fixpoint first; whenever a higher group
+        adds markings, the groups below it are saturated again. Only markings
+        a group has not expanded yet are imaged. Returns (R, frontier,
+        explored, budget reason); the frontier holds the markings some group
+        has not expanded.
+        """
+        bdd = self.bdd_manager
+        groups = self._event_groups()
+        # expanded[i]: markings already imaged by group i
+        expanded = [bdd.false] * len(groups)
+        reason = None
+        i = 0
+        while i < len(groups) and reason is None:
+            frontier = R & ~expanded[i]
+            changed = False
+            while frontier != bdd.false:
+                expanded[i] = R
+                new = bdd.false
+                for event in groups[i]:
+                    new |= self._event_image(event, frontier)
+                frontier = new & ~R
+                if frontier != bdd.false:
+                    R = R | frontier
+                    changed = True
+                self.peak_nodes = max(self.peak_nodes, len(bdd))
+                if budget is not None:
+                    states = R.count(nvars=nvars) if budget.max_states is not None else None
+                    reason = budget.exceeded(states=states, bdd_nodes=len(bdd))
+                    if reason is not None:
+                        break
+            i = 0 if changed and i > 0 else i + 1
+
+        closed = R
+        for done in expanded:
+            closed &= done
+        if reason is None:
+            return R, bdd.false, R.count(nvars=nvars), None
+        return R, R & ~closed, closed.count(nvars=nvars), reason
 
     # helper that returns set/list of Marking objects from a reachable-bdd using only current vars ################extract helper###################
     def _extract_markings_from_bdd(self, reachable_bdd, places):
@@ -6,5 +6,9 @@ to compute the reachability graph of a Petri net.
 """
 
 from .reachability import ExplicitReachability
+from .external import ExternalReachability
+from .lossy import LossyReachability
+from .sweepline import SweepLineReachability
 
-__all__ = ['ExplicitReachability']
+__all__ = ['ExplicitReachability', 'ExternalReachability', 'LossyReachability',
+           'SweepLineReachability']
@@ -0,0 +1,123 @@
+"""
+Exploration Checkpoints
+
+Periodic snapshots of a state-at-a-time BFS so that a killed exploration can
+be resumed. A checkpoint is a single ``.npz`` file holding
+- states: packed markings in state id order (uint64 rows)
+- sources / fired / targets: the edges found so far as int32 id arrays
+- parents / parent_transitions: the parent pointers of a run recording traces
+- progress: (next state id to expand, BFS depth, first id of the next level)
+- meta: JSON text with the net digest and the exploration settings
+
+Because BFS expands states in id order, the frontier is simply every state
+from ``progress[0]`` on, so no separate queue has to be stored. Files are
+written to a temporary name and renamed, so a crash while saving leaves the
+previous checkpoint intact.
+"""
+
+import json
+import os
+import time
+from array import array
+
+import numpy as np
+
+from .vectorized import num_words, pack_ints, unpack_rows
+
+
+class Checkpoint:
+    """
+    Checkpoint file of one exploration.
+
+    The exploring code hands over its state list and edge arrays with
+    track() and then calls save() whenever due() says so.
+
+    Attributes:
+        path: File the snapshots are written to
+        compiled: CompiledNet being explored
+        interval: Minimum number of seconds between two snapshots
+        meta: Settings stored with (and compared against) every snapshot
+    """
+
+    def __init__(self, path, compiled, interval=60.0, meta=None):
+        self.path = str(path)
+        self.compiled = compiled
+        self.interval = interval
+        self.meta = meta or {}
+        self.states = []
+        self.edges = None
+        self.parents = None
+        self._next = time.monotonic() + interval
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def track(self, states, edges=None, parents=None):
+        """
+        Set the list of packed markings (indexed by state id), the
+        (sources, fired, targets) edge arrays and the (parent id, transition)
+        arrays that save() writes; edges and parents may be None.
+        """
+        self.states = states
+        self.edges = edges
+        self.parents = parents
+
+    def due(self):
+        """True once ``interval`` seconds have passed since the last snapshot."""
+        return time.monotonic() >= self._next
+
+    def save(self, progress):
+        """
+        Write a snapshot of the tracked states and edges.
+
+        Args:
+            progress: (next id to expand, depth, level end) of the BFS
+        """
+        arrays = {
+            'states': pack_ints(self.states, num_words(self.compiled.num_places)),
+            'progress': np.array(progress, dtype=np.int64),
+            'meta': np.array(json.dumps(self.meta)),
+        }
+        groups = ((('sources', 'fired', 'targets'), self.edges),
+                  (('parents', 'parent_transitions'), self.parents))
+        for names, parts in groups:
+            if parts is None:
+                continue
+            for name, part in zip(names, parts):
+                arrays[name] = np.frombuffer(part, dtype=np.int32) if len(part) else \
+                    np.zeros(0, dtype=np.int32)
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.path)
+        self._next = time.monotonic() + self.interval
+
+    def load(self):
+        """
+        Read the snapshot at ``path``.
+
+        Returns:
+            (states, edges, parents, progress): list of packed markings,
+            array('i') (sources, fired, targets) and (parents,
+            parent_transitions) tuples (empty if the snapshot has none) and
+            the progress tuple passed to save()
+
+        Raises:
+            ValueError: If the snapshot was written for a different net or
+                        with different settings
+        """
+        with np.load(self.path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta != self.meta:
+                changed = sorted(key for key in set(meta) | set(self.meta)
+                                 if meta.get(key) != self.meta.get(key))
+                raise ValueError(f"Checkpoint {self.path} does not match this exploration "
+                                 f"(differs in {', '.join(changed)})")
+            states = unpack_rows(data['states'])
+            edges, parents = (
+                tuple(array('i', data[name].astype(np.int32).tobytes()) if name in data
+                      else array('i') for name in names)
+                for names in (('sources', 'fired', 'targets'), ('parents', 'parent_transitions')))
+            progress = tuple(int(value) for value in data['progress'])
+        return states, edges, parents, progress
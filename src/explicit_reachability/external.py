@@ -0,0 +1,266 @@
+"""
+External-Memory Explicit Reachability
+
+Breadth-first exploration for state spaces larger than RAM. The visited set
+is an open-addressing hash table of packed markings stored in a memory-mapped
+file, and every BFS layer is streamed to and from a file on disk. Only one
+chunk of the current layer (and its successors) is held in memory at a time;
+the chunk size is derived from a configurable memory budget.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .vectorized import FrontierBFS, WORD_DTYPE, pack_ints, unpack_rows
+
+_HASH_PRIME = np.uint64(0x100000001B3)
+_HASH_SEED = np.uint64(0xCBF29CE484222325)
+
+
+class DiskHashSet:
+    """
+    Hash set of packed rows in a memory-mapped file (linear probing).
+
+    Each slot holds ``words`` marking words plus one flag word (1 = used).
+    The table doubles into a new file when its load factor exceeds
+    ``max_load``. Insertions and lookups are vectorized over a batch of rows.
+    """
+
+    def __init__(self, path, words, capacity=1 << 16, max_load=0.5):
+        """
+        Args:
+            path: File backing the table (created or truncated)
+            words: uint64 words per packed marking
+            capacity: Initial number of slots (rounded up to a power of two)
+            max_load: Load factor that triggers growth
+        """
+        self.path = path
+        self.words = words
+        self.max_load = max_load
+        self.count = 0
+        self.capacity = 1 << max(4, (capacity - 1).bit_length())
+        self.table = self._create(path, self.capacity)
+
+    def _create(self, path, capacity):
+        return np.memmap(path, dtype=WORD_DTYPE, mode='w+', shape=(capacity, self.words + 1))
+
+    def __len__(self):
+        return self.count
+
+    def _slots(self, rows):
+        """Home slot of every row (FNV-style mix of the words)."""
+        h = np.full(len(rows), _HASH_SEED, dtype=WORD_DTYPE)
+        for w in range(self.words):
+            h = (h ^ rows[:, w]) * _HASH_PRIME
+        h ^= h >> np.uint64(29)
+        return (h & np.uint64(self.capacity - 1)).astype(np.int64)
+
+    def _probe(self, rows, insert):
+        """
+        Look up (and optionally insert) distinct rows.
+
+        Returns:
+            Boolean array: row was already present (insert=False) or was
+            newly inserted (insert=True).
+        """
+        result = np.zeros(len(rows), dtype=bool)
+        slot = self._slots(rows)
+        pending = np.arange(len(rows))
+        mask = self.capacity - 1
+        table, words = self.table, self.words
+
+        while len(pending):
+            s = slot[pending]
+            used = table[s, words] != 0
+            equal = used & (table[s, :words] == rows[pending]).all(axis=1)
+            if not insert:
+                result[pending[equal]] = True
+
+            collided = used & ~equal
+            waiting = []
+            empty = ~used
+            if insert and empty.any():
+                # several rows may race for one empty slot: the first one wins,
+                # the others compare against it on the next round
+                candidates = pending[empty]
+                claimed, first = np.unique(s[empty], return_index=True)
+                winners = candidates[first]
+                table[claimed, :words] = rows[winners]
+                table[claimed, words] = 1
+                result[winners] = True
+                self.count += len(winners)
+                losers = np.ones(len(candidates), dtype=bool)
+                losers[first] = False
+                waiting.append(candidates[losers])
+
+            slot[pending[collided]] = (slot[pending[collided]] + 1) & mask
+            waiting.append(pending[collided])
+            pending = np.concatenate(waiting)
+
+        return result
+
+    def contains(self, rows):
+        """Boolean array telling which (distinct) rows are in the set."""
+        return self._probe(rows, insert=False)
+
+    def add(self, rows):
+        """Insert distinct rows; return a boolean array marking the new ones."""
+        if (self.count + len(rows)) > self.max_load * self.capacity:
+            self._grow(self.count + len(rows))
+        return self._probe(rows, insert=True)
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while needed > self.max_load * capacity:
+            capacity *= 2
+
+        old_table, old_path = self.table, self.path
+        self.path = old_path + '.grow'
+        self.capacity = capacity
+        self.table = self._create(self.path, capacity)
+        self.count = 0
+        for start in range(0, len(old_table), 1 << 16):
+            block = old_table[start:start + (1 << 16)]
+            used = block[:, self.words] != 0
+            if used.any():
+                self._probe(np.ascontiguousarray(block[used, :self.words]), insert=True)
+
+        del old_table
+        os.replace(self.path, old_path)
+        self.path = old_path
+
+    def iter_rows(self, chunk_rows=1 << 16):
+        """Yield the stored rows chunk by chunk."""
+        for start in range(0, self.capacity, chunk_rows):
+            block = self.table[start:start + chunk_rows]
+            used = block[:, self.words] != 0
+            if used.any():
+                yield np.ascontiguousarray(block[used, :self.words])
+
+    def flush(self):
+        self.table.flush()
+
+
+class ExternalReachability:
+    """
+    States-only explicit reachability with disk-resident visited set and frontier.
+
+    Usage:
+        with ExternalReachability(net, memory_budget=64 * 2**20) as explorer:
+            count = explorer.compute_reachability(net.initial_marking)
+            for marking in explorer.iter_markings():
+                ...
+    """
+
+    def __init__(self, petri_net, directory=None, memory_budget=256 * 2**20):
+        """
+        Args:
+            petri_net: PetriNet to explore
+            directory: Working directory for the table and layer files
+                       (a temporary one, removed by close(), if omitted)
+            memory_budget: Approximate bytes of in-memory working data; bounds
+                           the number of frontier rows expanded per chunk
+        """
+        self.petri_net = petri_net
+        self.compiled = petri_net.compile()
+        self.engine = FrontierBFS(self.compiled)
+        self.words = self.engine.words
+        self.memory_budget = memory_budget
+
+        self._owns_directory = directory is None
+        self.directory = directory if directory is not None else tempfile.mkdtemp(prefix='petri-reach-')
+        os.makedirs(self.directory, exist_ok=True)
+
+        # rough per-row cost of one expansion step: enabled matrix, successors
+        # and their sorted copy for every transition
+        row_cost = WORD_DTYPE.itemsize * self.words * (3 * self.compiled.num_transitions + 4)
+        self.chunk_rows = max(1, memory_budget // row_cost)
+
+        self.visited = None
+        self.state_count = 0
+        self.depth = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _layer_path(self, depth):
+        return os.path.join(self.directory, f'layer-{depth}.bin')
+
+    def _read_layer(self, path):
+        """Yield the rows of a layer file in chunks of at most chunk_rows."""
+        if os.path.getsize(path) == 0:
+            return
+        layer = np.memmap(path, dtype=WORD_DTYPE, mode='r').reshape(-1, self.words)
+        for start in range(0, len(layer), self.chunk_rows):
+            yield np.array(layer[start:start + self.chunk_rows])
+        del layer
+
+    def compute_reachability(self, initial_marking=None):
+        """
+        Explore the state space and return the number of reachable markings.
+        """
+        if initial_marking is None:
+            initial_marking = self.petri_net.initial_marking
+        initial = pack_ints([self.compiled.encode(initial_marking)], self.words)
+
+        if self.visited is not None:
+            del self.visited
+        self.visited = DiskHashSet(os.path.join(self.directory, 'visited.bin'), self.words)
+        self.visited.add(initial)
+
+        layer_path = self._layer_path(0)
+        initial.tofile(layer_path)
+        self.depth = 0
+
+        while True:
+            next_path = self._layer_path(self.depth + 1)
+            written = 0
+            with open(next_path, 'wb') as out:
+                for chunk in self._read_layer(layer_path):
+                    _, _, succ = self.engine.successors(chunk)
+                    if not len(succ):
+                        continue
+                    succ = np.unique(succ, axis=0)
+                    new_rows = succ[self.visited.add(succ)]
+                    new_rows.tofile(out)
+                    written += len(new_rows)
+
+            os.remove(layer_path)
+            if written == 0:
+                os.remove(next_path)
+                break
+            layer_path = next_path
+            self.depth += 1
+
+        self.visited.flush()
+        self.state_count = len(self.visited)
+        return self.state_count
+
+    def iter_markings(self):
+        """Yield every reachable marking as a BitMarking (after compute_reachability)."""
+        if self.visited is None:
+            return
+        for rows in self.visited.iter_rows(self.chunk_rows):
+            for bits in unpack_rows(rows):
+                yield self.compiled.decode(bits)
+
+    def is_reachable(self, marking):
+        """Check membership of a Marking or dict (after compute_reachability)."""
+        if self.visited is None:
+            return False
+        row = pack_ints([self.compiled.encode(marking)], self.words)
+        return bool(self.visited.contains(row)[0])
+
+    def close(self):
+        """Release the memory map and remove a temporary working directory."""
+        if self.visited is not None:
+            del self.visited
+            self.visited = None
+        if self._owns_directory and os.path.isdir(self.directory):
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,144 @@
+"""
+Compact Reachability Graph
+
+CSR storage for explicit reachability graphs: states are int32 ids, their
+packed markings live in one uint64 array and the edges of state ``i`` are
+``indices[indptr[i]:indptr[i + 1]]`` (target ids) with the matching
+``transition_index`` entries. This costs a few bytes per edge instead of a
+Python dict entry with a string key and a Marking reference.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from .vectorized import num_words, pack_ints, unpack_rows, _as_keys
+
+
+class CompactGraph:
+    """
+    Reachability graph in CSR form.
+
+    Attributes:
+        compiled: CompiledNet the graph was built from
+        states: (n, words) uint64 array of packed markings, row = state id
+        indptr: int64 array of length n + 1
+        indices: int32 array of edge targets
+        transition_index: int32 array of fired transition indices
+                          (``compiled.transitions[k]`` is the transition ID)
+    """
+
+    def __init__(self, compiled, states, indptr, indices, transition_index):
+        self.compiled = compiled
+        self.states = states
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.transition_index = np.asarray(transition_index, dtype=np.int32)
+        self._sorted_keys = None
+        self._sorted_ids = None
+
+    @classmethod
+    def from_edges(cls, compiled, states, sources, transition_index, targets):
+        """
+        Build the CSR arrays from unordered (source, transition, target) id arrays.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind='stable')
+        counts = np.bincount(sources, minlength=len(states))
+        indptr = np.zeros(len(states) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(compiled, states, indptr,
+                   np.asarray(targets)[order], np.asarray(transition_index)[order])
+
+    @classmethod
+    def from_state_bits(cls, compiled, state_bits, indptr, indices, transition_index):
+        """
+        Build from a list of packed markings (Python ints) indexed by state id.
+        """
+        states = pack_ints(state_bits, num_words(compiled.num_places))
+        return cls(compiled, states, indptr, indices, transition_index)
+
+    @classmethod
+    def from_transition_graph(cls, compiled, transition_graph):
+        """
+        Build from a {Marking: {transition_id: Marking}} graph; state ids follow
+        the dict order.
+        """
+        ids = {marking: i for i, marking in enumerate(transition_graph)}
+        t_index = {t: i for i, t in enumerate(compiled.transitions)}
+        sources, fired, targets = [], [], []
+        for marking, edges in transition_graph.items():
+            for t, target in edges.items():
+                sources.append(ids[marking])
+                fired.append(t_index[t])
+                targets.append(ids[target])
+        states = pack_ints([compiled.encode(marking) for marking in transition_graph],
+                           num_words(compiled.num_places))
+        return cls.from_edges(compiled, states, np.array(sources, dtype=np.int64),
+                              fired, targets)
+
+    @property
+    def num_states(self):
+        return len(self.states)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def nbytes(self):
+        """Memory held by the arrays of the graph."""
+        return (self.states.nbytes + self.indptr.nbytes
+                + self.indices.nbytes + self.transition_index.nbytes)
+
+    def marking(self, state_id):
+        """Marking of a state id as a BitMarking."""
+        return self.compiled.decode(unpack_rows(self.states[state_id:state_id + 1])[0])
+
+    def markings(self):
+        """All markings as BitMarkings, in state id order."""
+        return [self.compiled.decode(bits) for bits in unpack_rows(self.states)]
+
+    def state_id(self, marking):
+        """
+        State id of a Marking or dict, or None if it is not in the graph.
+        """
+        if self._sorted_keys is None:
+            keys = _as_keys(self.states)
+            self._sorted_ids = np.argsort(keys, kind='stable')
+            self._sorted_keys = keys[self._sorted_ids]
+        if not len(self._sorted_keys):
+            return None
+        key = _as_keys(pack_ints([self.compiled.encode(marking)], self.states.shape[1]))[0]
+        pos = int(np.searchsorted(self._sorted_keys, key))
+        if pos < len(self._sorted_keys) and self._sorted_keys[pos] == key:
+            return int(self._sorted_ids[pos])
+        return None
+
+    def successors(self, state_id):
+        """(target_ids, transition_indices) of the outgoing edges of a state."""
+        start, end = self.indptr[state_id], self.indptr[state_id + 1]
+        return self.indices[start:end], self.transition_index[start:end]
+
+    def to_scipy(self):
+        """
+        Adjacency matrix as scipy.sparse CSR; entry [i, j] is the number of
+        transitions leading from state i to state j.
+        """
+        n = self.num_states
+        data = np.ones(self.num_edges, dtype=np.int32)
+        matrix = sparse.csr_matrix((data, self.indices, self.indptr), shape=(n, n))
+        matrix.sum_duplicates()
+        return matrix
+
+    def to_dict(self):
+        """Convert to the {Marking: {transition_id: Marking}} form."""
+        markings = self.markings()
+        transitions = self.compiled.transitions
+        indices = self.indices.tolist()
+        fired = self.transition_index.tolist()
+        indptr = self.indptr.tolist()
+        return {
+            marking: {transitions[fired[k]]: markings[indices[k]]
+                      for k in range(indptr[i], indptr[i + 1])}
+            for i, marking in enumerate(markings)
+        }
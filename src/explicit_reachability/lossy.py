@@ -0,0 +1,240 @@
+"""
+Lossy Explicit Reachability
+
+Supertrace-style exploration for models whose exact state set does not fit
+in memory. The visited set is replaced by a fixed-size structure:
+- bitstate hashing: k hash bits per state in a bit array
+- hash compaction: one 64-bit fingerprint per state in an open-addressing table
+
+A hash collision makes a new state look visited, so part of the state space
+may be omitted (never a false state: every reported deadlock is real). The
+search is a DFS over the CompiledNet, so apart from the fixed table memory
+grows with the depth of the state space only. After a run the expected
+number of omitted states and the probability that any state was omitted
+are estimated from the number of stored states.
+"""
+
+import math
+from array import array
+
+_MASK64 = (1 << 64) - 1
+_FNV_SEED = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+
+
+def fingerprint(bits):
+    """64-bit hash of a packed marking (FNV over 64-bit words, splitmix64 finalizer)."""
+    h = _FNV_SEED
+    while True:
+        h = ((h ^ (bits & _MASK64)) * _FNV_PRIME) & _MASK64
+        bits >>= 64
+        if not bits:
+            break
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return h ^ (h >> 31)
+
+
+class BitstateSet:
+    """
+    Bit array visited set: every state sets ``hashes`` bits (double hashing).
+    A state counts as new if at least one of its bits was still clear.
+    """
+
+    def __init__(self, memory_budget, hashes=3):
+        """
+        Args:
+            memory_budget: Bytes of the bit array (rounded down to a power of two)
+            hashes: Number of bits set per state (k)
+        """
+        if hashes < 1:
+            raise ValueError(f"hashes must be at least 1, got {hashes}")
+        size = 1 << max(0, memory_budget.bit_length() - 1)
+        self.array = bytearray(size)
+        self.num_bits = size * 8
+        self.hashes = hashes
+        self.count = 0
+        self.full = False
+
+    def add(self, bits):
+        """Store a packed marking; return True if it was not (seemingly) stored yet."""
+        h1 = fingerprint(bits)
+        h2 = ((h1 >> 32) | (h1 << 32)) & _MASK64 | 1
+        mask = self.num_bits - 1
+        array = self.array
+        new = False
+        for i in range(self.hashes):
+            position = (h1 + i * h2) & mask
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not array[byte] & bit:
+                array[byte] |= bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def expected_omissions(self):
+        """
+        Expected number of states lost to collisions: the i-th stored state is
+        wrongly seen as visited with probability (1 - exp(-k i / m))^k.
+        """
+        k, m, n = self.hashes, self.num_bits, self.count
+        steps = min(n, 1024)
+        if not steps:
+            return 0.0
+        # midpoint rule over [0, n]
+        width = n / steps
+        return width * sum((1 - math.exp(-k * (j + 0.5) * width / m)) ** k
+                           for j in range(steps))
+
+
+class HashCompactSet:
+    """
+    Open-addressing table of 64-bit state fingerprints (linear probing).
+    Once ``max_load`` of the slots are used, new states are dropped (treated
+    as visited, so cycles cannot loop forever) and ``full`` is set.
+    """
+
+    def __init__(self, memory_budget, max_load=0.9):
+        """
+        Args:
+            memory_budget: Bytes of the table (8 per slot, rounded down to a
+                           power of two slots)
+            max_load: Fraction of slots that may be used
+        """
+        slots = 1 << max(4, (memory_budget // 8).bit_length() - 1)
+        self.table = array('Q', bytes(8 * slots))
+        self.mask = slots - 1
+        self.limit = int(max_load * slots)
+        self.count = 0
+        self.full = False
+
+    def add(self, bits):
+        """Store a packed marking; return True if its fingerprint was not stored yet."""
+        fp = fingerprint(bits) or 1  # 0 marks an empty slot
+        table, mask = self.table, self.mask
+        slot = fp & mask
+        while True:
+            stored = table[slot]
+            if stored == fp:
+                return False
+            if not stored:
+                break
+            slot = (slot + 1) & mask
+        if self.count >= self.limit:
+            self.full = True
+            return False
+        table[slot] = fp
+        self.count += 1
+        return True
+
+    def expected_omissions(self):
+        """Expected fingerprint collisions among the stored states (birthday bound)."""
+        n = self.count
+        return n * (n - 1) / 2.0 ** 65
+
+
+class LossyReachability:
+    """
+    Bitstate / hash-compaction DFS for deadlock hunting within a memory budget.
+
+    Usage:
+        lossy = LossyReachability(net, method='bitstate', memory_budget=64 * 2**20)
+        lossy.compute_reachability()
+        print(lossy.state_count, lossy.deadlocks, lossy.omission_probability())
+    """
+
+    METHODS = ('bitstate', 'hashcompact')
+
+    def __init__(self, petri_net, method='bitstate', memory_budget=16 * 2**20, hashes=3):
+        """
+        Args:
+            petri_net: PetriNet to explore
+            method: 'bitstate' or 'hashcompact'
+            memory_budget: Bytes of the visited structure
+            hashes: Bits per state in bitstate mode
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown lossy method {method}; expected one of {self.METHODS}")
+        self.petri_net = petri_net
+        self.compiled = petri_net.compile()
+        self.method = method
+        self.memory_budget = memory_budget
+        self.hashes = hashes
+
+        self.visited = None
+        self.state_count = 0
+        self.deadlocks = []
+        self.depth_reached = 0
+
+    def _new_visited(self):
+        if self.method == 'bitstate':
+            return BitstateSet(self.memory_budget, self.hashes)
+        return HashCompactSet(self.memory_budget)
+
+    def compute_reachability(self, initial_marking=None, max_deadlocks=None):
+        """
+        Explore the state space and return the number of states stored.
+
+        Deadlocks found on the way are collected in ``deadlocks``; the search
+        stops early once ``max_deadlocks`` of them have been found.
+        """
+        if initial_marking is None:
+            initial_marking = self.petri_net.initial_marking
+        compiled = self.compiled
+        clear, post = compiled.clear, compiled.post
+        child_enabled = compiled.child_enabled
+
+        self.visited = visited = self._new_visited()
+        add = visited.add
+        deadlocks = self.deadlocks = []
+        self.depth_reached = 0
+
+        initial_bits = compiled.encode(initial_marking)
+        add(initial_bits)
+        enabled = compiled.enabled_mask(initial_bits)
+        if not enabled:
+            deadlocks.append(compiled.decode(initial_bits))
+
+        # frames: [marking, enabled mask, transitions still to fire]
+        stack = [[initial_bits, enabled, enabled]] if enabled else []
+        while stack:
+            top = stack[-1]
+            cursor = top[2]
+            if not cursor:
+                stack.pop()
+                continue
+            low = cursor & -cursor
+            top[2] = cursor ^ low
+            t = low.bit_length() - 1
+            new_bits = (top[0] & clear[t]) | post[t]
+            if not add(new_bits):
+                continue
+
+            enabled = child_enabled(new_bits, top[1], t)
+            if enabled:
+                stack.append([new_bits, enabled, enabled])
+                if len(stack) > self.depth_reached:
+                    self.depth_reached = len(stack)
+            else:
+                deadlocks.append(compiled.decode(new_bits))
+                if max_deadlocks is not None and len(deadlocks) >= max_deadlocks:
+                    break
+
+        self.state_count = visited.count
+        return self.state_count
+
+    @property
+    def complete(self):
+        """False if the hash-compaction table ran full during the last run."""
+        return self.visited is not None and not self.visited.full
+
+    def expected_omissions(self):
+        """Estimated number of reachable states the last run missed."""
+        return self.visited.expected_omissions() if self.visited is not None else 0.0
+
+    def omission_probability(self):
+        """Estimated probability that the last run missed at least one state."""
+        if self.visited is not None and self.visited.full:
+            return 1.0
+        return 1.0 - math.exp(-self.expected_omissions())
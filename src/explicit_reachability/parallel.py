@@ -0,0 +1,176 @@
+"""
+Parallel Explicit Reachability
+
+Hash-partitioned, level-synchronous state-space exploration over several
+worker processes. Every packed marking is owned by exactly one worker
+(chosen from a hash of its bits); a worker keeps the visited set of its own
+partition, expands the new states it receives and sends successors owned by
+other workers back in per-destination batches. The coordinating process
+routes the batches between rounds and stops once a round produces no
+messages, so no worker can still receive work.
+
+Workers expand states with the net's generated successor function (see
+utils.codegen); the coordinator generates it first, so every worker finds
+it in memory (fork) or in the on-disk cache (spawn).
+
+A worker that fails sends its exception text instead of a result; one that
+dies without a word is noticed while the coordinator polls for results.
+Either way explore_parallel raises RuntimeError naming the worker.
+"""
+
+import multiprocessing
+import queue
+
+from utils.codegen import load_successors
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_HASH_MASK = (1 << 64) - 1
+# seconds between liveness checks while waiting for worker results
+_POLL_SECONDS = 1.0
+
+
+def owner(bits, workers):
+    """Index of the worker owning packed marking ``bits``."""
+    return (((hash(bits) * _HASH_MULTIPLIER) & _HASH_MASK) >> 32) % workers
+
+
+def _worker_loop(compiled, worker_id, workers, inbox, results, with_edges, cache_dir=None):
+    """
+    Body of one worker process.
+
+    Each inbox message is a batch of candidate markings owned by this worker
+    (or None to stop). The worker handles it together with the successors
+    it kept from its previous round and answers with
+    ``(worker_id, outgoing, has_local_work)`` where ``outgoing[k]`` lists the
+    distinct successors owned by another worker ``k``. On stop it sends its
+    partition and, when requested, the edges (source_bits, transition_index,
+    target_bits) of the states it expanded. An exception is reported as
+    ``(worker_id, None, message)``.
+    """
+    try:
+        _explore_partition(compiled, worker_id, workers, inbox, results, with_edges, cache_dir)
+    except Exception as e:
+        results.put((worker_id, None, f"{type(e).__name__}: {e}"))
+
+
+def _explore_partition(compiled, worker_id, workers, inbox, results, with_edges, cache_dir):
+    visited = set()
+    edges = []
+    local = set()
+    successors = load_successors(compiled, cache_dir)
+
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+
+        local.update(batch)
+        outgoing = [set() for _ in range(workers)]
+        for bits in local:
+            if bits in visited:
+                continue
+            visited.add(bits)
+            for t, new_bits in successors(bits):
+                if with_edges:
+                    edges.append((bits, t, new_bits))
+                outgoing[owner(new_bits, workers)].add(new_bits)
+
+        local = outgoing[worker_id] - visited
+        outgoing[worker_id] = ()
+        results.put((worker_id, [list(out) for out in outgoing], bool(local)))
+
+    results.put((worker_id, list(visited), edges))
+
+
+def _receive(results, processes, waiting):
+    """
+    Next worker message. Raises RuntimeError if a worker reported an error,
+    or if one of the ``waiting`` worker ids died before answering.
+    """
+    while True:
+        try:
+            message = results.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            dead = [k for k in waiting if not processes[k].is_alive()]
+            if not dead:
+                continue
+            try:
+                # it may have answered right before exiting
+                message = results.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                k = dead[0]
+                raise RuntimeError(f"Parallel worker {k} exited without a result "
+                                   f"(exit code {processes[k].exitcode})") from None
+        worker_id, payload, extra = message
+        if payload is None:
+            raise RuntimeError(f"Parallel worker {worker_id} failed: {extra}")
+        return message
+
+
+def explore_parallel(compiled, initial_bits, workers, with_edges=True, cache_dir=None):
+    """
+    Explore the state space of a CompiledNet with ``workers`` processes.
+    ``cache_dir`` is passed to load_successors (False: no disk cache).
+
+    Returns:
+        (states, edges) where ``states`` is a list of packed markings and
+        ``edges`` a list of (source_bits, transition_index, target_bits),
+        or None when ``with_edges`` is False.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    load_successors(compiled, cache_dir)
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker_loop,
+                        args=(compiled, k, workers, inboxes[k], results, with_edges, cache_dir),
+                        daemon=True)
+        for k in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    states, edges = [], [] if with_edges else None
+    try:
+        pending = [[] for _ in range(workers)]
+        pending[owner(initial_bits, workers)].append(initial_bits)
+
+        # one round = every worker handles its routed batch and local work
+        busy = False
+        while busy or any(pending):
+            for k in range(workers):
+                inboxes[k].put(pending[k])
+            pending = [[] for _ in range(workers)]
+            busy = False
+            waiting = set(range(workers))
+            for _ in range(workers):
+                worker_id, outgoing, has_local_work = _receive(results, processes, waiting)
+                waiting.discard(worker_id)
+                busy = busy or has_local_work
+                for k, batch in enumerate(outgoing):
+                    pending[k].extend(batch)
+
+        for inbox in inboxes:
+            inbox.put(None)
+        waiting = set(range(workers))
+        for _ in range(workers):
+            worker_id, partition, partition_edges = _receive(results, processes, waiting)
+            waiting.discard(worker_id)
+            states.extend(partition)
+            if with_edges:
+                edges.extend(partition_edges)
+    except BaseException:
+        # the other workers may be blocked on their inboxes
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    return states, edges
@@ -0,0 +1,53 @@
+"""
+Reachability Queries
+
+Turns the query forms accepted by ExplicitReachability.find_reachable into
+tests on packed markings:
+- a Marking: the full target marking
+- a dict {place: 0/1}: a partial marking, only the listed places are compared
+- a callable: a predicate over markings (receives a BitMarking)
+"""
+
+from utils import Marking
+
+
+class Query:
+    """
+    A reachability query compiled against a CompiledNet.
+
+    Attributes:
+        places: Places the query depends on (None for predicates)
+        care: Mask of those places (None for predicates)
+        value: Mask of the places among them that must be marked
+        matches: Function packed marking (int) -> bool
+    """
+
+    def __init__(self, compiled, query):
+        self.compiled = compiled
+        index = compiled.place_index
+
+        if callable(query) and not isinstance(query, (Marking, dict)):
+            predicate = query
+            decode = compiled.decode
+            self.places = None
+            self.care = self.value = None
+            self.matches = lambda bits: bool(predicate(decode(bits)))
+            return
+
+        if isinstance(query, Marking):
+            # full target: every place of the net is fixed
+            items = {place: query.has_token(place) for place in index.places}
+        elif isinstance(query, dict):
+            items = query
+        else:
+            raise TypeError(f"Unsupported query type {type(query).__name__}")
+
+        unknown = [place for place in items if place not in index]
+        if unknown:
+            raise ValueError(f"Query references unknown places {sorted(unknown)}")
+
+        care = index.mask(items)
+        value = index.mask(place for place, token in items.items() if token)
+        self.places = set(items)
+        self.care, self.value = care, value
+        self.matches = lambda bits: bits & care == value
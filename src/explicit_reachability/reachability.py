@@ -1,5 +1,15 @@
+import time
+import numpy as np
+from array import array
 from collections import deque
-from utils import Marking, PetriNet
+from utils import Marking, PetriNet, ExplorationStatus
+from .checkpoint import Checkpoint
+from .vectorized import FrontierBFS, num_words, pack_ints, unpack_rows
+from .parallel import explore_parallel
+from .stubborn import StubbornSets
+from .graph import CompactGraph
+from .query import Query
+from .scc import SCCAnalysis
 
 
 class ExplicitReachability:
@@ -12,61 +22,675 @@ class ExplicitReachability:
     - Uses BFS (collections.deque with popleft) to be stable and predictable.
     - compute_reachability resets internal reachable_markings and transition_graph
       on each call.
+    - States are explored as ints on the net's CompiledNet; compute_reachability
+      documents the other modes, reductions, graph formats and limits.
     """
 
+    MODES = ('bfs', 'vectorized', 'dfs')
+    SEARCHES = ('bfs', 'dfs', 'iddfs')
+    REDUCTIONS = (None, 'stubborn')
+    GRAPHS = ('dict', 'csr', None)
+
     def __init__(self, petri_net: PetriNet):
         self.petri_net = petri_net
         self.reachable_markings = set()
         self.transition_graph = {}
+        self.compact_graph = None
+        self.unexpanded_markings = set()
+        self.status = None
+        self.parents = None
+        self.parent_transitions = None
+        self._trace_states = None
+        self._trace_ids = None
+        self._run = None
 
-    def compute_reachability(self, initial_marking):
+    def compute_reachability(self, initial_marking, mode='bfs', workers=1,
+                             reduction=None, visible_places=None, graph='dict',
+                             max_depth=None, checkpoint=None, checkpoint_interval=60.0,
+                             resume=False, budget=None, traces=False, cache_dir=None):
         """
         Compute all reachable markings from the initial_marking (or net.initial_marking)
         using BFS and return the set of reachable Marking objects.
+
+        Args:
+            initial_marking: Marking, dict or None (use net.initial_marking)
+            mode: 'bfs' (state-at-a-time), 'vectorized' (layer-at-a-time)
+                  or 'dfs' (depth-first)
+            workers: Number of worker processes for a partitioned 'bfs' run
+            reduction: None (full state space) or 'stubborn' (partial-order
+                       reduction, 'bfs'/'dfs' with one worker only). The
+                       reduced state space keeps every deadlock.
+            visible_places: With reduction, places whose reachable valuations
+                            must also be preserved (e.g. those of a predicate)
+            graph: 'dict' (transition_graph), 'csr' (compact_graph) or None
+                   (states only, no edges are stored)
+            max_depth: Only explore markings reachable in at most max_depth
+                       firings ('bfs'/'dfs' with one worker, no reduction);
+                       those at the bound go to unexpanded_markings
+            checkpoint: Path of a checkpoint file written every
+                        checkpoint_interval seconds and when the run ends
+                        (single-process 'bfs' only)
+            resume: Continue from the checkpoint file if it exists; it must
+                    have been written for the same net and settings
+            budget: Optional Budget (not with multiple workers); a run it
+                    stops returns the markings found so far, adds the
+                    unexpanded ones to unexpanded_markings, sets status
+                    and also leaves a checkpoint to resume from
+            traces: Record parent pointers for trace_to() (not with multiple
+                    workers); traces are shortest in 'bfs'/'vectorized' mode
+            cache_dir: With multiple workers, directory of the generated
+                       successor code (default: $PETRI_CODEGEN_CACHE or the
+                       user cache directory); False keeps it in memory only
         """
-        # Normalize input initial marking
-        if initial_marking is None:
-            initial = self.petri_net.initial_marking
-        else:
-            if isinstance(initial_marking, dict):
-                initial = Marking(initial_marking)
-            elif isinstance(initial_marking, Marking):
-                initial = initial_marking.copy()
-            else:
-                # try to accept other types that behave like Marking
-                initial = initial_marking
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown exploration mode {mode}; expected one of {self.MODES}")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if workers > 1 and mode != 'bfs':
+            raise ValueError(f"Mode {mode} does not support multiple workers")
+        if reduction not in self.REDUCTIONS:
+            raise ValueError(f"Unknown reduction {reduction}; expected one of {self.REDUCTIONS}")
+        if reduction is not None and (mode == 'vectorized' or workers > 1):
+            raise ValueError("Reduction is only supported by single-process 'bfs'/'dfs' modes")
+        if graph not in self.GRAPHS:
+            raise ValueError(f"Unknown graph format {graph}; expected one of {self.GRAPHS}")
+        if max_depth is not None and (mode == 'vectorized' or workers > 1):
+            raise ValueError("max_depth is only supported by single-process 'bfs'/'dfs' modes")
+        self._check_depth_bound(max_depth, reduction)
+        if checkpoint is not None and (mode != 'bfs' or workers > 1):
+            raise ValueError("Checkpoints are only supported by single-process 'bfs' mode")
+        if resume and checkpoint is None:
+            raise ValueError("resume requires a checkpoint path")
+        if budget is not None and workers > 1:
+            raise ValueError("Budgets are not supported with multiple workers")
+        if traces and workers > 1:
+            raise ValueError("Traces are not supported with multiple workers")
 
         # Reset state for this run
         self.reachable_markings = set()
         self.transition_graph = {}
+        self.compact_graph = None
+        self.unexpanded_markings = set()
+        self.status = None
+        self.parents = None
+        self.parent_transitions = None
+        self._trace_states = None
+        self._trace_ids = None
+        started = time.monotonic()
+        if budget is not None:
+            budget.start()
+
+        # Explore over packed ints; each state is wrapped as a BitMarking once
+        compiled = self.petri_net.compile()
+        initial_bits = compiled.encode(self._normalize_marking(initial_marking))
+        self._run = (initial_bits, reduction)
+
+        if mode == 'vectorized':
+            self._compute_vectorized(compiled, initial_bits, graph, budget, traces)
+        elif workers > 1:
+            self._compute_parallel(compiled, initial_bits, workers, graph, cache_dir)
+        else:
+            self._compute_state_at_a_time(compiled, initial_bits, mode, reduction, visible_places,
+                                          graph, max_depth, checkpoint, checkpoint_interval,
+                                          resume, budget, traces)
+        self.status.elapsed = time.monotonic() - started
+        return self.reachable_markings
+
+    def _compute_state_at_a_time(self, compiled, initial_bits, mode, reduction, visible_places,
+                                 graph, max_depth, checkpoint, checkpoint_interval, resume, budget,
+                                 traces=False):
+        """'bfs'/'dfs' runs, with optional reduction, checkpoint, budget and traces."""
+        stubborn = None
+        if reduction == 'stubborn':
+            stubborn = StubbornSets(compiled, visible_places)
+        states = [initial_bits]
+        edges = (array('i'), array('i'), array('i')) if graph is not None else None
+        # the initial state has no parent
+        parents = (array('i', [-1]), array('i', [-1])) if traces else None
+        if checkpoint is None:
+            search = self._search(mode, compiled, initial_bits, states, stubborn, max_depth, parents)
+            self._compute_search(compiled, states, search, graph, edges, budget,
+                                 progress=(0, 0, 1) if mode == 'bfs' else None)
+            return self._keep_traces(states, parents)
+
+        meta = {
+            'net': compiled.digest(),
+            'initial': format(initial_bits, 'x'),
+            'reduction': reduction,
+            'visible_places': sorted(visible_places) if reduction and visible_places else None,
+            'max_depth': max_depth,
+            'edges': edges is not None,
+            'traces': traces,
+        }
+        saver = Checkpoint(checkpoint, compiled, checkpoint_interval, meta)
+        progress = None
+        if resume and saver.exists():
+            states, loaded_edges, loaded_parents, progress = saver.load()
+            if edges is not None:
+                edges = loaded_edges
+            if parents is not None:
+                parents = loaded_parents
+        saver.track(states, edges, parents)
+        search = self._bfs(compiled, initial_bits, states, stubborn, max_depth, parents,
+                           resume=progress, checkpoint=saver)
+        self._compute_search(compiled, states, search, graph, edges, budget,
+                             progress=progress or (0, 0, 1))
+        return self._keep_traces(states, parents)
+
+    def _keep_traces(self, states, parents):
+        """Keep the packed states and parent arrays of a run for trace_to()."""
+        if parents is not None:
+            self._trace_states = states
+            self.parents, self.parent_transitions = parents
+
+    @staticmethod
+    def _check_depth_bound(max_depth, reduction):
+        if max_depth is None:
+            return
+        if max_depth < 0:
+            raise ValueError(f"max_depth must be non-negative, got {max_depth}")
+        if reduction is not None:
+            # reduced state spaces do not preserve shortest depths
+            raise ValueError("max_depth cannot be combined with a reduction")
+
+    def _search(self, mode, compiled, initial_bits, states, stubborn=None, max_depth=None,
+                parents=None):
+        """The _bfs or _dfs generator for a state-at-a-time mode."""
+        if mode == 'bfs':
+            return self._bfs(compiled, initial_bits, states, stubborn, max_depth, parents)
+        if mode == 'dfs':
+            return self._dfs(compiled, initial_bits, states, stubborn, max_depth, parents)
+        raise ValueError(f"Mode {mode} is not a state-at-a-time search")
 
-        queue = deque([initial])
-        self.reachable_markings.add(initial)
-        self.transition_graph[initial] = {}
+    def _normalize_marking(self, marking):
+        """Accept a Marking, dict or None (net.initial_marking)."""
+        if marking is None:
+            return self.petri_net.initial_marking
+        if isinstance(marking, dict):
+            return Marking(marking)
+        # Marking or other types that behave like Marking
+        return marking
+
+    def iter_reachable(self, initial_marking=None, with_edges=False,
+                       reduction=None, visible_places=None, mode='bfs', max_depth=None):
+        """
+        Generator over the reachable markings in search order.
+
+        Markings are produced while the exploration runs, so a consumer can
+        stop early without the full state space ever being built. Unlike
+        compute_reachability this does not touch reachable_markings or
+        transition_graph.
+
+        Args:
+            initial_marking: Marking, dict or None (use net.initial_marking)
+            with_edges: If True, yield (marking, {transition_id: successor})
+                        pairs instead of bare markings (None instead of the
+                        dict for markings left unexpanded at max_depth)
+            reduction, visible_places: As in compute_reachability
+            mode: 'bfs' or 'dfs' (markings then come in post-order)
+            max_depth: As in compute_reachability
+
+        Yields:
+            BitMarking, or (BitMarking, dict) when with_edges is True
+        """
+        if reduction not in self.REDUCTIONS:
+            raise ValueError(f"Unknown reduction {reduction}; expected one of {self.REDUCTIONS}")
+        self._check_depth_bound(max_depth, reduction)
+
+        compiled = self.petri_net.compile()
+        initial_bits = compiled.encode(self._normalize_marking(initial_marking))
+        stubborn = StubbornSets(compiled, visible_places) if reduction == 'stubborn' else None
+
+        states = [initial_bits]
+        markings = []
+        transitions = compiled.transitions
+        for state_id, successors in self._search(mode, compiled, initial_bits, states,
+                                                 stubborn, max_depth):
+            # decode every state discovered so far (children come after parents)
+            markings.extend(compiled.decode(bits) for bits in states[len(markings):])
+            if not with_edges:
+                yield markings[state_id]
+            elif successors is None:
+                yield markings[state_id], None
+            else:
+                yield markings[state_id], {transitions[t]: markings[child]
+                                           for t, child in successors}
+
+    def _compute_search(self, compiled, states, search, graph, edges=None, budget=None,
+                        progress=None):
+        """
+        Drain a _bfs/_dfs generator into reachable_markings and the requested
+        graph. Edges are appended to the (sources, fired, targets) arrays
+        ``edges``, which may already hold those of a resumed run. The budget
+        is checked after every expanded state.
+
+        ``progress`` is the _bfs resume triple the search started from, None
+        for _dfs. BFS expands ids in order, so when the budget stops it the
+        frontier is every id after the last expanded one (including those
+        left at max_depth), whichever session expanded the others.
+        """
+        unexpanded = []
+        next_id = progress[0] if progress is not None else None
+        expanded = array('i') if budget is not None and progress is None else None
+        reason = None
+        if graph is not None:
+            sources, fired, targets = edges
+        for state_id, successors in search:
+            if successors is None:
+                unexpanded.append(state_id)
+                continue
+            if graph is not None:
+                for t, child in successors:
+                    sources.append(state_id)
+                    fired.append(t)
+                    targets.append(child)
+            if budget is not None:
+                if expanded is None:
+                    next_id = state_id + 1
+                else:
+                    expanded.append(state_id)
+                reason = budget.exceeded(states=len(states))
+                if reason is not None:
+                    search.close()
+                    break
+
+        if reason is not None and expanded is None:
+            unexpanded = range(next_id, len(states))
+        elif reason is not None:
+            # every state not expanded yet is part of the frontier
+            done = bytearray(len(states))
+            for state_id in expanded:
+                done[state_id] = 1
+            unexpanded = [state_id for state_id, flag in enumerate(done) if not flag]
+
+        markings = [compiled.decode(bits) for bits in states]
+        if graph == 'csr':
+            packed = pack_ints(states, num_words(compiled.num_places))
+            self.compact_graph = CompactGraph.from_edges(compiled, packed, *edges)
+        elif graph == 'dict':
+            self.transition_graph = self._edges_to_dict(compiled, markings, zip(*edges))
+        self.unexpanded_markings = {markings[state_id] for state_id in unexpanded}
+        self.reachable_markings = set(markings)
+        self.status = ExplorationStatus(reason is None, reason, len(states) - len(unexpanded),
+                                        len(unexpanded))
+        return self.reachable_markings
+
+    def _bfs(self, compiled, initial_bits, states, stubborn=None, max_depth=None, parents=None,
+             resume=None, checkpoint=None):
+        """
+        BFS over state ids, optionally restricted to stubborn sets and to
+        markings at most ``max_depth`` firings away.
+
+        ``states`` is the list of packed markings indexed by state id; it must
+        hold the initial marking and is extended as states are discovered.
+        Ids follow discovery order, which in BFS is also expansion order, so
+        the queue is always the id range from the next state to expand on.
+        ``resume`` = (next id, depth, level end) restarts from that point of
+        an earlier run whose states are in ``states``; ``checkpoint`` gets a
+        save() with the same triple whenever it is due and when BFS ends.
+        ``parents`` = (parent ids, transition indices) arrays, if given, get
+        one entry per discovered state.
+
+        Yields:
+            (state_id, [(transition_index, child_id), ...]) per expanded state,
+            then (state_id, None) for every state left unexpanded at max_depth.
+        """
+        if max_depth == 0:
+            yield 0, None
+            return
+
+        fire_enabled = compiled.fire_enabled
+        child_enabled = compiled.child_enabled
+        # with visible places the reduction needs a cycle proviso: a state
+        # whose reduced successors are not all new is expanded fully
+        proviso = stubborn is not None and stubborn.has_visible_places
+        parent_ids, parent_fired = parents if parents is not None else (None, None)
+
+        # ids are assigned level by level: states below level_end have depth
+        # ``depth``, children of the last level are kept out of the queue
+        start, depth, level_end = resume if resume is not None else (0, 0, 1)
+        expand_children = max_depth is None or depth + 1 < max_depth
+        queue_end = len(states) if expand_children else level_end
+        ids = {bits: state_id for state_id, bits in enumerate(states)}
+        unexpanded = list(range(queue_end, len(states)))
+
+        # Queue entries carry the enabled-transition mask of their marking so
+        # each new state only re-tests the transitions its firing could affect
+        enabled_mask = compiled.enabled_mask
+        queue = deque((state_id, states[state_id], enabled_mask(states[state_id]))
+                      for state_id in range(start, queue_end))
 
         while queue:
-            current = queue.popleft()
-
-            enabled = self.petri_net.get_enabled_transitions(current)
-
-            if enabled:
-                # Explore enabled transitions
-                for t in enabled:
-                    new_marking = self.petri_net.fire_transition(t, current)
-
-                    # Register edge in transition graph
-                    self.transition_graph.setdefault(current, {})
-                    self.transition_graph[current][t] = new_marking
-
-                    # If unseen, add and enqueue
-                    if new_marking not in self.reachable_markings:
-                        self.reachable_markings.add(new_marking)
-                        queue.append(new_marking)
-                        # ensure node exists in graph
-                        self.transition_graph.setdefault(new_marking, {})
-                        
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save((queue[0][0], depth, level_end))
+            state_id, bits, enabled = queue.popleft()
+            if state_id >= level_end:
+                depth, level_end = depth + 1, len(states)
+                expand_children = max_depth is None or depth + 1 < max_depth
+
+            fired = enabled
+            if stubborn is not None and enabled:
+                fired = stubborn.reduce(bits, enabled)
+                if proviso and fired != enabled and any(
+                        new_bits in ids for _, new_bits in fire_enabled(bits, fired)):
+                    fired = enabled
+
+            successors = []
+            for t, new_bits in fire_enabled(bits, fired):
+                child = ids.get(new_bits)
+
+                # If unseen, add and enqueue
+                if child is None:
+                    child = len(states)
+                    ids[new_bits] = child
+                    states.append(new_bits)
+                    if parent_ids is not None:
+                        parent_ids.append(state_id)
+                        parent_fired.append(t)
+                    if expand_children:
+                        queue.append((child, new_bits, child_enabled(new_bits, enabled, t)))
+                    else:
+                        unexpanded.append(child)
+
+                successors.append((t, child))
+
+            try:
+                yield state_id, successors
+            except GeneratorExit:
+                # stopped early (e.g. by a budget): snapshot where BFS stands
+                if checkpoint is not None:
+                    checkpoint.save((queue[0][0] if queue else len(states), depth, level_end))
+                raise
+
+        if checkpoint is not None:
+            checkpoint.save((len(states), depth, level_end))
+        for state_id in unexpanded:
+            yield state_id, None
+
+    def _dfs(self, compiled, initial_bits, states, stubborn=None, max_depth=None, parents=None):
+        """
+        Iterative DFS over state ids with the same contract as _bfs.
+
+        The stack holds one frame per state of the current path with a cursor
+        (the mask of transitions still to fire), so apart from the visited
+        set memory grows with the depth of the state space, not its width.
+        States are yielded when their frame is popped (post-order).
+
+        With ``max_depth`` every state keeps the smallest depth it was reached
+        at; reaching it again on a shorter path expands it again, without
+        reporting its edges twice, so exactly the states of a bounded BFS
+        are found. Its parent pointer then moves to the shorter path.
+        """
+        if max_depth == 0:
+            yield 0, None
+            return
+
+        clear, post = compiled.clear, compiled.post
+        fire_enabled = compiled.fire_enabled
+        child_enabled = compiled.child_enabled
+        proviso = stubborn is not None and stubborn.has_visible_places
+        bounded = max_depth is not None
+        parent_ids, parent_fired = parents if parents is not None else (None, None)
+
+        ids = {initial_bits: 0}
+        depths = [0]
+        unexpanded = set()
+
+        def frame(state_id, bits, enabled, report):
+            # [state id, marking, enabled mask, cursor, reported edges or None]
+            fired = enabled
+            if stubborn is not None and enabled:
+                fired = stubborn.reduce(bits, enabled)
+                if proviso and fired != enabled and any(
+                        new_bits in ids for _, new_bits in fire_enabled(bits, fired)):
+                    fired = enabled
+            return [state_id, bits, enabled, fired, [] if report else None]
+
+        stack = [frame(0, initial_bits, compiled.enabled_mask(initial_bits), True)]
+
+        while stack:
+            top = stack[-1]
+            cursor = top[3]
+            if not cursor:
+                stack.pop()
+                if top[4] is not None:
+                    yield top[0], top[4]
+                continue
+
+            low = cursor & -cursor
+            top[3] = cursor ^ low
+            t = low.bit_length() - 1
+            new_bits = (top[1] & clear[t]) | post[t]
+            depth = len(stack)
+            child = ids.get(new_bits)
+
+            if child is None:
+                child = len(states)
+                ids[new_bits] = child
+                states.append(new_bits)
+                if parent_ids is not None:
+                    parent_ids.append(top[0])
+                    parent_fired.append(t)
+                if bounded:
+                    depths.append(depth)
+                if bounded and depth >= max_depth:
+                    unexpanded.add(child)
+                else:
+                    stack.append(frame(child, new_bits, child_enabled(new_bits, top[2], t), True))
+            elif bounded and depth < depths[child]:
+                # shorter path: re-expand so the bound applies to shortest depths
+                depths[child] = depth
+                if parent_ids is not None:
+                    parent_ids[child] = top[0]
+                    parent_fired[child] = t
+                if depth < max_depth:
+                    report = child in unexpanded
+                    unexpanded.discard(child)
+                    stack.append(frame(child, new_bits, child_enabled(new_bits, top[2], t), report))
+
+            if top[4] is not None:
+                top[4].append((t, child))
+
+        for state_id in sorted(unexpanded):
+            yield state_id, None
+
+    @staticmethod
+    def _edges_to_dict(compiled, markings, edges):
+        """{Marking: {transition_id: Marking}} from (source, transition, target) id triples."""
+        transitions = compiled.transitions
+        graph = {marking: {} for marking in markings}
+        for source, t, target in edges:
+            graph[markings[source]][transitions[t]] = markings[target]
+        return graph
+
+    def _compute_vectorized(self, compiled, initial_bits, graph, budget=None, traces=False):
+        """Layer-at-a-time exploration; fills the same containers as BFS."""
+        engine = FrontierBFS(compiled)
+        states, edges = engine.explore(initial_bits, with_edges=graph is not None, budget=budget,
+                                       with_parents=traces)
+
+        if graph == 'csr':
+            self.compact_graph = CompactGraph.from_edges(compiled, states, *edges)
+
+        state_bits = unpack_rows(states)
+        markings = [compiled.decode(bits) for bits in state_bits]
+        if traces:
+            self._keep_traces(state_bits, (engine.parents, engine.parent_transitions))
+        if graph == 'dict':
+            src, fired, dst = (part.tolist() for part in edges)
+            self.transition_graph = self._edges_to_dict(compiled, markings, zip(src, fired, dst))
+
+        unexpanded = engine.unexpanded_ids.tolist()
+        self.unexpanded_markings = {markings[state_id] for state_id in unexpanded}
+        self.reachable_markings = set(markings)
+        self.status = ExplorationStatus(engine.stop_reason is None, engine.stop_reason,
+                                        len(markings) - len(unexpanded), len(unexpanded))
         return self.reachable_markings
 
+    def _compute_parallel(self, compiled, initial_bits, workers, graph, cache_dir=None):
+        """Partitioned multi-process exploration; fills the same containers as BFS."""
+        states, edges = explore_parallel(compiled, initial_bits, workers,
+                                         with_edges=graph is not None, cache_dir=cache_dir)
+
+        markings = [compiled.decode(bits) for bits in states]
+        if graph is not None:
+            ids = {bits: i for i, bits in enumerate(states)}
+            id_edges = [(ids[src], t, ids[dst]) for src, t, dst in edges]
+            if graph == 'csr':
+                src, fired, dst = zip(*id_edges) if id_edges else ((), (), ())
+                self.compact_graph = CompactGraph.from_edges(
+                    compiled, pack_ints(states, num_words(compiled.num_places)), src, fired, dst)
+            else:
+                self.transition_graph = self._edges_to_dict(compiled, markings, id_edges)
+
+        self.reachable_markings = set(markings)
+        self.status = ExplorationStatus(explored=len(markings))
+        return self.reachable_markings
+
+    def find_reachable(self, query, initial_marking=None, reduction=None, visible_places=None,
+                       mode='bfs', max_depth=None):
+        """
+        On-the-fly reachability check: a search that stops at the first
+        marking satisfying ``query``.
+
+        Args:
+            query: Marking (full target), dict {place: 0/1} (partial marking,
+                   only listed places compared) or callable(marking) -> bool
+            initial_marking: Marking, dict or None (use net.initial_marking)
+            reduction: None or 'stubborn'. For target/partial markings the
+                       queried places are kept visible automatically; a
+                       predicate needs ``visible_places``.
+            visible_places: Places a predicate depends on (with reduction)
+            mode: 'bfs', 'dfs' or 'iddfs' (iterative deepening: depth-bounded
+                  DFS runs with bound 0, 1, 2, ... until a witness is found
+                  or the bound no longer cuts off any state)
+            max_depth: Only search markings at most max_depth firings away
+                       (for 'iddfs': the largest bound tried)
+
+        Returns:
+            The witness marking (BitMarking), or None if no reachable
+            marking satisfies the query. 'bfs' and 'iddfs' return a closest
+            witness.
+        """
+        if reduction not in self.REDUCTIONS:
+            raise ValueError(f"Unknown reduction {reduction}; expected one of {self.REDUCTIONS}")
+        if mode not in self.SEARCHES:
+            raise ValueError(f"Unknown search mode {mode}; expected one of {self.SEARCHES}")
+        self._check_depth_bound(max_depth, reduction)
+        if mode == 'iddfs' and reduction is not None:
+            raise ValueError("Iterative deepening cannot be combined with a reduction")
+
+        compiled = self.petri_net.compile()
+        initial_bits = compiled.encode(self._normalize_marking(initial_marking))
+        query = Query(compiled, query)
+
+        stubborn = None
+        if reduction == 'stubborn':
+            visible = query.places if query.places is not None else visible_places
+            if visible is None:
+                raise ValueError("Reduction with a predicate query requires visible_places")
+            stubborn = StubbornSets(compiled, visible)
+
+        if mode != 'iddfs':
+            witness, _ = self._first_match(compiled, initial_bits, query.matches,
+                                           mode, stubborn, max_depth)
+            return witness
+
+        bound = 0
+        while max_depth is None or bound <= max_depth:
+            witness, cut_off = self._first_match(compiled, initial_bits, query.matches,
+                                                 'dfs', None, bound)
+            if witness is not None or not cut_off:
+                return witness
+            bound += 1
+        return None
+
+    def _first_match(self, compiled, initial_bits, matches, mode, stubborn, max_depth):
+        """
+        Run one search until a state satisfies ``matches``.
+
+        Returns:
+            (witness BitMarking or None, whether the depth bound left states
+            unexpanded before the search stopped)
+        """
+        states = [initial_bits]
+        search = self._search(mode, compiled, initial_bits, states, stubborn, max_depth)
+        checked = 0
+        cut_off = False
+        while True:
+            # test states as soon as they are discovered
+            for bits in states[checked:]:
+                if matches(bits):
+                    return compiled.decode(bits), cut_off
+            checked = len(states)
+            step = next(search, None)
+            if step is None:
+                return None, cut_off
+            cut_off = cut_off or step[1] is None
+
+    def check_invariant(self, predicate, initial_marking=None, reduction=None, visible_places=None):
+        """
+        On-the-fly invariant check: stops at the first reachable marking
+        violating ``predicate``.
+
+        Returns:
+            A counterexample marking (BitMarking), or None if the invariant
+            holds in every reachable marking.
+        """
+        return self.find_reachable(lambda marking: not predicate(marking), initial_marking,
+                                   reduction=reduction, visible_places=visible_places)
+
+    def trace_to(self, target):
+        """
+        Firing sequence from the initial marking to ``target`` (Marking or
+        dict), rebuilt from the parent pointers of the last
+        compute_reachability(..., traces=True) run in O(depth).
+
+        Returns:
+            List of transition IDs (empty for the initial marking), or None
+            if the run did not reach ``target``
+
+        Raises:
+            RuntimeError: If the last run did not record traces
+        """
+        if self._trace_states is None:
+            raise RuntimeError("Call compute_reachability(..., traces=True) before trace_to()")
+        compiled = self.petri_net.compile()
+        if self._trace_ids is None:
+            self._trace_ids = {bits: state_id for state_id, bits in enumerate(self._trace_states)}
+
+        state_id = self._trace_ids.get(compiled.encode(self._normalize_marking(target)))
+        if state_id is None:
+            return None
+        trace = []
+        while state_id > 0:
+            trace.append(compiled.transitions[self.parent_transitions[state_id]])
+            state_id = int(self.parents[state_id])
+        trace.reverse()
+        return trace
+
+    def analyze_sccs(self):
+        """
+        SCCAnalysis of the graph built by the last compute_reachability run
+        (graph='csr' or 'dict').
+
+        Raises:
+            RuntimeError: If no graph was built
+            ValueError: If the run was reduced, depth-bounded or stopped by
+                        its budget, so the graph is not the full one
+        """
+        if self._run is None or (self.compact_graph is None and not self.transition_graph):
+            raise RuntimeError("Call compute_reachability(..., graph='csr') before analyze_sccs()")
+        initial_bits, reduction = self._run
+        if reduction is not None or self.unexpanded_markings:
+            raise ValueError("SCC analysis needs the full state space "
+                             "(no reduction, max_depth or budget stop)")
+        compiled = self.petri_net.compile()
+        graph = self.compact_graph
+        if graph is None:
+            graph = CompactGraph.from_transition_graph(compiled, self.transition_graph)
+        return SCCAnalysis(graph, graph.state_id(compiled.decode(initial_bits)))
+
     def is_reachable(self, target_marking):
         """
         Check if a marking is reachable (after compute_reachability has been run).
@@ -81,6 +705,33 @@ class ExplicitReachability:
 
         return target in self.reachable_markings
 
+    def get_deadlocks(self):
+        """
+        Return the explored markings without outgoing edges (dead markings),
+        from transition_graph or, after graph='csr', from compact_graph.
+        Also valid after a stubborn-set reduced run, which keeps all deadlocks.
+        Markings left unexpanded at max_depth are not reported.
+
+        Raises:
+            RuntimeError: If the last run built no graph (graph=None)
+        """
+        if self.compact_graph is not None:
+            graph = self.compact_graph
+            dead = np.flatnonzero(np.diff(graph.indptr) == 0)
+            return [m for m in (graph.marking(int(state_id)) for state_id in dead)
+                    if m not in self.unexpanded_markings]
+        if not self.transition_graph:
+            raise RuntimeError("Call compute_reachability(..., graph='dict' or 'csr') "
+                               "before get_deadlocks()")
+        return [m for m, edges in self.transition_graph.items()
+                if not edges and m not in self.unexpanded_markings]
+
+    def get_compact_graph(self):
+        """
+        Return the CompactGraph built by compute_reachability(..., graph='csr').
+        """
+        return self.compact_graph
+
     def get_transition_graph(self):
         """
         Return the transition graph mapping:
@@ -0,0 +1,163 @@
+"""
+Strongly Connected Components of a Reachability Graph
+
+Iterative Tarjan over a CompactGraph (CSR), so deep state spaces cannot hit
+the recursion limit and no per-state Python objects are built. On top of
+the components:
+- terminal SCCs: components without an edge leaving them; every run of the
+  net eventually stays inside one of them
+- home states: a state reachable from every state, i.e. a member of the
+  terminal SCC when there is exactly one (the net is reversible if the
+  initial marking is a home state)
+- dead transitions never fire; live transitions fire inside every terminal
+  SCC and so can fire again from every reachable marking
+
+Everything is linear in the number of states plus edges.
+"""
+
+import numpy as np
+
+
+def strongly_connected_components(indptr, indices):
+    """
+    Tarjan's algorithm with an explicit stack of edge cursors.
+
+    Args:
+        indptr, indices: CSR adjacency of the graph
+
+    Returns:
+        (labels, count): int32 component id per state and the number of
+        components; ids are in reverse topological order (a component only
+        has edges into components with smaller or equal ids)
+    """
+    n = len(indptr) - 1
+    indptr = np.asarray(indptr).tolist()
+    indices = np.asarray(indices).tolist()
+    order = [-1] * n      # discovery index
+    low = [0] * n
+    labels = [-1] * n     # visited states without a label are on the stack
+    stack = []
+    count = 0
+    counter = 0
+
+    for root in range(n):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        # frames: [state, position of the next edge]
+        calls = [[root, indptr[root]]]
+        while calls:
+            frame = calls[-1]
+            v, pos = frame
+            end = indptr[v + 1]
+            while pos < end:
+                w = indices[pos]
+                pos += 1
+                if order[w] == -1:
+                    break
+                if labels[w] == -1 and order[w] < low[v]:
+                    low[v] = order[w]
+            else:
+                # all edges done: v is finished
+                calls.pop()
+                if low[v] == order[v]:
+                    while True:
+                        w = stack.pop()
+                        labels[w] = count
+                        if w == v:
+                            break
+                    count += 1
+                if calls:
+                    parent = calls[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                continue
+            frame[1] = pos
+            order[w] = low[w] = counter
+            counter += 1
+            stack.append(w)
+            calls.append([w, indptr[w]])
+
+    return np.array(labels, dtype=np.int32), count
+
+
+class SCCAnalysis:
+    """
+    Component structure of a complete reachability graph.
+
+    Attributes:
+        graph: CompactGraph analysed
+        initial: State id of the initial marking
+        labels: int32 component id per state
+        num_components: Number of strongly connected components
+        terminal: Sorted int array of the terminal component ids
+    """
+
+    def __init__(self, graph, initial=0):
+        self.graph = graph
+        self.initial = initial
+        self.labels, self.num_components = strongly_connected_components(graph.indptr,
+                                                                         graph.indices)
+        sources = np.repeat(np.arange(graph.num_states), np.diff(graph.indptr))
+        self._source_labels = self.labels[sources]
+        inside = self._source_labels == self.labels[graph.indices]
+        leaving = np.zeros(self.num_components, dtype=bool)
+        leaving[self._source_labels[~inside]] = True
+        self.terminal = np.flatnonzero(~leaving)
+        self._inside = inside
+
+    def component(self, component_id):
+        """State ids of one component."""
+        return np.flatnonzero(self.labels == component_id)
+
+    def terminal_components(self):
+        """State ids of every terminal component."""
+        return [self.component(c) for c in self.terminal]
+
+    def home_states(self):
+        """State ids reachable from every state (empty with several terminal SCCs)."""
+        if len(self.terminal) != 1:
+            return np.zeros(0, dtype=np.int64)
+        return self.component(self.terminal[0])
+
+    def is_home_state(self, state_id):
+        return len(self.terminal) == 1 and self.labels[state_id] == self.terminal[0]
+
+    def is_reversible(self):
+        """True if the initial marking can be reached again from every marking."""
+        return self.is_home_state(self.initial)
+
+    def fired_transitions(self, component_id=None):
+        """
+        Transition IDs fired on edges inside a component, or on any edge of
+        the graph if ``component_id`` is None.
+        """
+        fired = self.graph.transition_index
+        if component_id is not None:
+            fired = fired[self._inside & (self._source_labels == component_id)]
+        transitions = self.graph.compiled.transitions
+        return {transitions[t] for t in np.unique(fired).tolist()}
+
+    def dead_transitions(self):
+        """Transition IDs that cannot fire from any reachable marking."""
+        fired = self.fired_transitions()
+        return [t for t in self.graph.compiled.transitions if t not in fired]
+
+    def live_transitions(self):
+        """Transition IDs that can fire again from every reachable marking."""
+        live = set(self.graph.compiled.transitions)
+        for c in self.terminal.tolist():
+            live &= self.fired_transitions(c)
+        return [t for t in self.graph.compiled.transitions if t in live]
+
+    def terminal_liveness(self):
+        """{terminal component id: (live transition IDs, dead transition IDs)} inside it."""
+        transitions = self.graph.compiled.transitions
+        result = {}
+        for c in self.terminal.tolist():
+            fired = self.fired_transitions(c)
+            result[c] = ([t for t in transitions if t in fired],
+                         [t for t in transitions if t not in fired])
+        return result
@@ -0,0 +1,172 @@
+"""
+Sweep-Line Explicit Reachability
+
+Explores states in increasing order of a progress measure and deletes the
+visited states behind the sweep: a state whose progress is below that of
+every unprocessed state can only be reached again over a regress edge (an
+edge to lower progress). So memory grows with the width of the sweep, not
+with the whole state space.
+
+Regress edges are handled as in the generalised sweep-line method: their
+targets become persistent (kept for the whole run) and are the roots of a
+further sweep. For a monotone measure there is a single sweep and every
+state is explored exactly once; otherwise a state may be explored again in
+a later sweep, so state_count is then an upper bound on the number of
+distinct reachable states.
+"""
+
+import heapq
+
+
+def progress_function(compiled, progress):
+    """
+    Function packed marking (int) -> progress value.
+
+    Args:
+        compiled: CompiledNet of the explored net
+        progress: {place: weight} for a linear combination of the marked
+                  places, or a callable receiving a BitMarking
+    """
+    if callable(progress) and not isinstance(progress, dict):
+        decode = compiled.decode
+        return lambda bits: progress(decode(bits))
+    if not isinstance(progress, dict):
+        raise TypeError(f"Unsupported progress measure {type(progress).__name__}")
+
+    index = compiled.place_index
+    unknown = [place for place in progress if place not in index]
+    if unknown:
+        raise ValueError(f"Progress measure references unknown places {sorted(unknown)}")
+    weights = [0] * compiled.num_places
+    for place, weight in progress.items():
+        weights[index.position[place]] = weight
+
+    # per-byte lookup tables: 256 partial sums for each 8 places
+    tables = []
+    for start in range(0, len(weights), 8):
+        chunk = weights[start:start + 8]
+        tables.append([sum(weight for i, weight in enumerate(chunk) if byte >> i & 1)
+                       for byte in range(256)])
+    tables = tuple(enumerate(tables))
+
+    def measure(bits):
+        return sum(table[(bits >> (8 * k)) & 255] for k, table in tables)
+    return measure
+
+
+class SweepLineReachability:
+    """
+    Sweep-line exploration for deadlock detection with bounded memory.
+
+    Usage:
+        sweep = SweepLineReachability(net, {'done': 1, 'stage2': 1})
+        sweep.compute_reachability()
+        print(sweep.state_count, sweep.peak_states, sweep.deadlocks)
+
+    After a run, peak_states is the largest number of states held at once
+    (sweep plus persistent states), sweeps the number of sweeps and
+    regress_states the number of states made persistent by regress edges.
+    """
+
+    def __init__(self, petri_net, progress):
+        """
+        Args:
+            petri_net: PetriNet to explore
+            progress: Progress measure, see progress_function
+        """
+        self.petri_net = petri_net
+        self.compiled = petri_net.compile()
+        self.progress = progress_function(self.compiled, progress)
+
+        self.state_count = 0
+        self.peak_states = 0
+        self.sweeps = 0
+        self.regress_states = 0
+        self.persistent = set()
+        self.deadlocks = []
+
+    @property
+    def monotone(self):
+        """True if the last run met no regress edge (state_count is then exact)."""
+        return self.regress_states == 0
+
+    def compute_reachability(self, initial_marking=None, max_deadlocks=None):
+        """
+        Sweep the state space and return the number of states explored.
+
+        Deadlocks are collected in ``deadlocks``; the search stops early once
+        ``max_deadlocks`` of them have been found.
+        """
+        if initial_marking is None:
+            initial_marking = self.petri_net.initial_marking
+        compiled = self.compiled
+        measure = self.progress
+        fire_enabled = compiled.fire_enabled
+        child_enabled = compiled.child_enabled
+
+        initial_bits = compiled.encode(initial_marking)
+        persistent = self.persistent = {initial_bits}
+        deadlock_bits = set()
+        self.deadlocks = []
+        self.state_count = self.peak_states = self.sweeps = self.regress_states = 0
+
+        roots = [(initial_bits, compiled.enabled_mask(initial_bits))]
+        while roots:
+            self.sweeps += 1
+            # progress value -> states to expand / states seen in this sweep
+            pending = {}
+            visited = {}
+            values = []
+            for bits, enabled in roots:
+                value = measure(bits)
+                if value not in pending:
+                    pending[value] = []
+                    visited[value] = set()
+                    heapq.heappush(values, value)
+                pending[value].append((bits, enabled))
+                visited[value].add(bits)
+            roots = []
+            stored = sum(len(seen) for seen in visited.values())
+
+            while values:
+                value = heapq.heappop(values)
+                bucket = pending.pop(value)
+                seen = visited[value]
+                # states of equal progress join the bucket while it is expanded
+                for bits, enabled in bucket:
+                    self.state_count += 1
+                    if not enabled:
+                        if bits not in deadlock_bits:
+                            deadlock_bits.add(bits)
+                            self.deadlocks.append(compiled.decode(bits))
+                            if max_deadlocks is not None and len(self.deadlocks) >= max_deadlocks:
+                                return self.state_count
+                        continue
+                    for t, new_bits in fire_enabled(bits, enabled):
+                        if new_bits in persistent:
+                            continue
+                        new_value = measure(new_bits)
+                        if new_value < value:
+                            self.regress_states += 1
+                            persistent.add(new_bits)
+                            roots.append((new_bits, child_enabled(new_bits, enabled, t)))
+                            continue
+                        if new_value == value:
+                            target, queue = seen, bucket
+                        elif new_value in visited:
+                            target, queue = visited[new_value], pending[new_value]
+                        else:
+                            target = visited[new_value] = set()
+                            queue = pending[new_value] = []
+                            heapq.heappush(values, new_value)
+                        if new_bits in target:
+                            continue
+                        target.add(new_bits)
+                        queue.append((new_bits, child_enabled(new_bits, enabled, t)))
+                        stored += 1
+                    if stored + len(persistent) > self.peak_states:
+                        self.peak_states = stored + len(persistent)
+                # nothing below the sweep line can be reached without regressing
+                stored -= len(visited.pop(value))
+
+        return self.state_count
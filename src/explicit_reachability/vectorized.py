@@ -0,0 +1,180 @@
+"""
+Vectorized Explicit Reachability
+
+Frontier-at-a-time BFS over packed markings held in NumPy arrays.
+Each BFS layer is a 2-D uint64 array (one row per marking, 64 places per word).
+Enabling is tested for the whole layer against the compiled pre masks in one
+operation, successors are generated in bulk and duplicates are removed by
+sorting the packed rows.
+"""
+
+import numpy as np
+
+WORD_BITS = 64
+WORD_DTYPE = np.dtype('<u8')
+
+
+def num_words(num_places):
+    """Number of uint64 words needed to pack ``num_places`` bits (at least one)."""
+    return max(1, -(-num_places // WORD_BITS))
+
+
+def pack_ints(values, words):
+    """
+    Pack non-negative Python ints into a (len(values), words) uint64 array.
+    """
+    width = words * WORD_DTYPE.itemsize
+    buffer = b''.join(v.to_bytes(width, 'little') for v in values)
+    return np.frombuffer(buffer, dtype=WORD_DTYPE).reshape(len(values), words).copy()
+
+
+def unpack_rows(rows):
+    """
+    Convert packed rows back into Python ints (bit ``i`` = place ``i``).
+    """
+    rows = np.ascontiguousarray(rows, dtype=WORD_DTYPE)
+    return [int.from_bytes(row.tobytes(), 'little') for row in rows]
+
+
+def _as_keys(rows):
+    """View each packed row as one opaque (void) element for sorting/searching."""
+    rows = np.ascontiguousarray(rows)
+    return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+
+class FrontierBFS:
+    """
+    Layer-by-layer BFS over a CompiledNet using NumPy bit matrices.
+
+    State ids are assigned in BFS discovery order (layer by layer, and by
+    packed value inside a layer), so id 0 is always the initial marking.
+    """
+
+    def __init__(self, compiled, max_block=1 << 22):
+        """
+        Args:
+            compiled: CompiledNet to explore
+            max_block: Upper bound on the number of uint64 words touched by one
+                       enabled-matrix computation; the frontier is processed in
+                       chunks so memory stays bounded on wide layers.
+        """
+        self.compiled = compiled
+        self.words = num_words(compiled.num_places)
+        self.pre = pack_ints(compiled.pre, self.words)
+        self.post = pack_ints(compiled.post, self.words)
+        self.clear = ~self.pre
+        self.chunk = max(1, max_block // max(1, compiled.num_transitions * self.words))
+
+    def enabled_matrix(self, frontier):
+        """
+        Boolean (len(frontier), |T|) matrix: entry [i, t] is True when
+        transition ``t`` is enabled in row ``i``.
+        """
+        pre = self.pre[None, :, :]
+        return ((frontier[:, None, :] & pre) == pre).all(axis=2)
+
+    def successors(self, frontier):
+        """
+        Fire every enabled transition of every frontier row.
+
+        Returns:
+            (source_rows, transition_indices, successor_rows)
+        """
+        sources, fired, targets = [], [], []
+        for start in range(0, len(frontier), self.chunk):
+            block = frontier[start:start + self.chunk]
+            rows, ts = np.nonzero(self.enabled_matrix(block))
+            sources.append(rows + start)
+            fired.append(ts)
+            targets.append((block[rows] & self.clear[ts]) | self.post[ts])
+        if not sources:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty, np.empty((0, self.words), dtype=WORD_DTYPE)
+        return np.concatenate(sources), np.concatenate(fired), np.concatenate(targets)
+
+    def explore(self, initial_bits, with_edges=True, budget=None, with_parents=False):
+        """
+        Compute the reachable state space from ``initial_bits``.
+
+        With a Budget the limits are checked before every layer; when one is
+        exhausted the layer is left unexpanded, ``stop_reason`` names the
+        limit and ``unexpanded_ids`` holds the ids of the layer.
+
+        With ``with_parents`` the int32 arrays ``parents`` and
+        ``parent_transitions`` give, per state id, a predecessor on a
+        shortest path and the transition fired from it (-1 for the initial
+        state).
+
+        Returns:
+            (states, edges) where ``states`` is a (n, words) array indexed by
+            state id and ``edges`` is a tuple of int arrays (source_id,
+            transition_index, target_id), or None when ``with_edges`` is False.
+        """
+        frontier = pack_ints([initial_bits], self.words)
+        frontier_ids = np.zeros(1, dtype=np.int64)
+        self.stop_reason = None
+        self.unexpanded_ids = np.empty(0, dtype=np.int64)
+
+        # sorted packed keys of every visited state and their ids
+        visited_keys = _as_keys(frontier).copy()
+        visited_ids = frontier_ids.copy()
+
+        layers = [frontier]
+        edge_parts = []
+        parent_parts = [(np.full(1, -1, dtype=np.int64), np.full(1, -1, dtype=np.int64))]
+        next_id = 1
+
+        while len(frontier):
+            if budget is not None:
+                self.stop_reason = budget.exceeded(states=next_id)
+                if self.stop_reason is not None:
+                    self.unexpanded_ids = frontier_ids
+                    break
+            src, fired, succ = self.successors(frontier)
+            if not len(succ):
+                break
+
+            keys, first, inverse = np.unique(_as_keys(succ), return_index=True,
+                                             return_inverse=True)
+            inverse = inverse.ravel()
+
+            # look the distinct successors up in the visited set
+            pos = np.searchsorted(visited_keys, keys)
+            clipped = np.minimum(pos, len(visited_keys) - 1)
+            found = visited_keys[clipped] == keys
+
+            key_ids = np.empty(len(keys), dtype=np.int64)
+            key_ids[found] = visited_ids[clipped[found]]
+            new = ~found
+            new_count = int(new.sum())
+            new_ids = np.arange(next_id, next_id + new_count, dtype=np.int64)
+            key_ids[new] = new_ids
+            next_id += new_count
+
+            if with_edges:
+                edge_parts.append((frontier_ids[src], fired, key_ids[inverse]))
+            if with_parents:
+                # new ids follow key order; any row producing a key is a parent
+                rows = first[new]
+                parent_parts.append((frontier_ids[src[rows]], fired[rows]))
+
+            # merge new keys into the sorted visited arrays
+            visited_keys = np.insert(visited_keys, pos[new], keys[new])
+            visited_ids = np.insert(visited_ids, pos[new], new_ids)
+
+            frontier = keys[new].view(WORD_DTYPE).reshape(new_count, self.words)
+            frontier_ids = new_ids
+            layers.append(frontier)
+
+        states = np.concatenate(layers)
+        if with_parents:
+            self.parents, self.parent_transitions = (
+                np.concatenate(part).astype(np.int32) for part in zip(*parent_parts))
+        if not with_edges:
+            return states, None
+        if edge_parts:
+            edges = tuple(np.concatenate(part) for part in zip(*edge_parts))
+        else:
+            empty = np.empty(0, dtype=np.int64)
+            edges = (empty, empty, empty)
+        return states, edges
@@ -2,7 +2,7 @@ import time
 from typing import Dict, List, Optional
 import pulp
 from dd import autoref as _bdd
-from utils import Marking
+from utils import Marking, ExplorationStatus
 
 class DeadlockDetector:
     """
@@ -17,6 +17,8 @@ class DeadlockDetector:
         self.manager = bdd_manager
         self.deadlocks: List[Marking] = []
         self.verbose = verbose
+        # ExplorationStatus of the last detect_deadlock call (explored = ILP candidates tested)
+        self.status: Optional[ExplorationStatus] = None
 
         if self.reachable_bdd is None or self.manager is None:
             raise ValueError("reachable_bdd and bdd_manager must be provided")
@@ -24,7 +26,20 @@ class DeadlockDetector:
         # store initial marking as dict {place:0/1}
         self.initial_marking = petri_net.initial_marking.to_dict()
 
-    def detect_deadlock(self) -> Optional[Dict[str, int]]:
+    def detect_deadlock(self, budget=None) -> Optional[Dict[str, int]]:
+        """
+        Return a reachable deadlock marking, or None.
+
+        With a Budget, time and memory are checked before every ILP solve
+        (CBC also gets the remaining time), max_states bounds the number of
+        candidates tested and max_bdd_nodes the BDD manager. When the budget
+        runs out None is returned and status.complete is False.
+        """
+        started = time.time()
+        if budget is not None:
+            budget.start()
+        self.status = ExplorationStatus(explored=0)
+
         # trivial enabledness check
         for t in self.net.transitions:
             if len(list(self.net.arcs[t]["input"])) == 0:
@@ -38,22 +53,27 @@ class DeadlockDetector:
         # marking variables
         x = pulp.LpVariable.dicts("x", list(self.net.places), cat='Binary')
 
-        self.net.get_incidence()  # ensure incidence matrix is computed
+        # sparse incidence matrix C (rows: places, columns: transitions)
+        _, _, C = self.net.get_incidence_matrices('csr')
+        places = list(self.net.get_place_index())
+        transitions = list(self.net.get_transition_index())
 
         # transition firing count variables n[t] ≥ 0, integer
-        n = pulp.LpVariable.dicts("n", list(self.net.transitions),
+        n = pulp.LpVariable.dicts("n", transitions,
                                 lowBound=0, cat='Integer')
 
         # ============================================================
         # 2. Constraints
         # ============================================================
 
-        # State equation constraints: M = M0 + C * n
-        for p in self.net.places:
+        # State equation constraints: M = M0 + C * n (only non-zero entries of each row)
+        for i, p in enumerate(places):
+            start, end = C.indptr[i], C.indptr[i + 1]
             prob += (
                 x[p]
                 == self.initial_marking[p]
-                + pulp.lpSum(self.net.incidence[p][t] * n[t] for t in self.net.transitions)
+                + pulp.lpSum(int(c) * n[transitions[j]]
+                             for j, c in zip(C.indices[start:end], C.data[start:end]))
             )
 
         prob += pulp.lpSum([n[t] for t in self.net.transitions])  # MINIMIZE total firings
@@ -72,14 +92,26 @@ class DeadlockDetector:
         # ITERATIVE CUTTING LOOP
         # ============================================================
         while True:
+            if budget is not None:
+                reason = budget.exceeded(states=iteration, bdd_nodes=len(self.manager))
+                if reason is not None:
+                    self.status = budget.status(reason, iteration)
+                    return None
+
             iteration += 1
 
             # --- Measure ILP Time ---
-            status = prob.solve(pulp.PULP_CBC_CMD(msg=False))
+            solver_options = {}
+            if budget is not None and budget.time_limit is not None:
+                solver_options['timeLimit'] = max(1, int(budget.remaining_time()))
+            status = prob.solve(pulp.PULP_CBC_CMD(msg=False, **solver_options))
             t_ilp_end = time.time()
-                
+            self.status = ExplorationStatus(explored=iteration, elapsed=t_ilp_end - started)
 
             if status != pulp.LpStatusOptimal:
+                # a solve cut short by the time limit proves nothing
+                if budget is not None and budget.exceeded() == 'time':
+                    self.status = budget.status('time', iteration - 1)
                 return None
 
             # extract candidate
@@ -121,5 +153,6 @@ class DeadlockDetector:
         return u == self.manager.true
 
     # ------------------------------------------------------------
-    def is_deadlock_free(self) -> bool:
-        return self.detect_deadlock() is None
\ No newline at end of file
+    def is_deadlock_free(self, budget=None) -> bool:
+        """True only if detect_deadlock ran to completion without finding one."""
+        return self.detect_deadlock(budget) is None and self.status.complete
\ No newline at end of file
@@ -6,16 +6,19 @@ Main entry point for the Petri net analysis tool.
 
 import sys
 import argparse
+import itertools
 import time
 from pathlib import Path
 
 # Import all modules
 from pnml_parser import PNMLParser
-from explicit_reachability import ExplicitReachability
+from explicit_reachability import ExplicitReachability, LossyReachability, SweepLineReachability
 from bdd_reachability import BDDReachability
+from bdd_reachability.ordering import ORDERINGS
 from ilp_deadlock import DeadlockDetector
+from unfolding import Unfolding
 from optimization import MarkingOptimizer
-from utils import PetriNet, Marking
+from utils import PetriNet, Marking, Budget
 
 SRC_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SRC_DIR.parent
@@ -36,12 +39,25 @@ Examples:
   
   # Compute explicit reachability
   python main.py explicit simple-01.pnml
+  python main.py explicit AutonomousCar-PT-04a.pnml --mode vectorized
+  python main.py explicit AutonomousCar-PT-04a.pnml --workers 4
+  python main.py explicit simple-01.pnml --find "p3=1"
+  python main.py explicit AutonomousCar-PT-04a.pnml --mode dfs --max-depth 20
+  python main.py explicit AutonomousCar-PT-04a.pnml --lossy bitstate --memory 4
+  python main.py explicit AutonomousCar-PT-04a.pnml --checkpoint run.npz --resume
+  python main.py explicit AutonomousCar-PT-03a.pnml --liveness
+  python main.py explicit producer_consumer.pnml --progress "produced=1,buffer_full=2"
+  python main.py bdd AutonomousCar-PT-04a.pnml --time-limit 60 --max-rss 2048
   
   # Compute BDD-based reachability
   python main.py bdd simple-01.pnml
   
   # Detect deadlocks
   python main.py deadlock simple-01.pnml
+
+  # Unfold into a complete finite prefix (deadlocks, or a --find query)
+  python main.py unfold AutonomousCar-PT-03a.pnml
+  python main.py unfold simple-02.pnml --find "p3=1"
   
   # Optimize objective over reachable markings
   python main.py optimize simple-01.pnml
@@ -55,7 +71,8 @@ Examples:
         'command',
         nargs='?',
         default=None,
-        choices=['parse', 'explicit', 'bdd', 'deadlock', 'optimize', 'full', 'compare'],
+        choices=['parse', 'explicit', 'bdd', 'deadlock', 'unfold', 'optimize', 'full',
+                 'compare'],
     )
 
     parser.add_argument(
@@ -70,6 +87,181 @@ Examples:
         action='store_true',
         help='Enable verbose output'
     )
+
+    parser.add_argument(
+        '--mode',
+        default='bfs',
+        choices=list(ExplicitReachability.MODES) + ['iddfs'],
+        help='Explicit exploration mode for explicit/compare (default: bfs; iddfs: explicit --find only)'
+    )
+
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=None,
+        help='explicit: only explore markings at most this many firings away (bfs/dfs modes)'
+    )
+
+    parser.add_argument(
+        '--find',
+        default=None,
+        metavar='MARKING',
+        help='explicit/unfold: find a reachable marking matching a partial marking, e.g. "p1=1,p3=0"'
+    )
+
+    parser.add_argument(
+        '--lossy',
+        default=None,
+        choices=list(LossyReachability.METHODS),
+        help='explicit: lossy deadlock sweep with bitstate hashing or hash compaction'
+    )
+
+    parser.add_argument(
+        '--memory',
+        type=int,
+        default=16,
+        metavar='MB',
+        help='explicit --lossy: size of the visited structure in MiB (default: 16)'
+    )
+
+    parser.add_argument(
+        '--progress',
+        metavar='WEIGHTS',
+        default=None,
+        help='explicit: sweep-line deadlock search ordered by place weights, e.g. "p1=1,p2=2"'
+    )
+
+    parser.add_argument(
+        '--liveness',
+        action='store_true',
+        help='explicit: report terminal SCCs, reversibility and dead/live transitions'
+    )
+
+    parser.add_argument(
+        '--checkpoint',
+        default=None,
+        metavar='FILE',
+        help='explicit: periodically save the exploration to FILE (bfs mode)'
+    )
+
+    parser.add_argument(
+        '--checkpoint-interval',
+        type=float,
+        default=60.0,
+        metavar='SECONDS',
+        help='explicit --checkpoint: seconds between snapshots (default: 60)'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='explicit --checkpoint: continue from the saved exploration if FILE exists'
+    )
+
+    parser.add_argument(
+        '--max-states',
+        type=int,
+        default=None,
+        help=('explicit/bdd/deadlock/unfold: stop after this many states '
+              '(ILP candidates for deadlock, events for unfold)')
+    )
+
+    parser.add_argument(
+        '--time-limit',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='explicit/bdd/deadlock/unfold: stop after this many seconds'
+    )
+
+    parser.add_argument(
+        '--max-rss',
+        type=int,
+        default=None,
+        metavar='MB',
+        help='explicit/bdd/deadlock/unfold: stop once the process uses this many MiB'
+    )
+
+    parser.add_argument(
+        '--max-bdd-nodes',
+        type=int,
+        default=None,
+        help='bdd/deadlock: stop once the BDD manager holds this many nodes'
+    )
+
+    parser.add_argument(
+        '--order',
+        default='sorted',
+        choices=list(ORDERINGS),
+        help='bdd/deadlock/optimize/compare: static BDD variable order (default: sorted)'
+    )
+
+    parser.add_argument(
+        '--reorder',
+        action='append',
+        default=[],
+        choices=['relation', 'fixpoint', 'once'],
+        help=('bdd/deadlock/optimize/compare: dynamic sifting while building the relation '
+              'or during the fixpoint, or one sift after the relation (repeatable)')
+    )
+
+    parser.add_argument(
+        '--relation',
+        default='monolithic',
+        choices=list(BDDReachability.RELATIONS),
+        help=('bdd/deadlock/optimize/compare: one transition relation, clusters of '
+              'transitions over their own places, or local updates without next-state '
+              'variables (default: monolithic)')
+    )
+
+    parser.add_argument(
+        '--engine',
+        default='bfs',
+        choices=list(BDDReachability.ENGINES),
+        help=('bdd/deadlock/optimize/compare: breadth-first fixpoint or saturation '
+              '(events fired bottom-up to local fixpoints; default: bfs)')
+    )
+
+    parser.add_argument(
+        '--cluster-size',
+        type=int,
+        default=1000,
+        metavar='NODES',
+        help='--relation partitioned: largest cluster relation in BDD nodes (0: one per transition)'
+    )
+
+    parser.add_argument(
+        '--benchmark-relations',
+        action='store_true',
+        help='compare: also time every relation mode and engine (several extra BDD runs)'
+    )
+
+    parser.add_argument(
+        '--order-cache',
+        action='store_true',
+        help=('bdd/deadlock/optimize/compare: start from and save the final variable order '
+              'in MODEL.order.json next to the PNML file')
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for explicit/compare (bfs mode only, default: 1)'
+    )
+
+    parser.add_argument(
+        '--codegen-cache',
+        metavar='DIR',
+        help=('--workers: directory of the generated successor code '
+              '(default: $PETRI_CODEGEN_CACHE or ~/.cache/petri_net_analysis/codegen)')
+    )
+
+    parser.add_argument(
+        '--no-codegen-cache',
+        action='store_true',
+        help='--workers: keep the generated successor code in memory only'
+    )
     
     return parser.parse_args()
 
@@ -90,7 +282,58 @@ def run_parse(pnml_file, verbose=False):
         print(f"✗ Error parsing PNML file: {e}")
 
 
-def run_explicit_reachability(pnml_file, verbose=False):
+def build_budget(args):
+    """Budget from the limit options, or None if no limit was given."""
+    limits = (args.max_states, args.time_limit, args.max_rss, args.max_bdd_nodes)
+    if all(limit is None for limit in limits):
+        return None
+    max_rss = args.max_rss * 2**20 if args.max_rss is not None else None
+    return Budget(max_states=args.max_states, time_limit=args.time_limit,
+                  max_rss=max_rss, max_bdd_nodes=args.max_bdd_nodes)
+
+
+def print_status(status):
+    """Report a computation stopped by its budget."""
+    if status is not None and not status.complete:
+        print(f"  ⚠ Stopped early ({status.reason} limit): {status.explored} explored, "
+              f"{status.frontier} in frontier")
+
+
+def parse_partial_marking(text):
+    """Parse "p1=1, p2=0" into a partial marking {'p1': 1, 'p2': 0}."""
+    marking = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        if '=' not in part:
+            raise ValueError(f"Expected place=0/1, got '{part.strip()}'")
+        place, value = (item.strip() for item in part.split('=', 1))
+        if value not in ('0', '1'):
+            raise ValueError(f"Token value for {place} must be 0 or 1, got '{value}'")
+        marking[place] = int(value)
+    return marking
+
+
+def parse_weights(text):
+    """Parse "p1=1, p2=-2" into place weights {'p1': 1, 'p2': -2}."""
+    weights = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        if '=' not in part:
+            raise ValueError(f"Expected place=weight, got '{part.strip()}'")
+        place, value = (item.strip() for item in part.split('=', 1))
+        try:
+            weights[place] = int(value)
+        except ValueError:
+            raise ValueError(f"Weight for {place} must be an integer, got '{value}'") from None
+    return weights
+
+
+def run_explicit_reachability(pnml_file, verbose=False, mode='bfs', workers=1, find=None,
+                              max_depth=None, lossy=None, memory=16, checkpoint=None,
+                              checkpoint_interval=60.0, resume=False, budget=None,
+                              liveness=False, progress=None, cache_dir=None):
     """Run explicit BFS reachability analysis."""
     print(f"Computing explicit reachability for: {pnml_file}")
     
@@ -101,18 +344,53 @@ def run_explicit_reachability(pnml_file, verbose=False):
         print(f"✗ Error parsing PNML file: {e}")
         return
     
+    if find is not None:
+        run_explicit_query(petri_net, find, verbose, mode=mode, max_depth=max_depth)
+        return
+    if lossy is not None:
+        run_lossy_reachability(petri_net, lossy, memory, verbose)
+        return
+    if progress is not None:
+        run_sweepline_reachability(petri_net, progress, verbose)
+        return
+    if liveness:
+        run_liveness_analysis(petri_net, verbose, mode=mode, budget=budget)
+        return
+
     try:
         reachability = ExplicitReachability(petri_net)
 
         t0 = time.perf_counter()
-        reachable = reachability.compute_reachability(petri_net.initial_marking)
+        if checkpoint is not None or budget is not None:
+            reachable = reachability.compute_reachability(
+                petri_net.initial_marking, mode=mode, workers=workers, graph=None,
+                max_depth=max_depth, checkpoint=checkpoint,
+                checkpoint_interval=checkpoint_interval, resume=resume, budget=budget)
+            count = len(reachable)
+            sample = list(itertools.islice(reachable, 10))
+        elif mode in ('bfs', 'dfs') and workers == 1:
+            # stream the states: count them and keep a small sample on the way
+            count = 0
+            sample = []
+            for marking in reachability.iter_reachable(petri_net.initial_marking,
+                                                       mode=mode, max_depth=max_depth):
+                if len(sample) < 10:
+                    sample.append(marking)
+                count += 1
+        else:
+            reachable = reachability.compute_reachability(petri_net.initial_marking,
+                                                          mode=mode, workers=workers,
+                                                          graph=None, cache_dir=cache_dir)
+            count = len(reachable)
+            sample = list(itertools.islice(reachable, 10))
         t1 = time.perf_counter()
 
-        print(f"✓ Found {len(reachable)} reachable markings")
+        print(f"✓ Found {count} reachable markings")
         print(f"  Running time: {t1 - t0:.4f}s")
+        print_status(reachability.status)
 
         if verbose:
-            for marking in list(reachable)[:10]:
+            for marking in sample:
                 print(f"  {marking}")
 
     except Exception as e:
@@ -120,7 +398,113 @@ def run_explicit_reachability(pnml_file, verbose=False):
 
 
 
-def run_bdd_reachability(pnml_file, verbose=False):
+def run_explicit_query(petri_net, find, verbose=False, mode='bfs', max_depth=None):
+    """On-the-fly search for a marking matching a partial marking."""
+    try:
+        query = parse_partial_marking(find)
+        reachability = ExplicitReachability(petri_net)
+
+        t0 = time.perf_counter()
+        witness = reachability.find_reachable(query, petri_net.initial_marking,
+                                              mode=mode, max_depth=max_depth)
+        t1 = time.perf_counter()
+
+        if witness is None:
+            print(f"✓ No reachable marking matches {query}")
+        else:
+            print(f"✓ Reachable marking matching {query} found")
+            if verbose:
+                print(f"  Witness: {witness}")
+        print(f"  Running time: {t1 - t0:.4f}s")
+
+    except Exception as e:
+        print(f"✗ Error checking reachability: {e}")
+
+
+def run_liveness_analysis(petri_net, verbose=False, mode='bfs', budget=None):
+    """Terminal SCCs, home state and liveness over the compact reachability graph."""
+    try:
+        reachability = ExplicitReachability(petri_net)
+
+        t0 = time.perf_counter()
+        reachable = reachability.compute_reachability(petri_net.initial_marking, mode=mode,
+                                                      graph='csr', budget=budget)
+        if not reachability.status.complete:
+            print(f"✓ Found {len(reachable)} reachable markings")
+            print_status(reachability.status)
+            print("  ⚠ Liveness needs the full state space; raise the limits")
+            return
+        analysis = reachability.analyze_sccs()
+        t1 = time.perf_counter()
+
+        dead = analysis.dead_transitions()
+        live = analysis.live_transitions()
+        print(f"✓ Found {len(reachable)} reachable markings in {analysis.num_components} SCCs")
+        print(f"  Terminal SCCs: {len(analysis.terminal)}")
+        print(f"  Initial marking is a home state (reversible): {analysis.is_reversible()}")
+        print(f"  Dead transitions: {len(dead)}")
+        print(f"  Live transitions: {len(live)} / {len(petri_net.transitions)}")
+        print(f"  Running time: {t1 - t0:.4f}s")
+
+        if verbose:
+            print(f"  Dead: {dead}")
+            print(f"  Live: {live}")
+
+    except Exception as e:
+        print(f"✗ Error analysing liveness: {e}")
+
+
+def run_sweepline_reachability(petri_net, progress, verbose=False):
+    """Sweep-line deadlock search that forgets states behind the progress measure."""
+    try:
+        sweep = SweepLineReachability(petri_net, parse_weights(progress))
+
+        t0 = time.perf_counter()
+        count = sweep.compute_reachability(petri_net.initial_marking)
+        t1 = time.perf_counter()
+
+        print(f"✓ Explored {count} markings in {sweep.sweeps} sweep(s)")
+        print(f"  Peak stored markings: {sweep.peak_states}")
+        print(f"  Deadlocks found: {len(sweep.deadlocks)}")
+        if not sweep.monotone:
+            print(f"  ⚠ Progress measure not monotone: {sweep.regress_states} regress targets "
+                  f"kept, markings may be counted more than once")
+        print(f"  Running time: {t1 - t0:.4f}s")
+
+        if verbose:
+            for marking in sweep.deadlocks[:10]:
+                print(f"  {marking}")
+
+    except Exception as e:
+        print(f"✗ Error computing reachability: {e}")
+
+
+def run_lossy_reachability(petri_net, method, memory, verbose=False):
+    """Bitstate / hash-compaction deadlock sweep within a fixed memory budget."""
+    try:
+        lossy = LossyReachability(petri_net, method=method, memory_budget=memory * 2**20)
+
+        t0 = time.perf_counter()
+        count = lossy.compute_reachability(petri_net.initial_marking)
+        t1 = time.perf_counter()
+
+        print(f"✓ Visited {count} markings ({method}, {memory} MiB)")
+        print(f"  Deadlocks found: {len(lossy.deadlocks)}")
+        print(f"  Expected omitted markings: {lossy.expected_omissions():.3g}")
+        print(f"  Omission probability: {lossy.omission_probability():.3g}")
+        if not lossy.complete:
+            print("  ⚠ Fingerprint table ran full; increase --memory")
+        print(f"  Running time: {t1 - t0:.4f}s")
+
+        if verbose:
+            for marking in lossy.deadlocks[:10]:
+                print(f"  Deadlock: {marking}")
+
+    except Exception as e:
+        print(f"✗ Error computing reachability: {e}")
+
+
+def run_bdd_reachability(pnml_file, verbose=False, budget=None, bdd_options=None):
     """Run BDD-based symbolic reachability analysis."""
     print(f"Computing BDD-based reachability for: {pnml_file}")
 
@@ -132,15 +516,19 @@ def run_bdd_reachability(pnml_file, verbose=False):
         return
 
     try:
-        bdd_reachability = BDDReachability(petri_net)
+        bdd_reachability = BDDReachability(petri_net, **(bdd_options or {}))
 
         t0 = time.perf_counter()
         bdd_reachability.initialize_bdd()
-        bdd_reachability.compute_symbolic_reachability(petri_net.initial_marking)
+        bdd_reachability.compute_symbolic_reachability(petri_net.initial_marking, budget=budget)
         t1 = time.perf_counter()
 
         print("✓ BDD-based reachability computed")
         print(f"  Running time: {t1 - t0:.4f}s")
+        print_status(bdd_reachability.status)
+        print(f"  Peak BDD nodes: {bdd_reachability.peak_nodes}")
+        if bdd_reachability.order_loaded:
+            print(f"  Variable order loaded from {bdd_reachability.order_file}")
 
         if verbose:
             for marking in list(bdd_reachability.extract_markings())[:10]:
@@ -149,7 +537,7 @@ def run_bdd_reachability(pnml_file, verbose=False):
     except Exception as e:
         print(f"✗ Error computing BDD reachability: {e}")
 
-def run_deadlock_detection(pnml_file, verbose=False):
+def run_deadlock_detection(pnml_file, verbose=False, budget=None, bdd_options=None):
     """Run ILP + BDD deadlock detection."""
     print(f"Detecting deadlocks in: {pnml_file}")
     parser = PNMLParser()
@@ -159,12 +547,16 @@ def run_deadlock_detection(pnml_file, verbose=False):
         print(f"✗ Error parsing PNML file: {e}")
         return
     try:
-        bdd_reachability = BDDReachability(petri_net)
+        bdd_reachability = BDDReachability(petri_net, **(bdd_options or {}))
         bdd_reachability.initialize_bdd()
-        bdd_reachability.compute_symbolic_reachability(petri_net.initial_marking)
+        bdd_reachability.compute_symbolic_reachability(petri_net.initial_marking, budget=budget)
     except Exception as e:
         print(f"✗ Error computing BDD reachability: {e}")
         return
+    if not bdd_reachability.status.complete:
+        print("✗ Reachable set incomplete, deadlock detection skipped")
+        print_status(bdd_reachability.status)
+        return
     try:
         detector = DeadlockDetector(
             petri_net,
@@ -174,11 +566,14 @@ def run_deadlock_detection(pnml_file, verbose=False):
         )
 
         t0 = time.perf_counter()
-        deadlock = detector.detect_deadlock()
+        deadlock = detector.detect_deadlock(budget=budget)
         t1 = time.perf_counter()
         runtime = t1 - t0
 
-        if not deadlock:
+        if not detector.status.complete:
+            print("✗ Deadlock detection stopped early")
+            print_status(detector.status)
+        elif not deadlock:
             print("✓ No deadlocks found")
         else:
             print("✓ Deadlock detected")
@@ -190,7 +585,50 @@ def run_deadlock_detection(pnml_file, verbose=False):
         print(f"✗ Error detecting deadlocks: {e}")
 
 
-def run_optimization(pnml_file, verbose=False):
+def run_unfolding(pnml_file, verbose=False, find=None, budget=None):
+    """Build a complete finite prefix and check deadlock freedom or a reachability query."""
+    print(f"Unfolding: {pnml_file}")
+    parser = PNMLParser()
+    try:
+        petri_net = parser.parse_file(pnml_file)
+    except Exception as e:
+        print(f"✗ Error parsing PNML file: {e}")
+        return
+    try:
+        unfolding = Unfolding(petri_net)
+
+        t0 = time.perf_counter()
+        unfolding.build_prefix(budget=budget)
+        t1 = time.perf_counter()
+        print(f"✓ Prefix: {unfolding.num_events} events, {unfolding.num_conditions} conditions, "
+              f"{unfolding.num_cutoffs} cut-offs")
+        print(f"  Unfolding time: {t1 - t0:.4f}s")
+        print_status(unfolding.status)
+
+        if find is not None:
+            query = parse_partial_marking(find)
+            witness = unfolding.find_reachable(query)
+            found = "found" if witness is not None else "not found"
+        else:
+            witness = unfolding.find_deadlock()
+            found = "Deadlock detected" if witness is not None else "No deadlocks found"
+        t2 = time.perf_counter()
+
+        if find is not None:
+            print(f"✓ Reachable marking matching {query} {found}")
+        else:
+            print(f"✓ {found}")
+        if witness is None and not unfolding.status.complete:
+            print("  ⚠ Prefix incomplete, a negative answer is inconclusive")
+        if verbose and witness is not None:
+            print(f"  Witness: {witness}")
+        print(f"  Query time: {t2 - t1:.4f}s")
+
+    except Exception as e:
+        print(f"✗ Error unfolding: {e}")
+
+
+def run_optimization(pnml_file, verbose=False, bdd_options=None):
     """Run linear objective optimization over reachable states with user-provided weights (one per place)."""
     print(f"Optimizing objective for: {pnml_file}")
     
@@ -207,7 +645,7 @@ def run_optimization(pnml_file, verbose=False):
     
     # 2. Compute BDD Reachability
     try:
-        bdd_solver = BDDReachability(petri_net)
+        bdd_solver = BDDReachability(petri_net, **(bdd_options or {}))
         bdd_solver.initialize_bdd()
         bdd_solver.compute_symbolic_reachability(petri_net.initial_marking)
     except Exception as e:
@@ -306,7 +744,8 @@ def run_full_analysis(pnml_file, verbose=False):
     print("FULL ANALYSIS COMPLETED")
     print("=" * 60)
 
-def run_compare(pnml_file, verbose=False):
+def run_compare(pnml_file, verbose=False, mode='bfs', workers=1, bdd_options=None,
+                benchmark_relations=False, cache_dir=None):
     """Compare explicit vs BDD in time and structural complexity."""
     print(f"Comparing explicit vs BDD for: {pnml_file}")
 
@@ -322,7 +761,9 @@ def run_compare(pnml_file, verbose=False):
         reach = ExplicitReachability(petri_net)
 
         t0 = time.perf_counter()
-        reachable = reach.compute_reachability(petri_net.initial_marking)
+        reachable = reach.compute_reachability(petri_net.initial_marking,
+                                               mode=mode, workers=workers, graph=None,
+                                               cache_dir=cache_dir)
         t1 = time.perf_counter()
         explicit_time = t1 - t0
 
@@ -335,7 +776,7 @@ def run_compare(pnml_file, verbose=False):
 
     # ---- BDD ----
     try:
-        bdd = BDDReachability(petri_net)
+        bdd = BDDReachability(petri_net, **(bdd_options or {}))
 
         t0 = time.perf_counter()
         bdd.initialize_bdd()
@@ -364,6 +805,35 @@ def run_compare(pnml_file, verbose=False):
         print(f"BDD method failed: {e}")
         return
 
+    if benchmark_relations:
+        run_relation_benchmark(petri_net, bdd_options)
+
+
+def run_relation_benchmark(petri_net, bdd_options=None):
+    """Time relation construction and fixpoint with every relation mode and engine."""
+    runs = [(relation, 'bfs') for relation in BDDReachability.RELATIONS]
+    runs += [('monolithic', 'saturation'), ('local', 'saturation')]
+    print("\nBDD RELATIONS")
+    print(f"  {'Relation':<12} {'Engine':<10} {'Parts':>6} {'Nodes':>8} {'Build':>9} "
+          f"{'Fixpoint':>9} {'Peak':>9}")
+    for relation, engine in runs:
+        try:
+            options = dict(bdd_options or {}, relation=relation, engine=engine, order_file=None)
+            bdd = BDDReachability(petri_net, **options)
+
+            t0 = time.perf_counter()
+            bdd.initialize_bdd()
+            t1 = time.perf_counter()
+            bdd.compute_symbolic_reachability(petri_net.initial_marking)
+            t2 = time.perf_counter()
+
+            parts = len(bdd.events or bdd.partitions or bdd.local_updates
+                        or [bdd.transition_relation])
+            print(f"  {relation:<12} {engine:<10} {parts:>6} {bdd.relation_size():>8} "
+                  f"{t1 - t0:>8.4f}s {t2 - t1:>8.4f}s {bdd.peak_nodes:>9}")
+        except Exception as e:
+            print(f"  {relation:<12} {engine:<10} failed: {e}")
+
 def resolve_pnml_path(arg_value: str) -> str:
     """
     Priority:
@@ -421,6 +891,7 @@ def choose_command():
         'explicit',
         'bdd',
         'deadlock',
+        'unfold',
         'optimize',
         'full',
         'compare'
@@ -470,12 +941,47 @@ def main():
         'explicit': run_explicit_reachability,
         'bdd': run_bdd_reachability,
         'deadlock': run_deadlock_detection,
+        'unfold': run_unfolding,
         'optimize': run_optimization,
         'full': run_full_analysis,
         'compare': run_compare
     }
     
-    commands[command](pnml_file, args.verbose)
+    bdd_options = {
+        'ordering': args.order,
+        'sift_relation': 'relation' in args.reorder,
+        'sift_fixpoint': 'fixpoint' in args.reorder,
+        'reorder_once': 'once' in args.reorder,
+        'order_file': str(Path(pnml_file).with_suffix('.order.json')) if args.order_cache else None,
+        'relation': args.relation,
+        'cluster_size': args.cluster_size,
+        'engine': args.engine,
+    }
+    cache_dir = False if args.no_codegen_cache else args.codegen_cache
+
+    # command-specific options
+    options = {
+        'explicit': {'mode': args.mode, 'workers': args.workers, 'find': args.find,
+                     'max_depth': args.max_depth, 'lossy': args.lossy, 'memory': args.memory,
+                     'checkpoint': args.checkpoint,
+                     'checkpoint_interval': args.checkpoint_interval, 'resume': args.resume,
+                     'liveness': args.liveness, 'progress': args.progress,
+                     'cache_dir': cache_dir},
+        'bdd': {'bdd_options': bdd_options},
+        'deadlock': {'bdd_options': bdd_options},
+        'optimize': {'bdd_options': bdd_options},
+        'compare': {'mode': args.mode, 'workers': args.workers, 'bdd_options': bdd_options,
+                    'benchmark_relations': args.benchmark_relations, 'cache_dir': cache_dir},
+        'unfold': {'find': args.find},
+    }
+    budget = build_budget(args)
+    if budget is not None:
+        if command not in ('explicit', 'bdd', 'deadlock', 'unfold'):
+            print(f"⚠ Limits are ignored by the {command} command")
+        else:
+            options.setdefault(command, {})['budget'] = budget
+
+    commands[command](pnml_file, args.verbose, **options.get(command, {}))
 
 
 
@@ -1,8 +1,14 @@
+import json
+import os
+import tempfile
 import unittest
 from pathlib import Path
 from bdd_reachability import BDDReachability
+from bdd_reachability.ordering import ORDERINGS, variable_order, p_semiflows, total_span
+from ilp_deadlock import DeadlockDetector
+from optimization import MarkingOptimizer
 from pnml_parser import PNMLParser
-from utils import PetriNet, Marking
+from utils import PetriNet, Marking, Budget
 
 
 class TestBDDReachabilityBasic(unittest.TestCase):
@@ -412,6 +418,341 @@ class TestBDDEdgeCases(unittest.TestCase):
         self.assertEqual(len(markings), 1)
 
 
+class TestBDDBudget(unittest.TestCase):
+    """Test budgets on symbolic reachability."""
+    
+    def setUp(self):
+        """Set up linear chain p0 -> t0 -> p1 -> ... -> p5."""
+        self.net = PetriNet()
+        for i in range(6):
+            self.net.add_place(f'p{i}', has_token=(i == 0))
+        for i in range(5):
+            self.net.add_transition(f't{i}')
+            self.net.add_arc(f'p{i}', f't{i}')
+            self.net.add_arc(f't{i}', f'p{i+1}')
+        self.bdd_reachability = BDDReachability(self.net)
+    
+    def test_complete_status(self):
+        """Test an unlimited run reports a complete status."""
+        self.bdd_reachability.compute_symbolic_reachability(self.net.initial_marking)
+        status = self.bdd_reachability.status
+        self.assertTrue(status.complete)
+        self.assertEqual((status.explored, status.frontier), (6, 0))
+    
+    def test_state_limit(self):
+        """Test the fixpoint stops with the markings found so far."""
+        reachable = self.bdd_reachability.compute_symbolic_reachability(
+            self.net.initial_marking, budget=Budget(max_states=3))
+        status = self.bdd_reachability.status
+        self.assertEqual(status.reason, 'states')
+        self.assertEqual((status.explored, status.frontier), (2, 1))
+        self.assertEqual(len(self.bdd_reachability.extract_markings(reachable)), 3)
+    
+    def test_node_limit(self):
+        """Test the BDD node ceiling."""
+        self.bdd_reachability.compute_symbolic_reachability(
+            self.net.initial_marking, budget=Budget(max_bdd_nodes=1))
+        self.assertEqual(self.bdd_reachability.status.reason, 'bdd_nodes')
+
+
+class TestVariableOrdering(unittest.TestCase):
+    """Test static variable orders."""
+
+    SAMPLES = Path(__file__).resolve().parents[2] / 'sample_pnml'
+
+    def test_orders_keep_reachable_set(self):
+        """Test every heuristic gives the same markings with p' right below p."""
+        net = PNMLParser().parse_file(str(self.SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        expected = None
+        for ordering in ORDERINGS:
+            bdd_reachability = BDDReachability(net, ordering=ordering)
+            bdd_reachability.initialize_bdd()
+            reachable = bdd_reachability.compute_symbolic_reachability(net.initial_marking)
+            markings = set(bdd_reachability.extract_markings(reachable))
+            if expected is None:
+                expected = markings
+            self.assertEqual(markings, expected, ordering)
+            manager = bdd_reachability.bdd_manager
+            for level, place in enumerate(bdd_reachability.variable_order):
+                self.assertEqual(manager.level_of_var(place), 2 * level)
+                self.assertEqual(manager.level_of_var(place + "'"), 2 * level + 1)
+
+    def test_structural_order_shrinks_bdds(self):
+        """Test the invariant order beats plain sorting on a sample model."""
+        net = PNMLParser().parse_file(str(self.SAMPLES / 'AutonomousCar-PT-03a.pnml'))
+        sizes = {}
+        for ordering in ['sorted', 'invariant']:
+            bdd_reachability = BDDReachability(net, ordering=ordering)
+            bdd_reachability.initialize_bdd()
+            reachable = bdd_reachability.compute_symbolic_reachability(net.initial_marking)
+            sizes[ordering] = (bdd_reachability.transition_relation.dag_size, reachable.dag_size)
+        self.assertLess(sizes['invariant'][0], sizes['sorted'][0])
+        self.assertLess(sizes['invariant'][1], sizes['sorted'][1])
+        self.assertLess(total_span(net, variable_order(net, 'force')),
+                        total_span(net, variable_order(net, 'sorted')))
+
+    def test_p_semiflows(self):
+        """Test the state machine components of two independent cycles."""
+        net = PetriNet()
+        for name in ['a', 'b', 'c', 'd']:
+            net.add_place(name, has_token=name in ('a', 'c'))
+        for t, src, dst in [('t1', 'a', 'b'), ('t2', 'b', 'a'), ('t3', 'c', 'd'), ('t4', 'd', 'c')]:
+            net.add_transition(t)
+            net.add_arc(src, t)
+            net.add_arc(t, dst)
+        self.assertEqual(sorted(p_semiflows(net)), [['a', 'b'], ['c', 'd']])
+        self.assertEqual(variable_order(net, 'invariant'), ['a', 'b', 'c', 'd'])
+
+    def test_explicit_and_invalid_orders(self):
+        """Test explicit place lists and rejected orders."""
+        net = PetriNet()
+        for name in ['p1', 'p2', 'p10']:
+            net.add_place(name)
+        self.assertEqual(variable_order(net, 'sorted'), ['p1', 'p10', 'p2'])
+        self.assertEqual(variable_order(net, 'natural'), ['p1', 'p2', 'p10'])
+        self.assertEqual(variable_order(net, ['p10', 'p2', 'p1']), ['p10', 'p2', 'p1'])
+        with self.assertRaises(ValueError):
+            variable_order(net, 'random')
+        with self.assertRaises(ValueError):
+            variable_order(net, ['p1', 'p2'])
+
+    def test_consumers_follow_order(self):
+        """Test deadlock detection and optimization on a reordered manager."""
+        net = PetriNet()
+        for i in range(4):
+            net.add_place(f'p{i}', has_token=(i == 0))
+        for i in range(3):
+            net.add_transition(f't{i}')
+            net.add_arc(f'p{i}', f't{i}')
+            net.add_arc(f't{i}', f'p{i+1}')
+        solver = BDDReachability(net, ordering=['p3', 'p1', 'p0', 'p2'])
+        solver.initialize_bdd()
+        solver.compute_symbolic_reachability(net.initial_marking)
+        detector = DeadlockDetector(net, solver.reachable_bdd, solver.bdd_manager)
+        self.assertEqual(detector.detect_deadlock(), Marking({'p0': 0, 'p1': 0, 'p2': 0, 'p3': 1}))
+        best, value, _ = MarkingOptimizer(net).find_max_score_marking(
+            solver, {'p0': 1, 'p1': 2, 'p2': 5, 'p3': 3})
+        self.assertEqual(value, 5)
+        self.assertEqual(best['p2'], 1)
+
+
+class TestReordering(unittest.TestCase):
+    """Test dynamic reordering and the saved variable order."""
+
+    def setUp(self):
+        self.net = PNMLParser().parse_file(
+            str(TestVariableOrdering.SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        reference = BDDReachability(self.net)
+        reference.compute_symbolic_reachability(self.net.initial_marking)
+        self.expected = reference.extract_markings()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.order_file = os.path.join(self.tmpdir.name, 'net.order.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reorder_keeps_pairs(self):
+        """Test one sift after the relation keeps p' right below p."""
+        bdd_reachability = BDDReachability(self.net, reorder_once=True)
+        bdd_reachability.initialize_bdd()
+        manager = bdd_reachability.bdd_manager
+        for place in bdd_reachability.variable_order:
+            self.assertEqual(manager.level_of_var(place + "'"), manager.level_of_var(place) + 1)
+        self.assertEqual(manager.configure()['reordering'], False)
+        bdd_reachability.compute_symbolic_reachability(self.net.initial_marking)
+        self.assertEqual(bdd_reachability.extract_markings(), self.expected)
+
+    def test_dynamic_sifting(self):
+        """Test sifting during construction and fixpoint keeps the reachable set."""
+        bdd_reachability = BDDReachability(self.net, sift_relation=True, sift_fixpoint=True)
+        bdd_reachability.compute_symbolic_reachability(self.net.initial_marking)
+        self.assertEqual(bdd_reachability.extract_markings(), self.expected)
+        manager = bdd_reachability.bdd_manager
+        self.assertEqual(manager.configure()['reordering'], False)
+        self.assertEqual(bdd_reachability.variable_order,
+                         sorted(self.net.places, key=manager.level_of_var))
+
+    def test_saved_order_is_reused(self):
+        """Test the final order is saved and declared by the next run on the same net."""
+        first = BDDReachability(self.net, reorder_once=True, order_file=self.order_file)
+        first.compute_symbolic_reachability(self.net.initial_marking)
+        self.assertFalse(first.order_loaded)
+        with open(self.order_file) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['net'], self.net.compile().digest())
+
+        second = BDDReachability(self.net, ordering='force', reorder_once=True,
+                                 order_file=self.order_file)
+        second.initialize_bdd()
+        self.assertTrue(second.order_loaded)
+        manager = second.bdd_manager
+        self.assertEqual(sorted(manager.vars, key=manager.level_of_var), saved['order'])
+        second.compute_symbolic_reachability(self.net.initial_marking)
+        self.assertEqual(second.extract_markings(), self.expected)
+
+    def test_saved_order_of_other_net_ignored(self):
+        """Test an order saved for a different net, or a broken file, is not used."""
+        other = PetriNet()
+        other.add_place('p0', has_token=True)
+        BDDReachability(other, order_file=self.order_file).compute_symbolic_reachability(
+            other.initial_marking)
+        bdd_reachability = BDDReachability(self.net, order_file=self.order_file)
+        bdd_reachability.initialize_bdd()
+        self.assertFalse(bdd_reachability.order_loaded)
+
+        with open(self.order_file, 'w') as f:
+            f.write('{not json')
+        bdd_reachability.initialize_bdd()
+        self.assertFalse(bdd_reachability.order_loaded)
+
+
+class TestPartitionedRelation(unittest.TestCase):
+    """Test the partitioned transition relation."""
+
+    def test_same_markings_as_monolithic(self):
+        """Test every cluster size reaches the markings of the monolithic relation."""
+        net = PNMLParser().parse_file(
+            str(TestVariableOrdering.SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        monolithic = BDDReachability(net)
+        monolithic.compute_symbolic_reachability(net.initial_marking)
+        self.assertIsNone(monolithic.partitions)
+        for cluster_size in [0, 100, 10 ** 6]:
+            partitioned = BDDReachability(net, relation='partitioned', cluster_size=cluster_size)
+            partitioned.compute_symbolic_reachability(net.initial_marking)
+            self.assertIsNone(partitioned.transition_relation)
+            self.assertEqual(partitioned.extract_markings(), monolithic.extract_markings())
+            self.assertEqual(partitioned.reachable_bdd.count(nvars=len(net.places)), 128)
+            if cluster_size == 0:
+                self.assertEqual(len(partitioned.partitions), len(net.transitions))
+            if cluster_size == 10 ** 6:
+                self.assertEqual(len(partitioned.partitions), 1)
+
+    def test_supports_are_local(self):
+        """Test a cluster only quantifies the places its transitions touch."""
+        net = PetriNet()
+        for name in ['a', 'b', 'c', 'd']:
+            net.add_place(name, has_token=name in ('a', 'c'))
+        for t, src, dst in [('t1', 'a', 'b'), ('t2', 'c', 'd')]:
+            net.add_transition(t)
+            net.add_arc(src, t)
+            net.add_arc(t, dst)
+        bdd_reachability = BDDReachability(net, relation='partitioned', cluster_size=0)
+        bdd_reachability.compute_symbolic_reachability(net.initial_marking)
+        self.assertEqual(sorted(support for _, support, _ in bdd_reachability.partitions),
+                         [['a', 'b'], ['c', 'd']])
+        self.assertEqual(len(bdd_reachability.extract_markings()), 4)
+        detector = DeadlockDetector(net, bdd_reachability.reachable_bdd,
+                                    bdd_reachability.bdd_manager)
+        self.assertEqual(detector.detect_deadlock(), Marking({'a': 0, 'b': 1, 'c': 0, 'd': 1}))
+
+    def test_local_image(self):
+        """Test the image on current vars only matches the monolithic relation."""
+        net = PNMLParser().parse_file(
+            str(TestVariableOrdering.SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        monolithic = BDDReachability(net)
+        monolithic.compute_symbolic_reachability(net.initial_marking)
+        local = BDDReachability(net, relation='local', reorder_once=True)
+        local.compute_symbolic_reachability(net.initial_marking)
+        self.assertEqual(len(local.bdd_manager.vars), len(net.places))
+        self.assertEqual(local.next_var, {})
+        self.assertEqual(local.extract_markings(), monolithic.extract_markings())
+
+    def test_local_image_self_loop_and_deadlock(self):
+        """Test self-loops keep their token and deadlocks are found without next vars."""
+        net = PetriNet()
+        for name in ['a', 'b', 'c']:
+            net.add_place(name, has_token=name in ('a', 'b'))
+        net.add_transition('t')
+        for src, dst in [('a', 't'), ('b', 't'), ('t', 'b'), ('t', 'c')]:
+            net.add_arc(src, dst)
+        local = BDDReachability(net, relation='local')
+        local.compute_symbolic_reachability(net.initial_marking)
+        self.assertEqual(local.extract_markings(),
+                         {Marking({'a': 1, 'b': 1, 'c': 0}), Marking({'a': 0, 'b': 1, 'c': 1})})
+        detector = DeadlockDetector(net, local.reachable_bdd, local.bdd_manager)
+        self.assertEqual(detector.detect_deadlock(), Marking({'a': 0, 'b': 1, 'c': 1}))
+
+    def test_saved_order_across_layouts(self):
+        """Test an order saved with next vars is reused, as a place order, without them."""
+        net = PNMLParser().parse_file(
+            str(TestVariableOrdering.SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            order_file = os.path.join(tmpdir, 'net.order.json')
+            monolithic = BDDReachability(net, ordering='force', order_file=order_file)
+            monolithic.compute_symbolic_reachability(net.initial_marking)
+            local = BDDReachability(net, relation='local', order_file=order_file)
+            local.initialize_bdd()
+            self.assertTrue(local.order_loaded)
+            self.assertEqual(local.variable_order, monolithic.variable_order)
+
+    def test_unknown_relation(self):
+        """Test relation modes are validated."""
+        with self.assertRaises(ValueError):
+            BDDReachability(PetriNet(), relation='conjunctive')
+
+
+class TestSaturation(unittest.TestCase):
+    """Test the saturation engine."""
+
+    def test_same_reachable_set(self):
+        """Test saturation reaches the breadth-first markings with either variable layout."""
+        net = PNMLParser().parse_file(
+            str(TestVariableOrdering.SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        bfs = BDDReachability(net)
+        bfs.compute_symbolic_reachability(net.initial_marking)
+        for relation in ['monolithic', 'local']:
+            saturation = BDDReachability(net, relation=relation, engine='saturation')
+            reachable = saturation.compute_symbolic_reachability(net.initial_marking)
+            self.assertEqual(saturation.extract_markings(reachable), bfs.extract_markings())
+            self.assertTrue(saturation.status.complete)
+            self.assertEqual(saturation.status.explored, 128)
+            # the generic image still works on the events
+            self.assertEqual(saturation.post(reachable) & ~reachable,
+                             saturation.bdd_manager.false)
+
+    def test_lower_peak_on_sample(self):
+        """Test saturation needs fewer manager nodes than bfs on the same monolithic relation."""
+        net = PNMLParser().parse_file(
+            str(TestVariableOrdering.SAMPLES / 'AutonomousCar-PT-03a.pnml'))
+        bfs = BDDReachability(net)
+        bfs.compute_symbolic_reachability(net.initial_marking)
+        saturation = BDDReachability(net, engine='saturation')
+        reachable = saturation.compute_symbolic_reachability(net.initial_marking)
+        self.assertEqual(reachable.count(nvars=len(net.places)), 22521)
+        self.assertEqual(reachable.dag_size, bfs.reachable_bdd.dag_size)
+        self.assertLess(saturation.peak_nodes, bfs.peak_nodes * 0.75)
+
+    def test_groups_bottom_up(self):
+        """Test events are grouped by top variable, deepest group first."""
+        net = PetriNet()
+        for i in range(4):
+            net.add_place(f'p{i}', has_token=(i == 0))
+        for i in range(3):
+            net.add_transition(f't{i}')
+            net.add_arc(f'p{i}', f't{i}')
+            net.add_arc(f't{i}', f'p{i+1}')
+        saturation = BDDReachability(net, relation='local', engine='saturation')
+        saturation.initialize_bdd()
+        groups = saturation._event_groups()
+        self.assertEqual([cofactor for group in groups for cofactor, _, _ in group],
+                         [{'p2': True}, {'p1': True}, {'p0': True}])
+        saturation.compute_symbolic_reachability(net.initial_marking)
+        self.assertEqual(len(saturation.extract_markings()), 4)
+
+    def test_budget(self):
+        """Test a state limit stops saturation with an incomplete status."""
+        net = PNMLParser().parse_file(
+            str(TestVariableOrdering.SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        saturation = BDDReachability(net, engine='saturation')
+        saturation.compute_symbolic_reachability(net.initial_marking, budget=Budget(max_states=20))
+        status = saturation.status
+        self.assertEqual(status.reason, 'states')
+        self.assertGreater(status.frontier, 0)
+        self.assertLess(status.explored, 128)
+        with self.assertRaises(ValueError):
+            BDDReachability(net, engine='chaining')
+
+
 if __name__ == '__main__':
     # Run with verbose output
     unittest.main(verbosity=2)
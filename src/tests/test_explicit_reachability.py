@@ -1,8 +1,17 @@
+import multiprocessing
+import os
+import tempfile
 import unittest
 from pathlib import Path
-from explicit_reachability import ExplicitReachability
+from unittest import mock
+from explicit_reachability import (ExplicitReachability, ExternalReachability, LossyReachability,
+                                   SweepLineReachability)
+from explicit_reachability.checkpoint import Checkpoint
+from explicit_reachability.external import DiskHashSet
+from explicit_reachability.lossy import fingerprint
+from explicit_reachability.vectorized import pack_ints
 from pnml_parser import PNMLParser
-from utils import PetriNet, Marking
+from utils import PetriNet, Marking, Budget, codegen
 
 
 class TestExplicitReachabilityBasic(unittest.TestCase):
@@ -389,6 +398,929 @@ class TestReachabilityEdgeCases(unittest.TestCase):
         self.assertEqual(len(reachable), 4)
 
 
+class TestIterReachable(unittest.TestCase):
+    """Test the streaming generator API."""
+    
+    def setUp(self):
+        """Set up cyclic net with a deadlock branch."""
+        self.net = PetriNet()
+        for p in ['p1', 'p2', 'p3']:
+            self.net.add_place(p, has_token=(p == 'p1'))
+        for t, src, dst in [('t1', 'p1', 'p2'), ('t2', 'p2', 'p1'), ('t3', 'p2', 'p3')]:
+            self.net.add_transition(t)
+            self.net.add_arc(src, t)
+            self.net.add_arc(t, dst)
+        self.reachability = ExplicitReachability(self.net)
+    
+    def test_yields_all_markings_in_bfs_order(self):
+        """Test generator yields the same markings as compute_reachability."""
+        streamed = list(self.reachability.iter_reachable())
+        self.assertEqual(streamed[0], self.net.initial_marking)
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(set(streamed), self.reachability.compute_reachability(None))
+    
+    def test_with_edges_matches_graph(self):
+        """Test (marking, edges) pairs match the transition graph."""
+        streamed = dict(self.reachability.iter_reachable(with_edges=True))
+        self.reachability.compute_reachability(None)
+        self.assertEqual(streamed, self.reachability.get_transition_graph())
+    
+    def test_early_stop_does_not_store_results(self):
+        """Test consumers can stop early and results containers are untouched."""
+        generator = self.reachability.iter_reachable()
+        first = next(generator)
+        generator.close()
+        self.assertEqual(first, self.net.initial_marking)
+        self.assertEqual(len(self.reachability.reachable_markings), 0)
+
+
+class TestGraphStorage(unittest.TestCase):
+    """Test compact CSR graph storage and states-only runs."""
+    
+    def setUp(self):
+        """Load a sample model and its dict-based graph."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'CircadianClock-PT-000001.pnml'
+        self.net = PNMLParser().parse_file(str(path))
+        self.reachability = ExplicitReachability(self.net)
+        self.expected = self.reachability.compute_reachability(self.net.initial_marking)
+        self.expected_graph = self.reachability.get_transition_graph()
+    
+    def test_csr_graph_matches_dict_graph(self):
+        """Test CSR graph converts back to the dict graph for every engine."""
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.dict(os.environ, {'PETRI_CODEGEN_CACHE': directory}):
+            for options in [{}, {'mode': 'vectorized'}, {'workers': 2}]:
+                reachable = self.reachability.compute_reachability(
+                    self.net.initial_marking, graph='csr', **options)
+                graph = self.reachability.get_compact_graph()
+                self.assertEqual(reachable, self.expected)
+                self.assertEqual(self.reachability.get_transition_graph(), {})
+                self.assertEqual(graph.to_dict(), self.expected_graph, options)
+    
+    def test_csr_graph_accessors(self):
+        """Test state lookup, successors and scipy conversion."""
+        self.reachability.compute_reachability(self.net.initial_marking, graph='csr')
+        graph = self.reachability.get_compact_graph()
+        
+        start = graph.state_id(self.net.initial_marking)
+        self.assertEqual(start, 0)
+        self.assertEqual(graph.marking(start), self.net.initial_marking)
+        targets, fired = graph.successors(start)
+        expected = self.expected_graph[self.net.initial_marking]
+        self.assertEqual({self.net.compile().transitions[t] for t in fired}, set(expected))
+        
+        adjacency = graph.to_scipy()
+        self.assertEqual(adjacency.shape, (len(self.expected), len(self.expected)))
+        self.assertEqual(adjacency.sum(), graph.num_edges)
+    
+    def test_states_only(self):
+        """Test graph=None returns the states without storing edges."""
+        reachable = self.reachability.compute_reachability(self.net.initial_marking, graph=None)
+        self.assertEqual(reachable, self.expected)
+        self.assertEqual(self.reachability.get_transition_graph(), {})
+        self.assertIsNone(self.reachability.get_compact_graph())
+
+
+class TestOnTheFlyQueries(unittest.TestCase):
+    """Test on-the-fly reachability queries with early termination."""
+    
+    def setUp(self):
+        """Set up linear chain p0 -> t0 -> p1 -> ... -> p9."""
+        self.net = PetriNet()
+        for i in range(10):
+            self.net.add_place(f'p{i}', has_token=(i == 0))
+        for i in range(9):
+            self.net.add_transition(f't{i}')
+            self.net.add_arc(f'p{i}', f't{i}')
+            self.net.add_arc(f't{i}', f'p{i+1}')
+        self.reachability = ExplicitReachability(self.net)
+    
+    def test_full_target_marking(self):
+        """Test full target marking returns the marking itself."""
+        target = Marking({f'p{i}': int(i == 4) for i in range(10)})
+        self.assertEqual(self.reachability.find_reachable(target), target)
+    
+    def test_partial_marking(self):
+        """Test partial marking only compares the listed places."""
+        witness = self.reachability.find_reachable({'p7': 1})
+        self.assertTrue(witness.has_token('p7'))
+        self.assertIsNone(self.reachability.find_reachable({'p0': 1, 'p9': 1}))
+    
+    def test_predicate_stops_early(self):
+        """Test predicate search stops at the first witness."""
+        visited = []
+        
+        def predicate(marking):
+            visited.append(marking)
+            return marking.has_token('p2')
+        
+        witness = self.reachability.find_reachable(predicate)
+        self.assertTrue(witness.has_token('p2'))
+        self.assertEqual(len(visited), 3)
+    
+    def test_check_invariant(self):
+        """Test invariant check returns a counterexample or None."""
+        one_token = self.reachability.check_invariant(lambda m: m.total_tokens() == 1)
+        self.assertIsNone(one_token)
+        counterexample = self.reachability.check_invariant(lambda m: not m.has_token('p5'))
+        self.assertTrue(counterexample.has_token('p5'))
+    
+    def test_query_with_reduction(self):
+        """Test partial-marking queries keep their places visible under reduction."""
+        witness = self.reachability.find_reachable({'p9': 1}, reduction='stubborn')
+        self.assertTrue(witness.has_token('p9'))
+        with self.assertRaises(ValueError):
+            self.reachability.find_reachable(lambda m: True, reduction='stubborn')
+    
+    def test_unknown_place(self):
+        """Test queries on unknown places are rejected."""
+        with self.assertRaises(ValueError):
+            self.reachability.find_reachable({'p99': 1})
+
+
+class TestDepthFirstModes(unittest.TestCase):
+    """Test DFS, depth-bounded and iterative-deepening exploration."""
+    
+    def setUp(self):
+        """Set up a net with a choice: p0 -> a -> p1 -> b -> p2, or p0 -> c -> p3."""
+        self.net = PetriNet()
+        for place in ['p0', 'p1', 'p2', 'p3']:
+            self.net.add_place(place, has_token=(place == 'p0'))
+        for t, src, dst in [('a', 'p0', 'p1'), ('b', 'p1', 'p2'), ('c', 'p0', 'p3')]:
+            self.net.add_transition(t)
+            self.net.add_arc(src, t)
+            self.net.add_arc(t, dst)
+        self.reachability = ExplicitReachability(self.net)
+    
+    @staticmethod
+    def marking(*marked):
+        """Full marking of p0..p3 with the given places marked."""
+        return Marking({place: int(place in marked) for place in ['p0', 'p1', 'p2', 'p3']})
+    
+    def test_dfs_matches_bfs(self):
+        """Test DFS finds the same states and graph as BFS."""
+        bfs = self.reachability.compute_reachability(None)
+        bfs_graph = self.reachability.get_transition_graph()
+        for graph in ExplicitReachability.GRAPHS:
+            dfs = self.reachability.compute_reachability(None, mode='dfs', graph=graph)
+            self.assertEqual(dfs, bfs)
+        self.reachability.compute_reachability(None, mode='dfs')
+        self.assertEqual(self.reachability.get_transition_graph(), bfs_graph)
+        self.assertEqual(len(self.reachability.get_deadlocks()), 2)
+    
+    def test_deadlocks_per_graph_mode(self):
+        """Test deadlocks come from the CSR graph and need a graph at all."""
+        expected = {self.marking('p2'), self.marking('p3')}
+        for mode in ['bfs', 'dfs', 'vectorized']:
+            self.reachability.compute_reachability(None, mode=mode, graph='csr')
+            self.assertEqual(set(self.reachability.get_deadlocks()), expected, mode)
+        self.reachability.compute_reachability(None, graph='csr', max_depth=1)
+        self.assertEqual(self.reachability.get_deadlocks(), [])
+
+        self.reachability.compute_reachability(None, graph=None)
+        with self.assertRaises(RuntimeError):
+            self.reachability.get_deadlocks()
+        with self.assertRaises(RuntimeError):
+            ExplicitReachability(self.net).get_deadlocks()
+
+    def test_dfs_on_sample_model(self):
+        """Test DFS state count on a sample model."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'AutonomousCar-PT-03a.pnml'
+        net = PNMLParser().parse_file(str(path))
+        reachability = ExplicitReachability(net)
+        dfs = reachability.compute_reachability(None, mode='dfs', graph='csr')
+        self.assertEqual(len(dfs), 22521)
+        self.assertEqual(dfs, reachability.compute_reachability(None, graph=None))
+    
+    def test_max_depth(self):
+        """Test bounded exploration keeps states within the bound."""
+        for mode in ['bfs', 'dfs']:
+            reachable = self.reachability.compute_reachability(None, mode=mode, max_depth=1)
+            self.assertEqual(len(reachable), 3)
+            unexpanded = self.reachability.unexpanded_markings
+            self.assertEqual(unexpanded, {self.marking('p1'), self.marking('p3')})
+            # p3 is a real deadlock but lies on the bound, so it is not reported
+            self.assertEqual(self.reachability.get_deadlocks(), [])
+            
+            reachable = self.reachability.compute_reachability(None, mode=mode, max_depth=0)
+            self.assertEqual(reachable, {self.marking('p0')})
+    
+    def test_bounded_dfs_uses_shortest_depth(self):
+        """Test bounded DFS re-expands states reached again on a shorter path."""
+        net = PetriNet()
+        for place in ['p0', 'p1', 'p2', 'p3']:
+            net.add_place(place, has_token=(place == 'p0'))
+        # long path p0 -> p1 -> p2 (taken first by DFS) and shortcut p0 -> p2
+        for t, src, dst in [('a', 'p0', 'p1'), ('b', 'p1', 'p2'),
+                            ('c', 'p2', 'p3'), ('z', 'p0', 'p2')]:
+            net.add_transition(t)
+            net.add_arc(src, t)
+            net.add_arc(t, dst)
+        reachability = ExplicitReachability(net)
+        dfs = reachability.compute_reachability(None, mode='dfs', max_depth=2)
+        self.assertEqual(dfs, reachability.compute_reachability(None, max_depth=2))
+        self.assertIn(Marking({'p0': 0, 'p1': 0, 'p2': 0, 'p3': 1}), dfs)
+    
+    def test_iter_reachable_dfs(self):
+        """Test streaming DFS marks bounded states as unexpanded."""
+        items = list(self.reachability.iter_reachable(mode='dfs', max_depth=1, with_edges=True))
+        self.assertEqual(len(items), 3)
+        unexpanded = [marking for marking, edges in items if edges is None]
+        self.assertEqual(len(unexpanded), 2)
+    
+    def test_find_reachable_modes(self):
+        """Test DFS and iterative-deepening queries."""
+        for mode in ExplicitReachability.SEARCHES:
+            self.assertEqual(self.reachability.find_reachable({'p2': 1}, mode=mode),
+                             self.marking('p2'))
+            self.assertIsNone(self.reachability.find_reachable({'p1': 1, 'p3': 1}, mode=mode))
+            self.assertIsNone(self.reachability.find_reachable({'p2': 1}, mode=mode, max_depth=1))
+    
+    def test_invalid_arguments(self):
+        """Test invalid depth-related arguments are rejected."""
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, max_depth=-1)
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, mode='vectorized', max_depth=2)
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, max_depth=2, reduction='stubborn')
+        with self.assertRaises(ValueError):
+            self.reachability.find_reachable({'p2': 1}, mode='vectorized')
+
+
+class TestLossyReachability(unittest.TestCase):
+    """Test bitstate and hash-compaction exploration."""
+    
+    def setUp(self):
+        """Set up the AutonomousCar-PT-03a sample model."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'AutonomousCar-PT-03a.pnml'
+        self.net = PNMLParser().parse_file(str(path))
+    
+    def test_large_budget_is_exact(self):
+        """Test both methods visit every state when memory is ample."""
+        reachability = ExplicitReachability(self.net)
+        reachability.compute_reachability(None)
+        deadlocks = set(reachability.get_deadlocks())
+        for method in LossyReachability.METHODS:
+            lossy = LossyReachability(self.net, method=method, memory_budget=2**20)
+            self.assertEqual(lossy.compute_reachability(), 22521)
+            self.assertEqual(set(lossy.deadlocks), deadlocks)
+            self.assertTrue(lossy.complete)
+            self.assertLess(lossy.omission_probability(), 0.01)
+    
+    def test_small_bitstate_array(self):
+        """Test a tiny bit array omits states and reports it."""
+        lossy = LossyReachability(self.net, method='bitstate', memory_budget=2**10)
+        count = lossy.compute_reachability()
+        self.assertLess(count, 22521)
+        self.assertGreater(lossy.expected_omissions(), 1)
+        self.assertGreater(lossy.omission_probability(), 0.5)
+    
+    def test_full_fingerprint_table(self):
+        """Test a full hash-compaction table stops storing states."""
+        lossy = LossyReachability(self.net, method='hashcompact', memory_budget=2**10)
+        self.assertLess(lossy.compute_reachability(), 128)
+        self.assertFalse(lossy.complete)
+        self.assertEqual(lossy.omission_probability(), 1.0)
+    
+    def test_max_deadlocks(self):
+        """Test the sweep stops after the requested number of deadlocks."""
+        lossy = LossyReachability(self.net, method='hashcompact')
+        lossy.compute_reachability(max_deadlocks=1)
+        self.assertEqual(len(lossy.deadlocks), 1)
+        self.assertEqual(self.net.get_enabled_transitions(lossy.deadlocks[0]), [])
+    
+    def test_fingerprint_words(self):
+        """Test fingerprints depend on every word of a packed marking."""
+        self.assertNotEqual(fingerprint(1), fingerprint(1 << 64))
+        self.assertNotEqual(fingerprint(1), fingerprint(1 << 61))
+    
+    def test_unknown_method(self):
+        """Test an unknown method is rejected."""
+        with self.assertRaises(ValueError):
+            LossyReachability(self.net, method='exact')
+
+
+class TestSweepLine(unittest.TestCase):
+    """Test sweep-line exploration."""
+    
+    @staticmethod
+    def pipeline(tokens, stages):
+        """Independent tokens moving forward through stages s0 .. s{stages-1}."""
+        net = PetriNet()
+        for i in range(tokens):
+            for j in range(stages):
+                net.add_place(f'k{i}_s{j}', has_token=(j == 0))
+            for j in range(stages - 1):
+                net.add_transition(f'k{i}_t{j}')
+                net.add_arc(f'k{i}_s{j}', f'k{i}_t{j}')
+                net.add_arc(f'k{i}_t{j}', f'k{i}_s{j + 1}')
+        progress = {f'k{i}_s{j}': j for i in range(tokens) for j in range(stages)}
+        return net, progress
+    
+    def test_monotone_progress(self):
+        """Test a monotone measure explores every state once with a narrow sweep."""
+        net, progress = self.pipeline(4, 6)
+        sweep = SweepLineReachability(net, progress)
+        count = sweep.compute_reachability()
+        self.assertEqual(count, 6 ** 4)
+        self.assertTrue(sweep.monotone)
+        self.assertEqual(sweep.sweeps, 1)
+        self.assertLess(sweep.peak_states, count // 2)
+        self.assertEqual(len(sweep.deadlocks), 1)
+    
+    def test_regress_edges(self):
+        """Test non-monotone measures still find every deadlock."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'AutonomousCar-PT-03a.pnml'
+        net = PNMLParser().parse_file(str(path))
+        reachability = ExplicitReachability(net)
+        reachable = reachability.compute_reachability(None)
+        progress = {place: i for i, place in enumerate(sorted(net.places))}
+        sweep = SweepLineReachability(net, progress)
+        count = sweep.compute_reachability()
+        self.assertFalse(sweep.monotone)
+        self.assertGreater(sweep.sweeps, 1)
+        self.assertGreaterEqual(count, len(reachable))
+        self.assertEqual(set(sweep.deadlocks), set(reachability.get_deadlocks()))
+    
+    def test_callable_progress(self):
+        """Test a progress predicate over markings and early termination."""
+        net, _ = self.pipeline(2, 3)
+        sweep = SweepLineReachability(
+            net, lambda marking: sum(marking.has_token(f'k{i}_s2') for i in range(2)))
+        self.assertEqual(sweep.compute_reachability(), 9)
+        self.assertTrue(sweep.monotone)
+        sweep.compute_reachability(max_deadlocks=1)
+        self.assertEqual(len(sweep.deadlocks), 1)
+    
+    def test_unknown_place(self):
+        """Test progress weights on unknown places are rejected."""
+        net, _ = self.pipeline(1, 2)
+        with self.assertRaises(ValueError):
+            SweepLineReachability(net, {'nope': 1})
+
+
+class TestCheckpointResume(unittest.TestCase):
+    """Test checkpointing and resuming BFS explorations."""
+    
+    def setUp(self):
+        """Set up the AutonomousCar-PT-03a sample model and a checkpoint path."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'AutonomousCar-PT-03a.pnml'
+        self.net = PNMLParser().parse_file(str(path))
+        self.reachability = ExplicitReachability(self.net)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.npz')
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def checkpoint_meta(self):
+        """Settings recorded by a default run on the sample net."""
+        compiled = self.net.compile()
+        return {'net': compiled.digest(),
+                'initial': format(compiled.encode(self.net.initial_marking), 'x'),
+                'reduction': None, 'visible_places': None, 'max_depth': None, 'edges': True,
+                'traces': False}
+    
+    def interrupted_run(self, **kwargs):
+        """Run BFS with a snapshot at every state and kill it after the 100th."""
+        original = Checkpoint.save
+        
+        def save(checkpoint, progress):
+            original(checkpoint, progress)
+            if progress[0] >= 100:
+                raise KeyboardInterrupt
+        
+        Checkpoint.save = save
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                self.reachability.compute_reachability(None, checkpoint=self.path,
+                                                       checkpoint_interval=0, **kwargs)
+        finally:
+            Checkpoint.save = original
+    
+    def test_resume_after_interrupt(self):
+        """Test a resumed run yields the same states and graph as a full run."""
+        full = self.reachability.compute_reachability(None)
+        graph = self.reachability.get_transition_graph()
+        
+        self.interrupted_run()
+        meta = self.checkpoint_meta()
+        states, _, _, progress = Checkpoint(self.path, self.net.compile(), meta=meta).load()
+        self.assertEqual(progress[0], 100)
+        self.assertLess(len(states), len(full))
+        resumed = self.reachability.compute_reachability(None, checkpoint=self.path, resume=True)
+        self.assertEqual(resumed, full)
+        self.assertEqual(self.reachability.get_transition_graph(), graph)
+    
+    def test_resume_bounded_csr(self):
+        """Test resuming a depth-bounded run with a CSR graph."""
+        full = self.reachability.compute_reachability(None, max_depth=12, graph='csr')
+        edges = self.reachability.get_compact_graph().num_edges
+        unexpanded = self.reachability.unexpanded_markings
+        
+        self.interrupted_run(max_depth=12, graph='csr')
+        resumed = self.reachability.compute_reachability(None, max_depth=12, graph='csr',
+                                                         checkpoint=self.path, resume=True)
+        self.assertEqual(resumed, full)
+        self.assertEqual(self.reachability.get_compact_graph().num_edges, edges)
+        self.assertEqual(self.reachability.unexpanded_markings, unexpanded)
+    
+    def test_finished_checkpoint(self):
+        """Test a finished run leaves a checkpoint that resumes without exploring."""
+        full = self.reachability.compute_reachability(None, graph=None, checkpoint=self.path)
+        meta = dict(self.checkpoint_meta(), edges=False)
+        states, _, _, progress = Checkpoint(self.path, self.net.compile(), meta=meta).load()
+        self.assertEqual(progress[0], len(full))
+        self.assertEqual(len(states), len(full))
+        
+        resumed = self.reachability.compute_reachability(None, graph=None,
+                                                         checkpoint=self.path, resume=True)
+        self.assertEqual(resumed, full)
+    
+    def test_mismatched_settings(self):
+        """Test a checkpoint is only resumed with the settings it was written with."""
+        self.reachability.compute_reachability(None, graph=None, checkpoint=self.path)
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, checkpoint=self.path, resume=True)
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, graph=None, max_depth=3,
+                                                   checkpoint=self.path, resume=True)
+    
+    def test_invalid_arguments(self):
+        """Test checkpoints are limited to single-process BFS."""
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, mode='dfs', checkpoint=self.path)
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, resume=True)
+
+
+class TestExplorationBudget(unittest.TestCase):
+    """Test budgets on explicit exploration."""
+    
+    def setUp(self):
+        """Set up the AutonomousCar-PT-03a sample model."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'AutonomousCar-PT-03a.pnml'
+        self.net = PNMLParser().parse_file(str(path))
+        self.reachability = ExplicitReachability(self.net)
+    
+    def test_complete_status(self):
+        """Test an unlimited run reports a complete status."""
+        self.reachability.compute_reachability(None, graph=None)
+        status = self.reachability.status
+        self.assertTrue(status.complete)
+        self.assertEqual((status.explored, status.frontier), (22521, 0))
+    
+    def test_state_limit(self):
+        """Test every mode stops near the state limit with a partial result."""
+        for mode in ExplicitReachability.MODES:
+            reachable = self.reachability.compute_reachability(
+                None, mode=mode, budget=Budget(max_states=1000))
+            status = self.reachability.status
+            self.assertFalse(status.complete)
+            self.assertEqual(status.reason, 'states')
+            self.assertGreaterEqual(len(reachable), 1000)
+            self.assertLess(len(reachable), 22521)
+            self.assertEqual(status.explored + status.frontier, len(reachable))
+            self.assertEqual(len(self.reachability.unexpanded_markings), status.frontier)
+            # frontier markings are not mistaken for deadlocks
+            deadlocks = set(self.reachability.get_deadlocks())
+            self.assertFalse(deadlocks & self.reachability.unexpanded_markings)
+    
+    def test_time_limit(self):
+        """Test a zero time limit stops after the first state."""
+        self.reachability.compute_reachability(None, budget=Budget(time_limit=0))
+        self.assertEqual(self.reachability.status.reason, 'time')
+        self.assertEqual(self.reachability.status.explored, 1)
+    
+    def test_resume_after_budget(self):
+        """Test a run stopped by its budget resumes from its checkpoint."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.npz')
+            self.reachability.compute_reachability(None, graph=None, checkpoint=path,
+                                                   budget=Budget(max_states=5000))
+            self.assertFalse(self.reachability.status.complete)
+            reachable = self.reachability.compute_reachability(None, graph=None, checkpoint=path,
+                                                               resume=True)
+            self.assertEqual(len(reachable), 22521)
+            self.assertTrue(self.reachability.status.complete)
+
+    def test_frontier_after_resumed_stop(self):
+        """Test states expanded before a resume are not counted as frontier."""
+        self.reachability.compute_reachability(None, graph=None, budget=Budget(max_states=10000))
+        expected = self.reachability.status
+        expected_frontier = self.reachability.unexpanded_markings
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.npz')
+            self.reachability.compute_reachability(None, graph=None, checkpoint=path,
+                                                   budget=Budget(max_states=5000))
+            self.reachability.compute_reachability(None, graph=None, checkpoint=path,
+                                                   resume=True, budget=Budget(max_states=10000))
+        status = self.reachability.status
+        self.assertEqual((status.explored, status.frontier), (expected.explored, expected.frontier))
+        self.assertEqual(self.reachability.unexpanded_markings, expected_frontier)
+
+    def test_workers_rejected(self):
+        """Test budgets are not combined with worker processes."""
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, workers=2, budget=Budget(max_states=10))
+
+
+class TestWitnessTraces(unittest.TestCase):
+    """Test parent-pointer witness traces."""
+    
+    def setUp(self):
+        """Set up a net with a long path p0 -> p1 -> p2 -> p3 and a shortcut p0 -> p2."""
+        self.net = PetriNet()
+        for place in ['p0', 'p1', 'p2', 'p3', 'p4']:
+            self.net.add_place(place, has_token=(place == 'p0'))
+        for t, src, dst in [('a', 'p0', 'p1'), ('b', 'p1', 'p2'),
+                            ('c', 'p2', 'p3'), ('z', 'p0', 'p2')]:
+            self.net.add_transition(t)
+            self.net.add_arc(src, t)
+            self.net.add_arc(t, dst)
+        self.reachability = ExplicitReachability(self.net)
+    
+    def replay(self, net, trace):
+        """Fire a trace from the initial marking of a net."""
+        marking = net.initial_marking
+        for transition in trace:
+            self.assertTrue(net.is_enabled(transition, marking))
+            marking = net.fire_transition(transition, marking)
+        return marking
+    
+    def test_shortest_traces(self):
+        """Test BFS-based modes return shortest firing sequences."""
+        for mode in ['bfs', 'vectorized']:
+            self.reachability.compute_reachability(None, mode=mode, traces=True)
+            self.assertEqual(self.reachability.trace_to({'p0': 1}), [])
+            self.assertEqual(self.reachability.trace_to({'p1': 1}), ['a'])
+            self.assertEqual(self.reachability.trace_to({'p3': 1}), ['z', 'c'])
+            self.assertIsNone(self.reachability.trace_to({'p4': 1}))
+    
+    def test_dfs_traces(self):
+        """Test DFS traces are valid and shortest within a depth bound."""
+        self.reachability.compute_reachability(None, mode='dfs', traces=True)
+        trace = self.reachability.trace_to({'p3': 1})
+        self.assertTrue(self.replay(self.net, trace).has_token('p3'))
+        self.reachability.compute_reachability(None, mode='dfs', max_depth=2, traces=True)
+        self.assertEqual(self.reachability.trace_to({'p3': 1}), ['z', 'c'])
+    
+    def test_traces_on_sample_model(self):
+        """Test every trace of a sample model replays to its marking."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'AutonomousCar-PT-03a.pnml'
+        net = PNMLParser().parse_file(str(path))
+        reachability = ExplicitReachability(net)
+        reachable = reachability.compute_reachability(None, graph=None, traces=True)
+        self.assertEqual(len(reachability.parents), len(reachable))
+        targets = sorted(reachable, key=str)[::2000]
+        lengths = [len(reachability.trace_to(target)) for target in targets]
+        for target in targets:
+            self.assertEqual(self.replay(net, reachability.trace_to(target)), target)
+        reachability.compute_reachability(None, mode='vectorized', traces=True)
+        self.assertEqual([len(reachability.trace_to(target)) for target in targets], lengths)
+    
+    def test_traces_after_resume(self):
+        """Test parent pointers are restored from a checkpoint."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.npz')
+            self.reachability.compute_reachability(None, checkpoint=path, traces=True,
+                                                   budget=Budget(max_states=3))
+            self.reachability.compute_reachability(None, checkpoint=path, traces=True,
+                                                   resume=True)
+            self.assertEqual(self.reachability.trace_to({'p3': 1}), ['z', 'c'])
+    
+    def test_without_traces(self):
+        """Test trace_to requires a run recording traces."""
+        self.reachability.compute_reachability(None)
+        with self.assertRaises(RuntimeError):
+            self.reachability.trace_to({'p1': 1})
+        with self.assertRaises(ValueError):
+            self.reachability.compute_reachability(None, workers=2, traces=True)
+
+
+class TestSCCAnalysis(unittest.TestCase):
+    """Test SCC-based liveness and home state analysis."""
+    
+    @staticmethod
+    def ring(size, exit_place=False):
+        """Token ring p0 -> ... -> p{size-1} -> p0, optionally with an exit p0 -> out."""
+        net = PetriNet()
+        for i in range(size):
+            net.add_place(f'p{i}', has_token=(i == 0))
+        for i in range(size):
+            net.add_transition(f't{i}')
+            net.add_arc(f'p{i}', f't{i}')
+            net.add_arc(f't{i}', f'p{(i + 1) % size}')
+        if exit_place:
+            net.add_place('out')
+            net.add_transition('leave')
+            net.add_arc('p0', 'leave')
+            net.add_arc('leave', 'out')
+        return net
+    
+    def test_reversible_ring(self):
+        """Test a token ring is one terminal SCC with every transition live."""
+        reachability = ExplicitReachability(self.ring(4))
+        for graph in ['csr', 'dict']:
+            reachability.compute_reachability(None, graph=graph)
+            analysis = reachability.analyze_sccs()
+            self.assertEqual(analysis.num_components, 1)
+            self.assertTrue(analysis.is_reversible())
+            self.assertEqual(len(analysis.home_states()), 4)
+            self.assertEqual(analysis.live_transitions(), ['t0', 't1', 't2', 't3'])
+            self.assertEqual(analysis.dead_transitions(), [])
+    
+    def test_ring_with_exit(self):
+        """Test a ring that can be left ends in a single deadlock SCC."""
+        reachability = ExplicitReachability(self.ring(3, exit_place=True))
+        reachability.compute_reachability(None, graph='csr')
+        analysis = reachability.analyze_sccs()
+        self.assertEqual(analysis.num_components, 2)
+        self.assertEqual(len(analysis.terminal), 1)
+        self.assertFalse(analysis.is_reversible())
+        home = analysis.home_states().tolist()
+        self.assertEqual([analysis.graph.marking(i) for i in home],
+                         [Marking({'p0': 0, 'p1': 0, 'p2': 0, 'out': 1})])
+        self.assertEqual(analysis.live_transitions(), [])
+        liveness = analysis.terminal_liveness()
+        self.assertEqual(list(liveness.values()), [([], ['leave', 't0', 't1', 't2'])])
+    
+    def test_no_home_state(self):
+        """Test two terminal SCCs leave no home state and expose dead transitions."""
+        net = PetriNet()
+        for place in ['p0', 'p1', 'p2', 'p3']:
+            net.add_place(place, has_token=(place == 'p0'))
+        for t, src, dst in [('a', 'p0', 'p1'), ('b', 'p0', 'p2'), ('c', 'p3', 'p0')]:
+            net.add_transition(t)
+            net.add_arc(src, t)
+            net.add_arc(t, dst)
+        reachability = ExplicitReachability(net)
+        reachability.compute_reachability(None, graph='csr')
+        analysis = reachability.analyze_sccs()
+        self.assertEqual(len(analysis.terminal), 2)
+        self.assertEqual(len(analysis.home_states()), 0)
+        self.assertFalse(analysis.is_home_state(analysis.initial))
+        self.assertEqual(analysis.dead_transitions(), ['c'])
+    
+    def test_deep_graph(self):
+        """Test long cycles do not hit the recursion limit."""
+        reachability = ExplicitReachability(self.ring(2000))
+        reachability.compute_reachability(None, graph='csr')
+        analysis = reachability.analyze_sccs()
+        self.assertEqual(analysis.num_components, 1)
+        self.assertTrue(analysis.is_reversible())
+    
+    def test_matches_scipy(self):
+        """Test the components of a sample model against scipy."""
+        from scipy.sparse.csgraph import connected_components
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'AutonomousCar-PT-03a.pnml'
+        reachability = ExplicitReachability(PNMLParser().parse_file(str(path)))
+        reachability.compute_reachability(None, graph='csr')
+        analysis = reachability.analyze_sccs()
+        count, labels = connected_components(reachability.compact_graph.to_scipy(),
+                                             connection='strong')
+        self.assertEqual(analysis.num_components, count)
+        # same partition: the label pairs define a bijection
+        self.assertEqual(len(set(zip(analysis.labels.tolist(), labels.tolist()))), count)
+    
+    def test_incomplete_graph_rejected(self):
+        """Test the analysis refuses missing or partial graphs."""
+        reachability = ExplicitReachability(self.ring(4))
+        with self.assertRaises(RuntimeError):
+            reachability.analyze_sccs()
+        reachability.compute_reachability(None, graph=None)
+        with self.assertRaises(RuntimeError):
+            reachability.analyze_sccs()
+        reachability.compute_reachability(None, max_depth=1)
+        with self.assertRaises(ValueError):
+            reachability.analyze_sccs()
+
+
+class TestVectorizedMode(unittest.TestCase):
+    """Test the layer-at-a-time NumPy exploration mode against plain BFS."""
+    
+    def assert_same_as_bfs(self, net):
+        reachability = ExplicitReachability(net)
+        expected = reachability.compute_reachability(net.initial_marking)
+        expected_graph = reachability.get_transition_graph()
+        
+        reachable = reachability.compute_reachability(net.initial_marking, mode='vectorized')
+        self.assertEqual(reachable, expected)
+        self.assertEqual(reachability.get_transition_graph(), expected_graph)
+    
+    def test_cyclic_net(self):
+        """Test vectorized mode on a cycle with a choice."""
+        net = PetriNet()
+        for p in ['p1', 'p2', 'p3']:
+            net.add_place(p, has_token=(p == 'p1'))
+        for t, src, dst in [('t1', 'p1', 'p2'), ('t2', 'p1', 'p3'), ('t3', 'p2', 'p1'), ('t4', 'p3', 'p1')]:
+            net.add_transition(t)
+            net.add_arc(src, t)
+            net.add_arc(t, dst)
+        self.assert_same_as_bfs(net)
+    
+    def test_multi_word_markings(self):
+        """Test nets with more than 64 places (several words per row)."""
+        net = PetriNet()
+        for i in range(70):
+            net.add_place(f'p{i}', has_token=(i in (0, 60)))
+        for i in range(69):
+            net.add_transition(f't{i}')
+            net.add_arc(f'p{i}', f't{i}')
+            net.add_arc(f't{i}', f'p{i+1}')
+        self.assert_same_as_bfs(net)
+    
+    def test_sample_model(self):
+        """Test vectorized mode matches BFS on a sample model."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'CircadianClock-PT-000001.pnml'
+        self.assert_same_as_bfs(PNMLParser().parse_file(str(path)))
+    
+    def test_unknown_mode(self):
+        """Test unknown modes are rejected."""
+        net = PetriNet()
+        with self.assertRaises(ValueError):
+            ExplicitReachability(net).compute_reachability(net.initial_marking, mode='magic')
+
+
+class TestParallelExploration(unittest.TestCase):
+    """Test hash-partitioned multi-process exploration against plain BFS."""
+    
+    def test_matches_bfs_on_sample_model(self):
+        """Test state set and graph are identical to single-process BFS."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'CircadianClock-PT-000001.pnml'
+        net = PNMLParser().parse_file(str(path))
+        reachability = ExplicitReachability(net)
+        expected = reachability.compute_reachability(net.initial_marking)
+        expected_graph = reachability.get_transition_graph()
+        
+        # workers use the generated successor function, cached by net digest
+        codegen._loaded.clear()
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.dict(os.environ, {'PETRI_CODEGEN_CACHE': directory}):
+            reachable = reachability.compute_reachability(net.initial_marking, workers=3)
+            self.assertEqual(len(os.listdir(directory)), 1)
+        self.assertEqual(reachable, expected)
+        self.assertEqual(reachability.get_transition_graph(), expected_graph)
+
+    def test_cache_dir_option(self):
+        """Test cache_dir picks the codegen directory or disables the disk cache."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'CircadianClock-PT-000001.pnml'
+        net = PNMLParser().parse_file(str(path))
+        reachability = ExplicitReachability(net)
+        expected = reachability.compute_reachability(net.initial_marking, graph=None)
+        with tempfile.TemporaryDirectory() as default, tempfile.TemporaryDirectory() as chosen, \
+                mock.patch.dict(os.environ, {'PETRI_CODEGEN_CACHE': default}):
+            codegen._loaded.clear()
+            reachable = reachability.compute_reachability(net.initial_marking, workers=2,
+                                                          graph=None, cache_dir=False)
+            self.assertEqual(reachable, expected)
+            self.assertEqual(os.listdir(default), [])
+            codegen._loaded.clear()
+            reachability.compute_reachability(net.initial_marking, workers=2, graph=None,
+                                              cache_dir=chosen)
+            self.assertEqual(os.listdir(default), [])
+            self.assertEqual(len(os.listdir(chosen)), 1)
+    
+    @unittest.skipUnless(multiprocessing.get_start_method() == 'fork',
+                         "workers must inherit the patched successor loader")
+    def test_worker_failure_raises(self):
+        """Test a failing or dying worker raises instead of hanging the coordinator."""
+        from explicit_reachability import parallel
+        net = PetriNet()
+        net.add_place('p1', has_token=True)
+        net.add_place('p2')
+        net.add_transition('t1')
+        net.add_arc('p1', 't1')
+        net.add_arc('t1', 'p2')
+        parent = os.getpid()
+        load_successors = parallel.load_successors
+
+        def failing(compiled, cache_dir=None):
+            if os.getpid() != parent:
+                raise OSError("cannot load successors")
+            return load_successors(compiled, cache_dir)
+
+        def dying(compiled, cache_dir=None):
+            if os.getpid() != parent:
+                os._exit(3)
+            return load_successors(compiled, cache_dir)
+
+        for loader, message in ((failing, 'cannot load successors'), (dying, 'exit code 3')):
+            reachability = ExplicitReachability(net)
+            with self.subTest(message=message), tempfile.TemporaryDirectory() as directory, \
+                    mock.patch.dict(os.environ, {'PETRI_CODEGEN_CACHE': directory}), \
+                    mock.patch.object(parallel, 'load_successors', loader):
+                with self.assertRaisesRegex(RuntimeError, f"worker \\d.*{message}"):
+                    reachability.compute_reachability(net.initial_marking, workers=2)
+
+    def test_invalid_worker_options(self):
+        """Test invalid worker counts and unsupported modes are rejected."""
+        net = PetriNet()
+        reachability = ExplicitReachability(net)
+        with self.assertRaises(ValueError):
+            reachability.compute_reachability(net.initial_marking, workers=0)
+        with self.assertRaises(ValueError):
+            reachability.compute_reachability(net.initial_marking, mode='vectorized', workers=2)
+
+
+class TestStubbornReduction(unittest.TestCase):
+    """Test deadlock-preserving partial-order reduction."""
+    
+    def build_independent_net(self, n_bits):
+        """n independent transitions p{i}_1 -> t{i} -> p{i}_2 (2^n states)."""
+        net = PetriNet()
+        for i in range(n_bits):
+            net.add_place(f'p{i}_1', has_token=True)
+            net.add_place(f'p{i}_2', has_token=False)
+            net.add_transition(f't{i}')
+            net.add_arc(f'p{i}_1', f't{i}')
+            net.add_arc(f't{i}', f'p{i}_2')
+        return net
+    
+    def test_independent_transitions_collapse(self):
+        """Test reduction explores a linear number of states and keeps the deadlock."""
+        net = self.build_independent_net(10)
+        reachability = ExplicitReachability(net)
+        reduced = reachability.compute_reachability(net.initial_marking, reduction='stubborn')
+        
+        self.assertEqual(len(reduced), 11)
+        final = Marking({**{f'p{i}_1': 0 for i in range(10)}, **{f'p{i}_2': 1 for i in range(10)}})
+        self.assertEqual(reachability.get_deadlocks(), [final])
+    
+    def test_deadlocks_preserved_on_sample_models(self):
+        """Test reduced and full exploration find the same deadlocks."""
+        for name in ['simple-01.pnml', 'simple-02.pnml', 'AutonomousCar-PT-03a.pnml']:
+            path = Path(__file__).resolve().parents[2] / 'sample_pnml' / name
+            net = PNMLParser().parse_file(str(path))
+            reachability = ExplicitReachability(net)
+            full = reachability.compute_reachability(net.initial_marking)
+            deadlocks = set(reachability.get_deadlocks())
+            
+            reduced = reachability.compute_reachability(net.initial_marking, reduction='stubborn')
+            self.assertLessEqual(len(reduced), len(full))
+            self.assertEqual(set(reachability.get_deadlocks()), deadlocks, name)
+    
+    def test_visible_places_preserved(self):
+        """Test every reachable valuation of the visible places is kept."""
+        net = self.build_independent_net(6)
+        visible = ['p0_2', 'p3_2']
+        reachability = ExplicitReachability(net)
+        full = reachability.compute_reachability(net.initial_marking)
+        reduced = reachability.compute_reachability(net.initial_marking, reduction='stubborn',
+                                                    visible_places=visible)
+        
+        def project(markings):
+            return {tuple(m.has_token(p) for p in visible) for m in markings}
+        
+        self.assertLess(len(reduced), len(full))
+        self.assertEqual(project(reduced), project(full))
+    
+    def test_reduction_requires_bfs(self):
+        """Test reduction is rejected for other modes."""
+        net = self.build_independent_net(2)
+        with self.assertRaises(ValueError):
+            ExplicitReachability(net).compute_reachability(None, mode='vectorized', reduction='stubborn')
+
+
+class TestExternalReachability(unittest.TestCase):
+    """Test disk-backed exploration."""
+    
+    def test_matches_bfs_on_sample_model(self):
+        """Test the disk-resident visited set holds exactly the BFS states."""
+        path = Path(__file__).resolve().parents[2] / 'sample_pnml' / 'CircadianClock-PT-000001.pnml'
+        net = PNMLParser().parse_file(str(path))
+        expected = ExplicitReachability(net).compute_reachability(net.initial_marking)
+        
+        with ExternalReachability(net, memory_budget=1 << 12) as explorer:
+            count = explorer.compute_reachability(net.initial_marking)
+            self.assertEqual(count, len(expected))
+            self.assertEqual(set(explorer.iter_markings()), expected)
+            self.assertTrue(explorer.is_reachable(net.initial_marking))
+    
+    def test_temporary_directory_removed(self):
+        """Test close() removes the temporary working directory."""
+        net = PetriNet()
+        net.add_place('p1', has_token=True)
+        explorer = ExternalReachability(net)
+        explorer.compute_reachability()
+        directory = explorer.directory
+        explorer.close()
+        self.assertFalse(os.path.exists(directory))
+    
+    def test_disk_hash_set_grows(self):
+        """Test the memory-mapped table keeps all rows across growth."""
+        with tempfile.TemporaryDirectory() as directory:
+            table = DiskHashSet(os.path.join(directory, 'set.bin'), words=2, capacity=16)
+            rows = pack_ints(list(range(0, 3000, 3)) + [1 << 100], 2)
+            self.assertTrue(table.add(rows).all())
+            self.assertFalse(table.add(rows[:10]).any())
+            self.assertEqual(len(table), len(rows))
+            self.assertTrue(table.contains(rows).all())
+            self.assertFalse(table.contains(pack_ints([1, 2], 2)).any())
+            del table
+
+
 if __name__ == '__main__':
     # Run with verbose output
     unittest.main(verbosity=2)
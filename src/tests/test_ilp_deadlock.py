@@ -3,7 +3,7 @@ from pathlib import Path
 
 from ilp_deadlock import DeadlockDetector
 from pnml_parser import PNMLParser
-from utils import PetriNet, Marking
+from utils import PetriNet, Marking, Budget
 from bdd_reachability import BDDReachability
 
 def is_valid_deadlock(detector, marking):
@@ -194,5 +194,34 @@ class TestEdgeCases(unittest.TestCase):
         self.assertIsNotNone(detector.detect_deadlock())
 
 
+# ======================================================================
+# BUDGETS
+# ======================================================================
+
+class TestDeadlockBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.net = PetriNet()
+        self.net.add_place('p1', has_token=True)
+        self.net.add_place('p2', has_token=False)
+        self.net.add_transition('t1')
+        self.net.add_arc('p1', 't1')
+        self.net.add_arc('t1', 'p2')
+
+        self.detector = make_detector_with_bdd(self.net)
+
+    def test_complete_status(self):
+        self.assertIsNotNone(self.detector.detect_deadlock(budget=Budget(time_limit=60)))
+        self.assertTrue(self.detector.status.complete)
+        self.assertEqual(self.detector.status.explored, 1)
+
+    def test_candidate_limit(self):
+        self.assertIsNone(self.detector.detect_deadlock(budget=Budget(max_states=0)))
+        self.assertFalse(self.detector.status.complete)
+        self.assertEqual(self.detector.status.reason, 'states')
+        # an interrupted search proves nothing
+        self.assertFalse(self.detector.is_deadlock_free(budget=Budget(max_states=0)))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,167 @@
+import unittest
+from pathlib import Path
+from explicit_reachability import ExplicitReachability
+from pnml_parser import PNMLParser
+from unfolding import Unfolding
+from utils import PetriNet, Marking, Budget
+
+
+SAMPLES = Path(__file__).resolve().parents[2] / 'sample_pnml'
+
+
+def parallel_cycles(count):
+    """``count`` independent two-place cycles a_i <-> b_i, each marked in a_i."""
+    net = PetriNet()
+    for i in range(count):
+        net.add_place(f'a{i}', has_token=True)
+        net.add_place(f'b{i}')
+        for t, src, dst in [(f'go{i}', f'a{i}', f'b{i}'), (f'back{i}', f'b{i}', f'a{i}')]:
+            net.add_transition(t)
+            net.add_arc(src, t)
+            net.add_arc(t, dst)
+    return net
+
+
+class TestUnfoldingConstruction(unittest.TestCase):
+    """Test complete finite prefix construction."""
+
+    def test_chain(self):
+        """Test a sequential net unfolds into one event per transition."""
+        net = PetriNet()
+        for place in ['p1', 'p2', 'p3']:
+            net.add_place(place, has_token=(place == 'p1'))
+        for t, src, dst in [('t1', 'p1', 'p2'), ('t2', 'p2', 'p3')]:
+            net.add_transition(t)
+            net.add_arc(src, t)
+            net.add_arc(t, dst)
+        unfolding = Unfolding(net)
+        self.assertEqual(unfolding.build_prefix(), 2)
+        self.assertEqual(unfolding.num_conditions, 3)
+        self.assertEqual(unfolding.num_cutoffs, 0)
+        self.assertTrue(unfolding.status.complete)
+
+    def test_concurrency_is_not_interleaved(self):
+        """Test independent cycles give a prefix linear in their number."""
+        unfolding = Unfolding(parallel_cycles(12))
+        unfolding.build_prefix()
+        # go_i and back_i per cycle, back_i being a cut-off
+        self.assertEqual(unfolding.num_events, 24)
+        self.assertEqual(unfolding.num_cutoffs, 12)
+
+    def test_orders(self):
+        """Test both adequate orders on a sample model."""
+        net = PNMLParser().parse_file(str(SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        sizes = {}
+        for order in Unfolding.ORDERS:
+            unfolding = Unfolding(net, order=order)
+            sizes[order] = unfolding.build_prefix()
+        # the total ERV order never gives a larger prefix
+        self.assertLessEqual(sizes['erv'], sizes['mcmillan'])
+        with self.assertRaises(ValueError):
+            Unfolding(net, order='size')
+
+    def test_budget(self):
+        """Test an event budget stops the construction with a partial prefix."""
+        net = PNMLParser().parse_file(str(SAMPLES / 'AutonomousCar-PT-03a.pnml'))
+        unfolding = Unfolding(net)
+        unfolding.build_prefix(budget=Budget(max_states=100))
+        self.assertEqual(unfolding.num_events, 100)
+        self.assertFalse(unfolding.status.complete)
+        self.assertFalse(unfolding.is_deadlock_free())
+
+    def test_source_transition_rejected(self):
+        """Test transitions without input places are rejected."""
+        net = PetriNet()
+        net.add_place('p')
+        net.add_transition('t')
+        net.add_arc('t', 'p')
+        with self.assertRaises(ValueError):
+            Unfolding(net).build_prefix()
+
+
+class TestUnfoldingQueries(unittest.TestCase):
+    """Test reachability and deadlock queries on the prefix."""
+
+    def test_reachable_markings_match_explicit(self):
+        """Test every reachable marking and no other is found in the prefix."""
+        net = PNMLParser().parse_file(str(SAMPLES / 'CircadianClock-PT-000001.pnml'))
+        reachable = ExplicitReachability(net).compute_reachability(None)
+        unfolding = Unfolding(net)
+        unfolding.build_prefix()
+        for marking in reachable:
+            self.assertTrue(unfolding.is_reachable(marking))
+        unreachable = Marking({place: 0 for place in net.places})
+        self.assertNotIn(unreachable, reachable)
+        self.assertFalse(unfolding.is_reachable(unreachable))
+
+    def test_partial_queries(self):
+        """Test partial markings against the explicit engine."""
+        net = PNMLParser().parse_file(str(SAMPLES / 'AutonomousCar-PT-03a.pnml'))
+        explicit = ExplicitReachability(net)
+        reachable = explicit.compute_reachability(None)
+        unfolding = Unfolding(net)
+        unfolding.build_prefix()
+        places = sorted(net.places)
+        for i in range(0, len(places) - 1, 2):
+            query = {places[i]: 1, places[i + 1]: 0, places[(7 * i) % len(places)]: 1}
+            witness = unfolding.find_reachable(query)
+            self.assertEqual(witness is not None, explicit.find_reachable(query) is not None)
+            if witness is not None:
+                self.assertIn(witness, reachable)
+
+    def test_deadlocks(self):
+        """Test deadlock answers against the explicit engine."""
+        net = PNMLParser().parse_file(str(SAMPLES / 'AutonomousCar-PT-03a.pnml'))
+        explicit = ExplicitReachability(net)
+        explicit.compute_reachability(None)
+        unfolding = Unfolding(net)
+        unfolding.build_prefix()
+        self.assertIn(unfolding.find_deadlock(), set(explicit.get_deadlocks()))
+        self.assertFalse(unfolding.is_deadlock_free())
+
+        for name in ['producer_consumer', 'simple-02']:
+            unfolding = Unfolding(PNMLParser().parse_file(str(SAMPLES / f'{name}.pnml')))
+            unfolding.build_prefix()
+            self.assertIsNone(unfolding.find_deadlock())
+            self.assertTrue(unfolding.is_deadlock_free())
+
+    def test_sink_transitions(self):
+        """Test events without output places leave their cut reachable."""
+        net = PetriNet()
+        net.add_place('p0', has_token=True)
+        net.add_transition('t0')
+        net.add_arc('p0', 't0')
+        unfolding = Unfolding(net)
+        unfolding.build_prefix()
+        self.assertEqual(unfolding.find_deadlock(), Marking({'p0': 0}))
+        self.assertFalse(unfolding.is_deadlock_free())
+
+        # a sink transition concurrent with a cycle
+        net = parallel_cycles(1)
+        net.add_place('q', has_token=True)
+        net.add_transition('drop')
+        net.add_arc('q', 'drop')
+        explicit = ExplicitReachability(net)
+        reachable = explicit.compute_reachability(None)
+        unfolding = Unfolding(net)
+        unfolding.build_prefix()
+        for marking in reachable:
+            self.assertTrue(unfolding.is_reachable(marking))
+        self.assertTrue(unfolding.is_reachable({'q': 0, 'b0': 1}))
+        self.assertIsNone(unfolding.find_deadlock())
+        self.assertEqual(explicit.get_deadlocks(), [])
+
+    def test_query_errors(self):
+        """Test queries need a built prefix and a marking-shaped query."""
+        unfolding = Unfolding(parallel_cycles(2))
+        with self.assertRaises(RuntimeError):
+            unfolding.find_deadlock()
+        unfolding.build_prefix()
+        with self.assertRaises(ValueError):
+            unfolding.find_reachable(lambda marking: True)
+        with self.assertRaises(ValueError):
+            unfolding.find_reachable({'nope': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,10 @@
+import os
+import tempfile
 import unittest
-from utils import PetriNet, Marking
+from unittest import mock
+from utils import PetriNet, Marking, BitMarking, PlaceIndex, CompiledNet, Budget, ExplorationStatus
+from utils import codegen
+from utils.budget import current_rss
 
 
 class TestMarkingCreation(unittest.TestCase):
@@ -236,6 +241,54 @@ class TestMarkingUtilities(unittest.TestCase):
         self.assertIn('p3', places)
 
 
+class TestBitMarking(unittest.TestCase):
+    """Test the int-backed BitMarking variant."""
+    
+    def setUp(self):
+        """Set up a place index and a packed marking."""
+        self.index = PlaceIndex(['p2', 'p1', 'p3'])
+        self.marking = BitMarking.from_marking({'p1': 1, 'p2': 0, 'p3': 1}, self.index)
+    
+    def test_index_is_sorted(self):
+        """Test place index assigns bits in sorted place order."""
+        self.assertEqual(self.index.places, ('p1', 'p2', 'p3'))
+        self.assertEqual(self.marking.bits, 0b101)
+    
+    def test_has_token(self):
+        """Test token queries on packed marking."""
+        self.assertTrue(self.marking.has_token('p1'))
+        self.assertFalse(self.marking.has_token('p2'))
+        self.assertFalse(self.marking.has_token('p999'))
+    
+    def test_dict_and_vector_views(self):
+        """Test to_dict and to_vector match the dict-based Marking."""
+        plain = Marking({'p1': 1, 'p2': 0, 'p3': 1})
+        self.assertEqual(self.marking.to_dict(), plain.to_dict())
+        self.assertEqual(self.marking.to_vector(['p3', 'p2', 'p1']), [1, 0, 1])
+        self.assertEqual(self.marking.total_tokens(), 2)
+    
+    def test_equal_to_plain_marking(self):
+        """Test BitMarking and Marking for the same state are interchangeable in sets."""
+        plain = Marking({'p1': 1, 'p2': 0, 'p3': 1})
+        self.assertEqual(self.marking, plain)
+        self.assertEqual(plain, self.marking)
+        self.assertEqual(hash(self.marking), hash(plain))
+        self.assertIn(plain, {self.marking})
+    
+    def test_set_token_invalidates_hash(self):
+        """Test mutation updates bits and cached hash."""
+        copy = self.marking.copy()
+        hash(copy)
+        copy.set_token('p2', True)
+        self.assertFalse(self.marking.has_token('p2'))
+        self.assertEqual(hash(copy), hash(Marking({'p1': 1, 'p2': 1, 'p3': 1})))
+    
+    def test_set_token_unknown_place(self):
+        """Test setting a place outside the index raises error."""
+        with self.assertRaises(ValueError):
+            self.marking.set_token('p999', True)
+
+
 class TestPetriNetCreation(unittest.TestCase):
     """Test Petri net creation and initialization."""
     
@@ -513,6 +566,190 @@ class TestPetriNetFork(unittest.TestCase):
         self.assertTrue(new_marking.has_token('p3'))
 
 
+class TestPetriNetCompile(unittest.TestCase):
+    """Test the compiled bit-mask form of a net."""
+    
+    def setUp(self):
+        """Set up net with sync and self-loop: p1, p2 -> t1 -> p2, p3."""
+        self.net = PetriNet()
+        self.net.add_place('p1', has_token=True)
+        self.net.add_place('p2', has_token=True)
+        self.net.add_place('p3', has_token=False)
+        self.net.add_transition('t1')
+        self.net.add_arc('p1', 't1')
+        self.net.add_arc('p2', 't1')
+        self.net.add_arc('t1', 'p2')
+        self.net.add_arc('t1', 'p3')
+    
+    def test_masks(self):
+        """Test pre and post masks use the sorted place layout."""
+        compiled = self.net.compile()
+        t1 = compiled.transition_position['t1']
+        self.assertEqual(compiled.pre[t1], 0b011)
+        self.assertEqual(compiled.post[t1], 0b110)
+    
+    def test_digest(self):
+        """Test the structural digest is stable and tracks net changes."""
+        digest = self.net.compile().digest()
+        self.assertEqual(CompiledNet(self.net).digest(), digest)
+        self.net.add_arc('p3', 't1')
+        self.assertNotEqual(self.net.compile().digest(), digest)
+    
+    def test_enabled_and_fire_match_net(self):
+        """Test compiled enabling and firing agree with the generic methods."""
+        compiled = self.net.compile()
+        bits = compiled.encode(self.net.initial_marking)
+        self.assertEqual([compiled.transitions[t] for t in compiled.enabled(bits)], ['t1'])
+        
+        (t, new_bits), = compiled.successors(bits)
+        expected = self.net.fire_transition('t1', self.net.initial_marking)
+        self.assertEqual(compiled.decode(new_bits), expected)
+        self.assertEqual(compiled.enabled(new_bits), [])
+    
+    def test_consumers_index(self):
+        """Test place-to-consumer index on the net and compiled form."""
+        self.assertEqual(self.net.get_consumers('p2'), ['t1'])
+        self.assertEqual(self.net.get_consumers('p3'), [])
+        compiled = self.net.compile()
+        p2 = compiled.place_index.position['p2']
+        self.assertEqual(compiled.consumers[p2], compiled.transition_mask(['t1']))
+    
+    def test_child_enabled_matches_full_scan(self):
+        """Test incrementally derived enabled sets equal a full re-scan."""
+        net = PetriNet()
+        for p, token in [('a', 1), ('b', 0), ('c', 1), ('d', 0)]:
+            net.add_place(p, has_token=bool(token))
+        for t, pre, post in [('t1', ['a'], ['b']), ('t2', ['b', 'c'], ['d']),
+                             ('t3', ['c'], ['a']), ('t4', ['d'], ['a', 'c'])]:
+            net.add_transition(t)
+            for p in pre:
+                net.add_arc(p, t)
+            for p in post:
+                net.add_arc(t, p)
+        compiled = net.compile()
+        
+        frontier = [compiled.encode(net.initial_marking)]
+        seen = set(frontier)
+        while frontier:
+            bits = frontier.pop()
+            enabled = compiled.enabled_mask(bits)
+            for t, new_bits in compiled.fire_enabled(bits, enabled):
+                self.assertEqual(compiled.child_enabled(new_bits, enabled, t),
+                                 compiled.enabled_mask(new_bits))
+                if new_bits not in seen:
+                    seen.add(new_bits)
+                    frontier.append(new_bits)
+        self.assertGreater(len(seen), 2)
+    
+    def test_compile_is_cached(self):
+        """Test compile returns the cached object until the net changes."""
+        compiled = self.net.compile()
+        self.assertIs(self.net.compile(), compiled)
+        
+        self.net.add_transition('t2')
+        self.net.add_arc('p3', 't2')
+        recompiled = self.net.compile()
+        self.assertIsNot(recompiled, compiled)
+        self.assertEqual(recompiled.num_transitions, 2)
+
+
+class TestGeneratedSuccessors(unittest.TestCase):
+    """Test generated successor functions and their disk cache."""
+    
+    def setUp(self):
+        """Set up a cycle with a fork: p1 -> t1 -> p2, p3; p2, p3 -> t2 -> p1."""
+        self.net = PetriNet()
+        for place in ['p1', 'p2', 'p3']:
+            self.net.add_place(place, has_token=(place == 'p1'))
+        self.net.add_transition('t1')
+        self.net.add_transition('t2')
+        for src, dst in [('p1', 't1'), ('t1', 'p2'), ('t1', 'p3'),
+                         ('p2', 't2'), ('p3', 't2'), ('t2', 'p1')]:
+            self.net.add_arc(src, dst)
+        codegen._loaded.clear()
+    
+    def test_matches_compiled_successors(self):
+        """Test the generated function agrees with CompiledNet.successors."""
+        compiled = self.net.compile()
+        successors = codegen.load_successors(compiled, cache_dir=False)
+        for bits in range(8):
+            self.assertEqual(successors(bits), compiled.successors(bits))
+    
+    def test_disk_cache(self):
+        """Test sources are cached by net digest and reused."""
+        compiled = self.net.compile()
+        with tempfile.TemporaryDirectory() as directory:
+            codegen.load_successors(compiled, cache_dir=directory)
+            files = os.listdir(directory)
+            self.assertEqual(files, [f"successors-{compiled.digest()}-v{codegen.GENERATOR_VERSION}.py"])
+            
+            codegen._loaded.clear()
+            with mock.patch.object(codegen, 'successor_source', side_effect=AssertionError):
+                successors = codegen.load_successors(compiled, cache_dir=directory)
+            self.assertEqual(successors(0b001), compiled.successors(0b001))
+            
+            # a changed net gets its own file
+            self.net.add_arc('p3', 't1')
+            codegen.load_successors(self.net.compile(), cache_dir=directory)
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+
+class TestPetriNetIncidenceMatrices(unittest.TestCase):
+    """Test sparse incidence matrices."""
+    
+    def setUp(self):
+        """Set up net: p1 -> t1 -> p2, p2 -> t2 -> p1, p3 self-loop on t2."""
+        self.net = PetriNet()
+        for p in ['p1', 'p2', 'p3']:
+            self.net.add_place(p, has_token=(p == 'p1'))
+        self.net.add_transition('t1')
+        self.net.add_transition('t2')
+        self.net.add_arc('p1', 't1')
+        self.net.add_arc('t1', 'p2')
+        self.net.add_arc('p2', 't2')
+        self.net.add_arc('p3', 't2')
+        self.net.add_arc('t2', 'p1')
+        self.net.add_arc('t2', 'p3')
+    
+    def test_matrices_match_dict_incidence(self):
+        """Test C-, C+ and C agree with the arcs and the dict incidence."""
+        C_minus, C_plus, C = self.net.get_incidence_matrices()
+        rows = self.net.get_place_index()
+        cols = self.net.get_transition_index()
+        incidence = self.net.get_incidence()
+        
+        self.assertEqual(C.shape, (3, 2))
+        self.assertEqual(C_minus[rows['p3'], cols['t2']], 1)
+        self.assertEqual(C_plus[rows['p3'], cols['t2']], 1)
+        for p, i in rows.items():
+            for t, j in cols.items():
+                self.assertEqual(C[i, j], incidence[p][t])
+    
+    def test_formats(self):
+        """Test CSR and CSC variants are available and unknown formats rejected."""
+        self.assertEqual(self.net.get_incidence_matrices('csr')[2].format, 'csr')
+        self.assertEqual(self.net.get_incidence_matrices('csc')[2].format, 'csc')
+        with self.assertRaises(ValueError):
+            self.net.get_incidence_matrices('dense')
+    
+    def test_state_equation(self):
+        """Test M = M0 + C * n as a matrix product."""
+        _, _, C = self.net.get_incidence_matrices()
+        places = list(self.net.get_place_index())
+        m0 = self.net.initial_marking.to_vector(places)
+        n = [1, 0]  # fire t1 once
+        m = m0 + C @ n
+        self.assertEqual(list(m), [0, 1, 0])
+    
+    def test_cache_invalidated_on_change(self):
+        """Test matrices are rebuilt after adding an arc."""
+        C_before = self.net.get_incidence_matrices()[2]
+        self.assertIs(self.net.get_incidence_matrices()[2], C_before)
+        self.net.add_transition('t3')
+        self.net.add_arc('p2', 't3')
+        self.assertEqual(self.net.get_incidence_matrices()[2].shape, (3, 3))
+
+
 class TestPetriNetValidation(unittest.TestCase):
     """Test Petri net validation."""
     
@@ -563,6 +800,44 @@ class TestPetriNetStringRepresentation(unittest.TestCase):
         self.assertIn('PetriNet', repr_str)
 
 
+class TestBudget(unittest.TestCase):
+    """Test exploration budgets."""
+    
+    def test_unlimited(self):
+        """Test a budget without limits never runs out."""
+        budget = Budget()
+        self.assertIsNone(budget.exceeded(states=10**9, bdd_nodes=10**9))
+        self.assertIsNone(budget.remaining_time())
+    
+    def test_count_limits(self):
+        """Test state and BDD node limits."""
+        budget = Budget(max_states=10, max_bdd_nodes=100)
+        self.assertIsNone(budget.exceeded(states=9, bdd_nodes=99))
+        self.assertEqual(budget.exceeded(states=10), 'states')
+        self.assertEqual(budget.exceeded(bdd_nodes=100), 'bdd_nodes')
+    
+    def test_time_limit(self):
+        """Test the time limit is measured from start()."""
+        self.assertEqual(Budget(time_limit=0).start().exceeded(), 'time')
+        budget = Budget(time_limit=3600).start()
+        self.assertIsNone(budget.exceeded())
+        self.assertGreater(budget.remaining_time(), 3500)
+    
+    def test_memory_limit(self):
+        """Test the RSS ceiling."""
+        self.assertGreater(current_rss(), 0)
+        self.assertEqual(Budget(max_rss=1).exceeded(), 'memory')
+        self.assertIsNone(Budget(max_rss=2**50).exceeded())
+    
+    def test_status(self):
+        """Test the status of a stopped run."""
+        status = Budget(max_states=5).status('states', 4, 3)
+        self.assertIsInstance(status, ExplorationStatus)
+        self.assertFalse(status.complete)
+        self.assertEqual((status.reason, status.explored, status.frontier), ('states', 4, 3))
+        self.assertTrue(Budget().status(None, 4).complete)
+
+
 if __name__ == '__main__':
     # Run with verbose output
     unittest.main(verbosity=2)
@@ -0,0 +1,11 @@
+"""
+Unfolding Module
+
+This module builds complete finite prefixes of the unfolding of 1-safe Petri nets
+(an occurrence net of events and conditions) and answers reachability and deadlock
+questions on the prefix, so the cost follows causality rather than interleavings.
+"""
+
+from .unfolding import Unfolding
+
+__all__ = ['Unfolding']
@@ -0,0 +1,335 @@
+"""
+Complete Finite Prefixes of 1-safe Petri Nets
+
+The unfolding of a net is an acyclic occurrence net: every condition is one
+token of a place, every event one occurrence of a transition consuming a set
+of pairwise concurrent conditions. It is built event by event in an adequate
+order (ERV: size, Parikh vector, Foata normal form of the local
+configuration; or McMillan: size only). An event whose local configuration
+leads to a marking already reached by a smaller configuration is a cut-off
+and is not extended, which makes the prefix finite and complete: every
+reachable marking is the marking of a cut of the prefix.
+
+Relations are kept as Python int bitsets over condition / event ids:
+- co[c]: the conditions concurrent with condition c
+- local configuration of an event: the events below it, itself included
+
+Queries search the prefix for a cut (maximal set of concurrent conditions
+not produced by cut-off events) with the asked places marked, or with no
+transition enabled for deadlocks. The search branches on conditions, not on
+interleavings of concurrent events.
+"""
+
+import heapq
+import time
+
+from utils import ExplorationStatus
+from explicit_reachability.query import Query
+
+
+def _bits(mask):
+    """Positions of the set bits of an int, in increasing order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Unfolding:
+    """
+    Unfolding engine for 1-safe Petri nets.
+
+    Usage:
+        unfolding = Unfolding(net)
+        unfolding.build_prefix()
+        unfolding.is_reachable({'p3': 1}), unfolding.find_deadlock()
+
+    After build_prefix(), condition_place / condition_producer describe the
+    conditions (producer -1 for the initial ones; place -1 for the implicit
+    condition of an event with an empty postset), event_transition /
+    event_preset / event_postset the events (transition indices into
+    compiled.transitions, condition ids) and cutoffs holds the ids of the
+    cut-off events.
+    """
+
+    ORDERS = ('erv', 'mcmillan')
+
+    def __init__(self, petri_net, order='erv'):
+        """
+        Args:
+            petri_net: 1-safe PetriNet to unfold
+            order: Adequate order, 'erv' (total, smallest prefixes) or
+                   'mcmillan' (configuration size)
+        """
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown order {order}; expected one of {self.ORDERS}")
+        self.petri_net = petri_net
+        self.compiled = petri_net.compile()
+        self.order = order
+
+        self.condition_place = []
+        self.condition_producer = []
+        self.event_transition = []
+        self.event_preset = []
+        self.event_postset = []
+        self.cutoffs = set()
+        self.status = None
+
+        self._co = []
+        self._by_place = []
+        self._usable = 0
+        self._configs = []
+        self._levels = []
+        self._queued = 0
+        self._built = False
+
+    @property
+    def num_events(self):
+        return len(self.event_transition)
+
+    @property
+    def num_conditions(self):
+        return len(self.condition_place)
+
+    @property
+    def num_cutoffs(self):
+        return len(self.cutoffs)
+
+    # ------------------------------------------------------------------
+    # Prefix construction
+    # ------------------------------------------------------------------
+    def build_prefix(self, initial_marking=None, budget=None):
+        """
+        Build the complete finite prefix and return its number of events.
+
+        With a Budget, max_states bounds the number of events and time /
+        memory are checked before every event; a prefix stopped early is
+        incomplete (status.complete is False), so markings found in it are
+        reachable but a negative answer proves nothing.
+        """
+        compiled = self.compiled
+        for t, pre in enumerate(compiled.pre):
+            if not pre:
+                raise ValueError(f"Transition {compiled.transitions[t]} has no input place; "
+                                 "unfoldings need every transition to consume a token")
+        if initial_marking is None:
+            initial_marking = self.petri_net.initial_marking
+        started = time.monotonic()
+        if budget is not None:
+            budget.start()
+
+        self.condition_place = []
+        self.condition_producer = []
+        self.event_transition = []
+        self.event_preset = []
+        self.event_postset = []
+        self.cutoffs = set()
+        self._co = []
+        self._by_place = [0] * compiled.num_places
+        self._configs = []
+        self._levels = []
+        self._queued = 0
+
+        initial_bits = compiled.encode(initial_marking)
+        self._initial_bits = initial_bits
+        initial = self._add_conditions(initial_bits, -1, 0)
+        self._usable = initial
+
+        # adequate-order key of the empty configuration: smaller than any event
+        reached = {initial_bits: ()}
+        extensions = []
+        self._push_extensions(initial, extensions)
+
+        reason = None
+        while extensions:
+            if budget is not None:
+                reason = budget.exceeded(states=self.num_events)
+                if reason is not None:
+                    break
+            key, _, t, preset, causes, bits = heapq.heappop(extensions)
+            e = self.num_events
+            self.event_transition.append(t)
+            self.event_preset.append(preset)
+            self._configs.append(causes | (1 << e))
+            self._levels.append(1 + max((self._levels[p] for p in
+                                         (self.condition_producer[c] for c in preset) if p >= 0),
+                                        default=0))
+
+            common = ~0
+            for c in preset:
+                common &= self._co[c]
+            # an event without output places still needs a condition, or the
+            # cuts after it would not be maximal co-sets
+            postset = self._add_conditions(compiled.post[t], e, common, implicit=not compiled.post[t])
+            self.event_postset.append(tuple(_bits(postset)))
+
+            if bits in reached and reached[bits] < key:
+                self.cutoffs.add(e)
+                continue
+            reached.setdefault(bits, key)
+            self._usable |= postset
+            self._push_extensions(postset, extensions)
+
+        self._built = True
+        self.status = ExplorationStatus(reason is None, reason, self.num_events, len(extensions),
+                                        time.monotonic() - started)
+        return self.num_events
+
+    def _add_conditions(self, places, producer, common, implicit=False):
+        """
+        Add one condition per place of the ``places`` mask, produced by
+        event ``producer``; they are pairwise concurrent and concurrent with
+        the conditions of ``common``. With ``implicit``, a single condition
+        of no place (-1) is added instead. Returns the bitset of the new ids.
+        """
+        first = self.num_conditions
+        positions = [-1] if implicit else list(_bits(places))
+        new = ((1 << len(positions)) - 1) << first
+        common &= (1 << first) - 1
+        for offset, position in enumerate(positions):
+            c = first + offset
+            self.condition_place.append(position)
+            self.condition_producer.append(producer)
+            self._co.append(common | (new & ~(1 << c)))
+            if position >= 0:
+                self._by_place[position] |= 1 << c
+        for c in _bits(common):
+            self._co[c] |= new
+        return new
+
+    def _push_extensions(self, new, extensions):
+        """
+        Queue the possible extensions using at least one condition of
+        ``new``; each is generated from its lowest new condition only.
+        """
+        compiled = self.compiled
+        co, by_place, usable = self._co, self._by_place, self._usable
+        lower = 0
+        for c in _bits(new):
+            place = self.condition_place[c]
+            if place < 0:
+                lower |= 1 << c
+                continue
+            for t in _bits(compiled.consumers[place]):
+                others = [p for p in _bits(compiled.pre[t]) if p != place]
+                stack = [((c,), co[c] & usable & ~lower, 0)]
+                while stack:
+                    chosen, common, k = stack.pop()
+                    if k == len(others):
+                        self._push_extension(t, tuple(sorted(chosen)), extensions)
+                        continue
+                    for x in _bits(common & by_place[others[k]]):
+                        stack.append((chosen + (x,), common & co[x], k + 1))
+            lower |= 1 << c
+
+    def _push_extension(self, t, preset, extensions):
+        """Compute the local configuration, marking and order key of a possible extension."""
+        compiled = self.compiled
+        causes = 0
+        for c in preset:
+            producer = self.condition_producer[c]
+            if producer >= 0:
+                causes |= self._configs[producer]
+
+        bits = self._initial_bits
+        clear, post = compiled.clear, compiled.post
+        transitions = self.event_transition
+        events = list(_bits(causes))
+        # event ids follow the causal order, so firing them by id is a valid run
+        for e in events:
+            u = transitions[e]
+            bits = (bits & clear[u]) | post[u]
+        bits = (bits & clear[t]) | post[t]
+
+        if self.order == 'mcmillan':
+            key = (len(events) + 1,)
+        else:
+            parikh = tuple(sorted([transitions[e] for e in events] + [t]))
+            levels = self._levels
+            foata = {}
+            for e in events:
+                foata.setdefault(levels[e], []).append(transitions[e])
+            level = 1 + max((levels[self.condition_producer[c]] for c in preset
+                             if self.condition_producer[c] >= 0), default=0)
+            foata.setdefault(level, []).append(t)
+            key = (len(parikh), parikh, tuple(tuple(sorted(foata[i])) for i in sorted(foata)))
+        # the counter keeps equal keys (McMillan order) in generation order
+        self._queued += 1
+        heapq.heappush(extensions, (key, self._queued, t, preset, causes, bits))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _check_built(self):
+        if not self._built:
+            raise RuntimeError("Call build_prefix() before querying the unfolding")
+
+    def _search_cut(self, required=(), forbidden=0, dead=False):
+        """
+        Search a cut of the prefix (no cut-off conditions) whose marking has
+        the ``required`` place positions marked, none of the ``forbidden``
+        places marked and, with ``dead``, no transition enabled.
+
+        Returns:
+            Packed marking of the cut, or None
+        """
+        compiled = self.compiled
+        co, by_place, usable = self._co, self._by_place, self._usable
+        places = self.condition_place
+        allowed = usable
+        for position in _bits(forbidden):
+            allowed &= ~by_place[position]
+        everything = (1 << self.num_conditions) - 1
+
+        # (marking, conditions concurrent with all chosen ones, excluded, required done)
+        stack = [(0, everything, 0, 0)]
+        while stack:
+            labels, common, excluded, k = stack.pop()
+            if k < len(required):
+                for x in _bits(common & by_place[required[k]] & usable):
+                    new_labels = labels | (1 << required[k])
+                    if dead and compiled.enabled_mask(new_labels):
+                        continue
+                    stack.append((new_labels, common & co[x], excluded, k + 1))
+                continue
+            free = common & ~excluded
+            if not free:
+                if not common:
+                    return labels
+                continue
+            c = free & -free
+            x = c.bit_length() - 1
+            # exclude x: some later choice must conflict with it
+            if common & ~co[x] & allowed & ~excluded & ~c:
+                stack.append((labels, common, excluded | c, k))
+            if allowed & c:
+                new_labels = labels | (1 << places[x]) if places[x] >= 0 else labels
+                if not (dead and compiled.enabled_mask(new_labels)):
+                    stack.append((new_labels, common & co[x], excluded, k))
+        return None
+
+    def find_reachable(self, query):
+        """
+        A reachable marking matching ``query`` (Marking or partial marking
+        dict), as a BitMarking, or None.
+        """
+        self._check_built()
+        compiled = self.compiled
+        query = Query(compiled, query)
+        if query.care is None:
+            raise ValueError("Unfolding queries need a Marking or a partial marking")
+        labels = self._search_cut(tuple(_bits(query.value)), query.care & ~query.value)
+        return compiled.decode(labels) if labels is not None else None
+
+    def is_reachable(self, query):
+        return self.find_reachable(query) is not None
+
+    def find_deadlock(self):
+        """A reachable marking enabling no transition, as a BitMarking, or None."""
+        self._check_built()
+        labels = self._search_cut(dead=True)
+        return self.compiled.decode(labels) if labels is not None else None
+
+    def is_deadlock_free(self):
+        """True if the (complete) prefix has no dead cut."""
+        return self.find_deadlock() is None and self.status.complete
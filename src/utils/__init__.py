@@ -5,6 +5,9 @@ This module provides common utility functions and data structures
 """
 
 from .petri_net import PetriNet
-from .marking import Marking
+from .marking import Marking, BitMarking, PlaceIndex
+from .compiled_net import CompiledNet
+from .budget import Budget, ExplorationStatus
 
-__all__ = ['PetriNet', 'Marking']
+__all__ = ['PetriNet', 'Marking', 'BitMarking', 'PlaceIndex', 'CompiledNet',
+           'Budget', 'ExplorationStatus']
@@ -0,0 +1,132 @@
+"""
+Exploration Budgets
+
+A Budget bounds a state-space computation by number of states, wall-clock
+time, resident memory and BDD nodes. Engines call Budget.exceeded() from
+their main loop and, once it names a reason, stop and describe what they
+got so far in an ExplorationStatus instead of running on unbounded.
+"""
+
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def current_rss():
+    """
+    Resident set size of this process in bytes (peak RSS where the current
+    value cannot be read), or None if neither is available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Budget:
+    """
+    Limits for one exploration; every limit is optional.
+
+    Attributes:
+        max_states: Stop once this many states are stored
+        time_limit: Stop after this many seconds (from start())
+        max_rss: Stop once the process RSS reaches this many bytes
+        max_bdd_nodes: Stop once the BDD manager holds this many nodes
+        rss_interval: Minimum number of seconds between two RSS reads
+    """
+
+    REASONS = ('states', 'time', 'memory', 'bdd_nodes')
+
+    def __init__(self, max_states=None, time_limit=None, max_rss=None, max_bdd_nodes=None,
+                 rss_interval=0.05):
+        self.max_states = max_states
+        self.time_limit = time_limit
+        self.max_rss = max_rss
+        self.max_bdd_nodes = max_bdd_nodes
+        self.rss_interval = rss_interval
+        self._start = time.monotonic()
+        self._next_rss = self._start
+
+    def start(self):
+        """Restart the clock; engines call this when a run begins."""
+        self._start = time.monotonic()
+        self._next_rss = self._start
+        return self
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self._start
+
+    def remaining_time(self):
+        """Seconds left before time_limit, or None without a time limit."""
+        if self.time_limit is None:
+            return None
+        return max(0.0, self.time_limit - self.elapsed)
+
+    def exceeded(self, states=None, bdd_nodes=None):
+        """
+        Check the limits against the current counts.
+
+        Args:
+            states: Number of states stored so far (if the engine counts them)
+            bdd_nodes: Number of nodes in the BDD manager (if any)
+
+        Returns:
+            The first exhausted limit as one of REASONS, or None
+        """
+        if self.max_states is not None and states is not None and states >= self.max_states:
+            return 'states'
+        if self.max_bdd_nodes is not None and bdd_nodes is not None and bdd_nodes >= self.max_bdd_nodes:
+            return 'bdd_nodes'
+        if self.time_limit is None and self.max_rss is None:
+            return None
+
+        now = time.monotonic()
+        if self.time_limit is not None and now - self._start >= self.time_limit:
+            return 'time'
+        if self.max_rss is not None and now >= self._next_rss:
+            self._next_rss = now + self.rss_interval
+            rss = current_rss()
+            if rss is not None and rss >= self.max_rss:
+                return 'memory'
+        return None
+
+    def status(self, reason, explored, frontier=0):
+        """ExplorationStatus of a run stopped for ``reason`` (None = finished)."""
+        return ExplorationStatus(reason is None, reason, explored, frontier, self.elapsed)
+
+
+class ExplorationStatus:
+    """
+    Outcome of an exploration, complete or stopped by its budget.
+
+    Attributes:
+        complete: True if the computation ran to the end
+        reason: Budget.REASONS entry that stopped it, or None
+        explored: States (or ILP candidates) fully processed
+        frontier: States discovered but not yet processed
+        elapsed: Seconds spent
+    """
+
+    def __init__(self, complete=True, reason=None, explored=0, frontier=0, elapsed=0.0):
+        self.complete = complete
+        self.reason = reason
+        self.explored = explored
+        self.frontier = frontier
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        state = 'complete' if self.complete else f'stopped ({self.reason})'
+        return (f"ExplorationStatus({state}, explored={self.explored}, "
+                f"frontier={self.frontier}, elapsed={self.elapsed:.3f}s)")
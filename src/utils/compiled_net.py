@@ -0,0 +1,169 @@
+"""
+Compiled Petri Net
+
+Frozen, integer-indexed view of a PetriNet used by the state-space engines.
+Markings are plain ints over a PlaceIndex and every transition is reduced to
+a few bit masks, so enabling and firing are single integer operations.
+"""
+
+import hashlib
+
+from .marking import BitMarking, PlaceIndex
+
+
+class CompiledNet:
+    """
+    Bit-mask form of a 1-safe Petri net.
+
+    Attributes:
+        place_index: PlaceIndex giving the bit position of every place
+        transitions: Tuple of transition IDs, position = transition index
+        transition_position: Dictionary mapping transition IDs to their index
+        pre: Per-transition mask of input places
+        post: Per-transition mask of output places
+        clear: Per-transition complement of ``pre`` used when firing
+        consumers: Per-place mask of the transitions consuming from that place
+        affected: Per-transition mask of the transitions whose enabledness may
+                  change when it fires (consumers of the places it toggles)
+
+    Sets of transitions (e.g. the enabled set of a marking) are ints over
+    transition indices, bit ``t`` standing for ``transitions[t]``.
+    """
+
+    def __init__(self, petri_net):
+        """
+        Freeze the structure of a PetriNet.
+
+        Later changes to the net are not reflected; use PetriNet.compile(),
+        which rebuilds the compiled form whenever the net is modified.
+        """
+        self.place_index = PlaceIndex(petri_net.places)
+        self.transitions = tuple(sorted(petri_net.transitions))
+        self.transition_position = {t: i for i, t in enumerate(self.transitions)}
+
+        mask = self.place_index.mask
+        self.pre = [mask(petri_net.arcs[t]['input']) for t in self.transitions]
+        self.post = [mask(petri_net.arcs[t]['output']) for t in self.transitions]
+        self.clear = [~pre for pre in self.pre]
+
+        self.consumers = [self.transition_mask(petri_net.consumers.get(place, []))
+                          for place in self.place_index.places]
+
+        self.affected = []
+        for pre, post in zip(self.pre, self.post):
+            affected = 0
+            for place in self.place_index.marked_places(pre ^ post):
+                affected |= self.consumers[self.place_index.position[place]]
+            self.affected.append(affected)
+
+        self._unaffected = [~affected for affected in self.affected]
+        self._affected_rows = [
+            tuple((1 << u, self.pre[u]) for u in range(len(self.transitions)) if affected >> u & 1)
+            for affected in self.affected
+        ]
+
+        # (index, pre, clear, post) rows for the successor loop
+        self._rows = tuple(zip(range(len(self.transitions)), self.pre, self.clear, self.post))
+
+    @property
+    def num_places(self):
+        return len(self.place_index)
+
+    @property
+    def num_transitions(self):
+        return len(self.transitions)
+
+    def digest(self):
+        """
+        Hex SHA-256 of the net structure (places, transitions and their masks),
+        used to tell whether files written for a net still match it.
+        """
+        h = hashlib.sha256()
+        h.update(repr((self.place_index.places, self.transitions)).encode())
+        for pre, post in zip(self.pre, self.post):
+            h.update(f'{pre:x}/{post:x};'.encode())
+        return h.hexdigest()
+
+    def transition_mask(self, transitions):
+        """
+        Pack a collection of transition IDs into a transition mask.
+        """
+        mask = 0
+        for t in transitions:
+            mask |= 1 << self.transition_position[t]
+        return mask
+
+    def encode(self, marking):
+        """
+        Pack a Marking or dict into an int over this net's places.
+        """
+        return self.place_index.encode(marking)
+
+    def decode(self, bits):
+        """
+        Wrap a packed marking as a BitMarking.
+        """
+        return BitMarking(self.place_index, bits)
+
+    def is_enabled(self, bits, t):
+        """
+        Check whether transition index ``t`` is enabled in ``bits``.
+        """
+        pre = self.pre[t]
+        return bits & pre == pre
+
+    def fire(self, bits, t):
+        """
+        Fire transition index ``t`` (assumed enabled) and return the new bits.
+        """
+        return (bits & self.clear[t]) | self.post[t]
+
+    def enabled(self, bits):
+        """
+        Return the indices of all transitions enabled in ``bits``.
+        """
+        return [t for t, pre, _, _ in self._rows if bits & pre == pre]
+
+    def successors(self, bits):
+        """
+        Return ``[(transition_index, new_bits), ...]`` for every enabled transition.
+        """
+        return [(t, (bits & clear) | post)
+                for t, pre, clear, post in self._rows if bits & pre == pre]
+
+    def enabled_mask(self, bits):
+        """
+        Return the enabled set of ``bits`` as a transition mask.
+        """
+        mask = 0
+        for t, pre, _, _ in self._rows:
+            if bits & pre == pre:
+                mask |= 1 << t
+        return mask
+
+    def fire_enabled(self, bits, enabled):
+        """
+        Successors of ``bits`` for the transitions in the ``enabled`` mask.
+
+        Returns:
+            List of (transition_index, new_bits)
+        """
+        clear, post = self.clear, self.post
+        result = []
+        while enabled:
+            low = enabled & -enabled
+            enabled ^= low
+            t = low.bit_length() - 1
+            result.append((t, (bits & clear[t]) | post[t]))
+        return result
+
+    def child_enabled(self, new_bits, enabled, t):
+        """
+        Enabled mask of ``new_bits``, reached by firing ``t`` from a marking
+        whose enabled mask is ``enabled``.
+
+        Only the transitions in ``affected[t]`` are re-tested; the rest of the
+        parent's enabled set carries over unchanged.
+        """
+        rechecked = sum(bit for bit, pre in self._affected_rows[t] if new_bits & pre == pre)
+        return (enabled & self._unaffected[t]) | rechecked
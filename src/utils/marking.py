@@ -4,8 +4,6 @@ Marking Data Structure
 Defines data structures and utilities for working with Petri net markings.
 """
 
-from copy import deepcopy
-
 
 class Marking:
     """
@@ -15,6 +13,8 @@ class Marking:
     For 1-safe nets, each place either has a token (1) or doesn't (0).
     hashable for use in sets and dictionaries
     """
+
+    __slots__ = ('marking',)
     
     def __init__(self, marking_dict=None):
         """
@@ -59,12 +59,12 @@ class Marking:
     
     def copy(self):
         """
-        Create a deep copy of this marking.
+        Create an independent copy of this marking.
         
         Returns:
             New Marking object with the same token distribution
         """
-        return Marking(deepcopy(self.marking))
+        return Marking(self.marking)
     
     def to_tuple(self):
         """
@@ -127,8 +127,10 @@ class Marking:
         
         This is crucial for efficient reachability analysis where we need to
         track visited markings in a set.
+        The hash only depends on the marked places, so a Marking and a
+        BitMarking describing the same state land in the same bucket.
         """
-        return hash(tuple(sorted(self.marking.items())))
+        return hash(frozenset(place for place, has_token in self.marking.items() if has_token))
     
     def __lt__(self, other):
         """
@@ -157,3 +159,160 @@ class Marking:
         Convert marking to a dictionary representation.
         """
         return {place: (1 if has_token else 0) for place, has_token in self.marking.items()}
+
+
+class PlaceIndex:
+    """
+    Stable bit layout for the places of a net.
+
+    Places are sorted by ID, so the same set of places always yields the same
+    layout: bit ``i`` of a packed marking holds the token of ``places[i]``.
+    """
+
+    __slots__ = ('places', 'position')
+
+    def __init__(self, places):
+        """
+        Build the index.
+
+        Args:
+            places: Iterable of place IDs
+        """
+        self.places = tuple(sorted(places))
+        self.position = {place: i for i, place in enumerate(self.places)}
+
+    def __len__(self):
+        return len(self.places)
+
+    def __contains__(self, place):
+        return place in self.position
+
+    def __eq__(self, other):
+        if not isinstance(other, PlaceIndex):
+            return False
+        return self is other or self.places == other.places
+
+    def __hash__(self):
+        return hash(self.places)
+
+    def __repr__(self):
+        return f"PlaceIndex({list(self.places)})"
+
+    def mask(self, places):
+        """
+        Pack a collection of places into an integer bit mask.
+        """
+        bits = 0
+        for place in places:
+            bits |= 1 << self.position[place]
+        return bits
+
+    def encode(self, marking):
+        """
+        Pack a Marking (or dict) into an integer.
+
+        Raises:
+            ValueError: If a marked place is not part of the index
+        """
+        if isinstance(marking, BitMarking) and marking.index == self:
+            return marking.bits
+        items = marking.items() if isinstance(marking, dict) else marking.marking.items()
+        bits = 0
+        for place, has_token in items:
+            if not has_token:
+                continue
+            if place not in self.position:
+                raise ValueError(f"Place {place} is not in the place index")
+            bits |= 1 << self.position[place]
+        return bits
+
+    def marked_places(self, bits):
+        """
+        Yield the places whose bit is set in ``bits``.
+        """
+        while bits:
+            low = bits & -bits
+            yield self.places[low.bit_length() - 1]
+            bits ^= low
+
+
+class BitMarking(Marking):
+    """
+    Compact marking backed by a single Python int over a PlaceIndex.
+
+    Drop-in replacement for Marking in the analysis engines: equality between
+    two BitMarkings on the same index is one integer comparison, and the hash
+    is computed at most once per object. The dict view (``marking``,
+    ``to_dict``) is rebuilt on demand for callers that still need it.
+    """
+
+    __slots__ = ('index', 'bits', '_hash')
+
+    def __init__(self, index, bits=0):
+        """
+        Initialize a packed marking.
+
+        Args:
+            index: PlaceIndex giving the bit position of every place
+            bits: Integer whose bit ``i`` is the token of ``index.places[i]``
+        """
+        self.index = index
+        self.bits = bits
+        self._hash = None
+
+    @classmethod
+    def from_marking(cls, marking, index):
+        """
+        Create a packed marking from a Marking or dict.
+        """
+        return cls(index, index.encode(marking))
+
+    @property
+    def marking(self):
+        """Dictionary view {place: bool} over every indexed place."""
+        bits = self.bits
+        return {place: bool((bits >> i) & 1) for i, place in enumerate(self.index.places)}
+
+    def has_token(self, place):
+        position = self.index.position.get(place)
+        if position is None:
+            return False
+        return bool((self.bits >> position) & 1)
+
+    def set_token(self, place, has_token):
+        position = self.index.position.get(place)
+        if position is None:
+            raise ValueError(f"Place {place} is not in the place index")
+        if has_token:
+            self.bits |= 1 << position
+        else:
+            self.bits &= ~(1 << position)
+        self._hash = None
+
+    def copy(self):
+        new_marking = BitMarking(self.index, self.bits)
+        new_marking._hash = self._hash
+        return new_marking
+
+    def to_tuple(self):
+        bits = self.bits
+        return tuple((place, bool((bits >> i) & 1)) for i, place in enumerate(self.index.places))
+
+    def get_places(self):
+        return set(self.index.places)
+
+    def total_tokens(self):
+        return bin(self.bits).count('1')
+
+    def __eq__(self, other):
+        if isinstance(other, BitMarking) and other.index == self.index:
+            return self.bits == other.bits
+        return super().__eq__(other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self.index.marked_places(self.bits)))
+        return self._hash
+
+    def __repr__(self):
+        return f"BitMarking({self.marking})"
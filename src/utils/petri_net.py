@@ -5,7 +5,10 @@ Defines the core data structures for representing a Petri net.
 """
 
 from copy import deepcopy
+import numpy as np
+from scipy import sparse
 from .marking import Marking
+from .compiled_net import CompiledNet
 
 
 class PetriNet:
@@ -21,6 +24,7 @@ class PetriNet:
         transitions: Set of transition identifiers in the net
         arcs: Dictionary representing arcs (edges) in the net
               Structure: {transition_id: {'input': [place_ids], 'output': [place_ids]}}
+        consumers: Dictionary mapping place IDs to the transitions that consume from them
         initial_marking: Initial marking of the net as a Marking object
         place_names: Dictionary mapping place IDs to human-readable names
         transition_names: Dictionary mapping transition IDs to human-readable names
@@ -31,10 +35,19 @@ class PetriNet:
         self.places = set()
         self.transitions = set()
         self.arcs = {}
+        self.consumers = {}
         self.initial_marking = Marking()
         self.place_names = {}
         self.transition_names = {}
         self.incidence = None # To be computed as needed
+        self._compiled = None
+        self._incidence_matrices = {}
+
+    def _invalidate_caches(self):
+        """Drop structures derived from the net after a structural change."""
+        self.incidence = None
+        self._compiled = None
+        self._incidence_matrices = {}
 
     def add_place(self, place_id, has_token=False, name=None):
         """
@@ -45,6 +58,7 @@ class PetriNet:
         
         self.places.add(place_id)
         self.initial_marking.set_token(place_id, has_token)
+        self._invalidate_caches()
         
         if name:
             self.place_names[place_id] = name
@@ -58,6 +72,7 @@ class PetriNet:
         
         self.transitions.add(transition_id)
         self.arcs[transition_id] = {'input': [], 'output': []}
+        self._invalidate_caches()
         
         if name:
             self.transition_names[transition_id] = name
@@ -72,6 +87,7 @@ class PetriNet:
             if target not in self.arcs:
                 self.arcs[target] = {'input': [], 'output': []}
             self.arcs[target]['input'].append(source)
+            self.consumers.setdefault(source, []).append(target)
             
         elif source in self.transitions and target in self.places:
             # Transition to place (output arc)
@@ -82,7 +98,25 @@ class PetriNet:
         else:
             raise ValueError(f"Invalid arc from {source} to {target}. "
                            f"Arcs must connect places to transitions or transitions to places.")
+
+        self._invalidate_caches()
+
+    def compile(self):
+        """
+        Return the bit-mask form of the net (see CompiledNet).
+
+        The result is cached and rebuilt after add_place/add_transition/add_arc.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledNet(self)
+        return self._compiled
     
+    def get_consumers(self, place):
+        """
+        Get the transitions that have the place in their preset.
+        """
+        return list(self.consumers.get(place, []))
+
     def is_enabled(self, transition, marking):
         """
         Check if a transition is enabled in a given marking.
@@ -116,10 +150,11 @@ class PetriNet:
         if isinstance(marking, dict):
             marking = Marking(marking)
         
-        if not self.is_enabled(transition, marking):
-            raise ValueError(f"Transition {transition} is not enabled in the given marking")
+        for place in self.arcs[transition]['input']:
+            if not marking.has_token(place):
+                raise ValueError(f"Transition {transition} is not enabled in the given marking")
         
-        # Create new marking by deep copying
+        # Create new marking (copy keeps the representation, e.g. BitMarking)
         new_marking = marking.copy()
         
         # Remove tokens from input places
@@ -139,7 +174,9 @@ class PetriNet:
         if isinstance(marking, dict):
             marking = Marking(marking)
         
-        return [t for t in self.transitions if self.is_enabled(t, marking)]
+        has_token = marking.has_token
+        return [t for t in self.transitions
+                if all(has_token(place) for place in self.arcs[t]['input'])]
     
     def validate_consistency(self):
         """
@@ -194,6 +231,62 @@ class PetriNet:
                     self.incidence[p][t] += 1
         return self.incidence
 
+    def get_place_index(self):
+        """
+        Get the stable row index {place_id: i} used by the incidence matrices.
+
+        Places are sorted by ID, matching the bit layout of compile().
+        """
+        return self.compile().place_index.position
+
+    def get_transition_index(self):
+        """
+        Get the stable column index {transition_id: j} used by the incidence matrices.
+        """
+        return self.compile().transition_position
+
+    def get_incidence_matrices(self, fmt='csr'):
+        """
+        Get the sparse input, output and incidence matrices.
+
+        Rows follow get_place_index() and columns get_transition_index().
+        The matrices are cached per format and rebuilt after any structural change.
+
+        Args:
+            fmt: 'csr' (row slices, e.g. one state-equation row per place)
+                 or 'csc' (column slices, e.g. one firing vector per transition)
+
+        Returns:
+            Tuple (C_minus, C_plus, C) of scipy.sparse matrices, C = C+ - C-
+        """
+        if fmt not in ('csr', 'csc'):
+            raise ValueError(f"Unsupported sparse format {fmt}")
+
+        if fmt not in self._incidence_matrices:
+            if 'csr' in self._incidence_matrices:
+                self._incidence_matrices[fmt] = tuple(M.asformat(fmt) for M in self._incidence_matrices['csr'])
+            else:
+                place_index = self.get_place_index()
+                transition_index = self.get_transition_index()
+                shape = (len(place_index), len(transition_index))
+
+                def build(kind):
+                    rows, cols = [], []
+                    for t, j in transition_index.items():
+                        for p in self.arcs[t][kind]:
+                            rows.append(place_index[p])
+                            cols.append(j)
+                    data = np.ones(len(rows), dtype=np.int32)
+                    return sparse.coo_matrix((data, (rows, cols)), shape=shape).asformat(fmt)
+
+                C_minus = build('input')
+                C_plus = build('output')
+                C = (C_plus - C_minus).asformat(fmt)
+                C.eliminate_zeros()
+                self._incidence_matrices[fmt] = (C_minus, C_plus, C)
+
+        return self._incidence_matrices[fmt]
+
     def __str__(self):
         """
         String representation for quick inspection.
@@ -221,16 +314,6 @@ class PetriNet:
         max_p_len = max([len(str(p)) for p in places] + [0])
         row_head_width = max_p_len + 2 # Add padding
 
-        # Build matrices data
-        C_minus = {p: {t: 0 for t in transitions} for p in places}
-        C_plus = {p: {t: 0 for t in transitions} for p in places}
-
-        for t in transitions:
-            for p in self.arcs[t]['input']:
-                C_minus[p][t] = 1
-            for p in self.arcs[t]['output']:
-                C_plus[p][t] = 1
-
         # Places List and number of places
         place_lines = [f"Places ({len(self.places)}):"]
         for p in places:
@@ -247,24 +330,26 @@ class PetriNet:
         num_arcs = sum(len(self.arcs[t]['input']) + len(self.arcs[t]['output']) for t in transitions)
         transition_lines.append(f"Number of arcs: {num_arcs}")
 
-        # Format matrix block helper
+        # Format matrix block helper (rows/columns follow the sorted index maps)
         def format_matrix(title, M):
             header_str = " " * row_head_width + "".join(f"{str(t):>{col_width}}" for t in transitions)
             
             rows = [header_str]
-            for p in places:
+            dense = M.toarray()
+            for i, p in enumerate(places):
                 # Create the row: Place ID + Values
-                values = "".join(f"{M[p][t]:>{col_width}}" for t in transitions)
+                values = "".join(f"{v:>{col_width}}" for v in dense[i])
                 row = f"{str(p):>{row_head_width}}{values}"
                 rows.append(row)
             return [title] + rows
 
+        C_minus, C_plus, C = self.get_incidence_matrices()
+
         # # Build all matrices
         # C_minus_block = format_matrix("Input Matrix C-:", C_minus)
         # C_plus_block = format_matrix("Output Matrix C+:", C_plus)
 
-        # Compute incidence matrix C = C+ - C-
-        C = {p: {t: C_plus[p][t] - C_minus[p][t] for t in transitions} for p in places}
+        # Incidence matrix C = C+ - C-
         C_block = format_matrix("Incidence Matrix C:", C)
 
         # Initial marking